@@ -0,0 +1,95 @@
+"""
+Simulation of adaptive polling on a shared serial bus.
+
+Four thermostats are polled (on task.Clock) for an hour: one ramps
+from 20 to 80 C over ten minutes starting at 30 min, with its
+setpoint set at the start of the ramp; the others hold steady with
+0.02 C of reading noise. Reports the polls made of each, i.e. the
+bus time used, for fixed 1 s polling and adaptive polling, and the
+largest gap between polls of the ramping thermostat during the ramp.
+
+Run with:
+    python benchmarks/bench_adaptive.py
+"""
+
+# System Imports
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+# Twisted Imports
+from twisted.internet import task
+
+# Package Imports
+from octopus.machine import Stream, Property
+from octopus.machine.machine import _Adaptive
+from octopus.scheduler import Scheduler
+
+import numpy as np
+
+
+DURATION = 3600
+RAMP = (1800, 2400)
+
+
+def temperature (t, ramping, rng):
+    noise = rng.normal(0, 0.02)
+
+    if not ramping or t < RAMP[0]:
+        return 20 + noise
+
+    return 20 + 60 * min((t - RAMP[0]) / (RAMP[1] - RAMP[0]), 1) + noise
+
+
+def simulate (adaptive):
+    clock = task.Clock()
+    scheduler = Scheduler(clock)
+    rng = np.random.default_rng(0)
+    devices = []
+
+    for i in range(4):
+        stream = Stream("Bath Temperature", float)
+        setpoint = Property("Setpoint", float, setter = lambda value: None)
+        times = []
+        control = _Adaptive({ stream: 0.1 }, 1, 0.25, 8) if adaptive else None
+
+        def poll (stream = stream, times = times, control = control, ramping = i == 0):
+            if control is not None:
+                control.update()
+
+            times.append(clock.seconds())
+            stream._push(temperature(clock.seconds(), ramping, rng))
+
+        p = scheduler.add(poll, 1)
+
+        if control is not None:
+            control.start(p, [setpoint])
+
+        devices.append((setpoint, times))
+
+    clock.pump([0.25] * int(RAMP[0] / 0.25))
+    devices[0][0].set(80)
+    clock.pump([0.25] * int((DURATION - RAMP[0]) / 0.25))
+
+    ramp = np.array([t for t in devices[0][1] if RAMP[0] <= t <= RAMP[1]])
+
+    return [len(times) for setpoint, times in devices], np.diff(ramp).max()
+
+
+def main ():
+    print("4 thermostats for {:d} s, one ramping from {:d} s to {:d} s".format(DURATION, *RAMP))
+    print("{:>10s} {:>10s} {:>16s} {:>12s} {:>16s}".format(
+        "", "ramping", "steady (each)", "total", "max gap (s)"
+    ))
+
+    for name, adaptive in (("fixed", False), ("adaptive", True)):
+        polls, gap = simulate(adaptive)
+
+        print("{:>10s} {:>10d} {:>16d} {:>12d} {:>16.2f}".format(
+            name, polls[0], polls[1], sum(polls), gap
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmarks for octopus.data time series lookups.
+
+Run with:
+    python benchmarks/bench_data.py
+"""
+
+# System Imports
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+# Package Imports
+from octopus.data import data
+
+
+SIZES = (1000, 10000, 100000, 1000000)
+REPEAT = 1000
+
+
+def bench_get (size):
+    x = [float(i) for i in range(size)]
+    y = [float(i % 100) for i in range(size)]
+    x_max, x_min = x[-1], x[0]
+
+    # A 60 point window near the end of the data, like a UI trace refresh.
+    start = size - 100.5
+    interval = 60
+
+    t = timeit.timeit(
+        lambda: data._get(x, y, x_max, x_min, start, interval),
+        number = REPEAT
+    )
+
+    return t / REPEAT
+
+
+def bench_at (size):
+    x = [float(i) for i in range(size)]
+    y = [float(i % 100) for i in range(size)]
+    x_max, x_min = x[-1], x[0]
+
+    time = size / 2 + 0.5
+
+    t = timeit.timeit(
+        lambda: data._at(data._get(x, y, x_max, x_min, time, 0), time),
+        number = REPEAT
+    )
+
+    return t / REPEAT
+
+
+def bench_archive (size):
+    archive = data.Archive(float)
+    archive.threshold_factor = None
+    archive._zero = 0
+
+    for i in range(size):
+        archive.push(float(i), float(i % 100))
+
+    start = size - 100.5
+
+    t = timeit.timeit(
+        lambda: archive.get(start, 60),
+        number = REPEAT
+    )
+
+    return t / REPEAT, archive._data.nbytes / size
+
+
+def bench_long_range (size, max_points = 1000):
+    archive = data.Archive(float)
+    archive.threshold_factor = None
+    archive.levels = data.Pyramid.default_widths
+    archive._zero = 0
+
+    for i in range(size):
+        archive.push(float(i), float(i % 100))
+
+    raw = timeit.timeit(lambda: archive.get(0, size), number = 10) / 10
+    levels = timeit.timeit(lambda: archive.get(0, size, max_points), number = 10) / 10
+
+    return raw, levels
+
+
+def main ():
+    print("{:>10s} {:>14s} {:>14s} {:>18s} {:>14s}".format(
+        "points", "_get (us)", "at (us)", "Archive.get (us)", "bytes/point"
+    ))
+
+    for size in SIZES:
+        archive_get, nbytes = bench_archive(size)
+
+        print("{:>10d} {:>14.2f} {:>14.2f} {:>18.2f} {:>14.1f}".format(
+            size,
+            bench_get(size) * 1e6,
+            bench_at(size) * 1e6,
+            archive_get * 1e6,
+            nbytes
+        ))
+
+    print()
+    print("{:>10s} {:>14s} {:>22s}".format(
+        "points", "full get (ms)", "max_points=1000 (ms)"
+    ))
+
+    for size in SIZES:
+        raw, levels = bench_long_range(size)
+
+        print("{:>10d} {:>14.2f} {:>22.2f}".format(size, raw * 1e3, levels * 1e3))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark of reading back a run: CSV log files against the Parquet
+export.
+
+Writes a run of 4 machines with 5 variables each, logged every
+second for a week (600k records per variable), as CSV files in the
+LogFile format. Reports the time to load one variable for one hour
+from the CSV file with pandas, to export the run (once), and to read
+the same hour from the export.
+
+Run with:
+    python benchmarks/bench_export.py
+"""
+
+# System Imports
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+# Package Imports
+from octopus.sequence import export
+
+import numpy as np
+import pandas as pd
+
+
+MACHINES = 4
+VARIABLES = 5
+RECORDS = 600000
+HOUR = (1.6e9 + 300000, 1.6e9 + 303600)
+
+
+def write_run (directory):
+    times = 1.6e9 + np.arange(RECORDS, dtype = np.float64)
+    rng = np.random.default_rng(0)
+
+    for m in range(MACHINES):
+        for v in range(VARIABLES):
+            pd.DataFrame({
+                "time": times,
+                "elapsed": times - times[0],
+                "value": 20 + rng.normal(0, 1, RECORDS)
+            }).to_csv(
+                os.path.join(directory, "m{:d}.v{:d}.csv".format(m, v)),
+                header = False, index = False, float_format = "%.2f"
+            )
+
+
+def main ():
+    print("{:d} variables, {:d} records each".format(MACHINES * VARIABLES, RECORDS))
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_run(directory)
+        output = os.path.join(directory, "export")
+        os.mkdir(output)
+
+        start = time.perf_counter()
+        data = pd.read_csv(os.path.join(directory, "m2.v3.csv"), header = None, names = ["time", "elapsed", "value"])
+        data = data[(data["time"] >= HOUR[0]) & (data["time"] <= HOUR[1])]
+        csv = time.perf_counter() - start
+
+        start = time.perf_counter()
+        export.export(directory, output)
+        exported = time.perf_counter() - start
+
+        start = time.perf_counter()
+        frame = export.read(output, ["m2.v3"], *HOUR)
+        parquet = time.perf_counter() - start
+
+        assert len(frame) == len(data)
+
+        print("{:>28s} {:>10.1f} ms".format("CSV, one variable, one hour", csv * 1e3))
+        print("{:>28s} {:>10.1f} ms".format("export (once)", exported * 1e3))
+        print("{:>28s} {:>10.1f} ms".format("Parquet, same query", parquet * 1e3))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Benchmark of expression updates: the cost of one leaf change
+propagating through a guard expression with many leaves.
+
+Run with:
+    python benchmarks/bench_expressions.py
+"""
+
+# System Imports
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+# Package Imports
+from octopus.data import Variable
+
+
+LEAVES = (2, 8, 32, 128)
+REPEAT = 20000
+
+
+def bench (n):
+    variables = [Variable(float, float(i)) for i in range(n)]
+
+    for v in variables:
+        v._archive.threshold_factor = None
+
+    expr = variables[0]
+    for v in variables[1:]:
+        expr = expr + v
+
+    expr = expr > 1e9
+    expr.on("change", lambda data: None)
+
+    v = variables[0]
+    values = [float(i % 2) for i in range(REPEAT)]
+    it = iter(values)
+
+    t = timeit.timeit(lambda: v._push(next(it)), number = REPEAT)
+
+    return t / REPEAT
+
+
+def main ():
+    print("{:>8s} {:>16s}".format("leaves", "update (us)"))
+
+    for n in LEAVES:
+        print("{:>8d} {:>16.2f}".format(n, bench(n) * 1e6))
+
+
+if __name__ == "__main__":
+    main()
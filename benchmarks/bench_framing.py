@@ -0,0 +1,143 @@
+"""
+Benchmark of response framing in octopus.protocol.basic.
+
+Feeds MB-scale streams, in 4 KB packets, to QueuedLineReceiver
+(delimited lines) and VaryingDelimiterQueuedLineReceiver (start and
+end delimiters, fixed length), with and without line noise. Noise
+contains false start delimiters, which each cause a resynchronisation;
+the burst stream has a 64 KB run of them, framed with a length function.
+
+Run with:
+    python benchmarks/bench_framing.py
+"""
+
+# System Imports
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+# Twisted Imports
+from twisted.internet.testing import StringTransport
+
+# Package Imports
+from octopus.protocol.basic import QueuedLineReceiver, VaryingDelimiterQueuedLineReceiver
+
+import numpy as np
+
+
+SIZE = 4 * 2 ** 20
+PACKET = 4096
+
+
+class Lines (QueuedLineReceiver):
+    delimiter = b"\r\n"
+    MAX_LENGTH = SIZE
+
+    def lineReceived (self, line):
+        self.count += 1
+
+
+class Frames (VaryingDelimiterQueuedLineReceiver):
+    # Keeps the same current command, so every frame is received.
+    def lineReceived (self, line):
+        self.count += 1
+
+
+def make_lines ():
+    p = Lines()
+    p.makeConnection(StringTransport())
+    p.count = 0
+
+    return p
+
+
+def length (buffer):
+    # Length given by the first digit, as in the Harvard pump protocol.
+    if len(buffer) < 1:
+        return None
+
+    return int(buffer[:1])
+
+
+def make_frames (length_fn = None):
+    p = Frames()
+    p.makeConnection(StringTransport())
+    p.count = 0
+    p._sent.append(p.Command(
+        index = 0,
+        line = "Q",
+        expectReply = True,
+        wait = 0,
+        length = None if length_fn else 8,
+        lengthFn = length_fn,
+        startDelimiter = b"\x02",
+        startDelimiterLength = 1,
+        endDelimiter = b"\r",
+        endDelimiterLength = 1,
+    ))
+
+    return p
+
+
+def stream (frame, noise):
+    rng = np.random.default_rng(0)
+    parts = []
+    size = 0
+
+    while size < SIZE:
+        if noise:
+            # Random bytes, a tenth of which are start delimiters.
+            junk = rng.integers(3, 256, 32, dtype = np.uint8)
+            junk[rng.random(32) < 0.1] = 2
+            parts.append(junk.tobytes())
+            size += 32
+
+        parts.append(frame)
+        size += len(frame)
+
+    data = b"".join(parts)
+
+    return [data[i:i + PACKET] for i in range(0, len(data), PACKET)]
+
+
+def burst (frame):
+    # A burst of densely packed false start delimiters.
+    return [b"\x02xx" * (PACKET // 3)] * 16 + stream(frame, False)
+
+
+def bench (make, packets):
+    p = make()
+
+    start = time.perf_counter()
+    try:
+        for packet in packets:
+            p.dataReceived(packet)
+    except RecursionError:
+        return None, p.count
+
+    return time.perf_counter() - start, p.count
+
+
+def main ():
+    cases = [
+        ("lines", make_lines, stream(b"12.3456\r\n", False)),
+        ("frames", make_frames, stream(b"\x021234.567\r", False)),
+        ("noisy lines", make_lines, stream(b"12.3456\r\n", True)),
+        ("noisy frames", make_frames, stream(b"\x021234.567\r", True)),
+        ("burst", lambda: make_frames(length), burst(b"\x0281234.56\r")),
+    ]
+
+    print("{:.0f} MB in {:d} byte packets".format(SIZE / 2 ** 20, PACKET))
+    print("{:>14s} {:>10s} {:>12s}".format("stream", "frames", "MB/s"))
+
+    for name, make, packets in cases:
+        t, count = bench(make, packets)
+        rate = "RecursionError" if t is None else "{:.1f}".format(SIZE / 2 ** 20 / t)
+
+        print("{:>14s} {:>10d} {:>12s}".format(name, count, rate))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark of Stream ingestion: one _push per sample against _push_many.
+
+Simulates the Vapourtec R2 pressure history (10 Hz, read back in
+batches) with a change listener attached.
+
+Run with:
+    python benchmarks/bench_ingest.py
+"""
+
+# System Imports
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+# Package Imports
+from octopus.machine import Stream
+
+import numpy as np
+
+
+SAMPLES = 200000
+BATCHES = (100, 1000)
+
+
+def make_stream ():
+    s = Stream("Pressure", int, "mbar")
+    s.on("change", lambda data: None)
+    return s
+
+
+def data ():
+    rng = np.random.default_rng(0)
+    times = time.time() + np.arange(SAMPLES) * 0.1
+    values = (10000 + np.cumsum(rng.integers(-30, 31, SAMPLES)) * 10).tolist()
+
+    return times.tolist(), values
+
+
+def bench_single (times, values, batch):
+    s = make_stream()
+
+    start = time.perf_counter()
+    for i in range(0, SAMPLES, batch):
+        for value, t in zip(values[i:i + batch], times[i:i + batch]):
+            s._push(value, t)
+
+    return time.perf_counter() - start
+
+
+def bench_many (times, values, batch):
+    s = make_stream()
+
+    start = time.perf_counter()
+    for i in range(0, SAMPLES, batch):
+        s._push_many(values[i:i + batch], times[i:i + batch])
+
+    return time.perf_counter() - start
+
+
+def main ():
+    times, values = data()
+
+    print("{:d} samples".format(SAMPLES))
+    print("{:>6s} {:>14s} {:>16s} {:>8s}".format("batch", "_push (/s)", "_push_many (/s)", "speedup"))
+
+    for batch in BATCHES:
+        single = bench_single(times, values, batch)
+        many = bench_many(times, values, batch)
+
+        print("{:>6d} {:>14.0f} {:>16.0f} {:>7.1f}x".format(
+            batch, SAMPLES / single, SAMPLES / many, single / many
+        ))
+
+
+if __name__ == "__main__":
+    main()
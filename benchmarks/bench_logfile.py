@@ -0,0 +1,103 @@
+"""
+Benchmark of variable logging on a slow disk.
+
+Logs 20 variables at 10 Hz for 300 s of records to a simulated disk
+that takes 50 ms per write (a network share or SD card), with
+synchronous buffered writes (as LogFile did) and with the buffered
+LogFile and its writer thread. Reports the time spent in write() on
+the calling (reactor) thread: total and longest single call.
+
+Run with:
+    python benchmarks/bench_logfile.py
+"""
+
+# System Imports
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+# Package Imports
+from octopus.sequence.logfile import LogFile, _writer
+
+
+VARIABLES = 20
+RATE = 10
+DURATION = 300
+LATENCY = 0.05
+
+
+class SlowDisk (io.RawIOBase):
+    def writable (self):
+        return True
+
+    def write (self, b):
+        time.sleep(LATENCY)
+        return len(b)
+
+    def fileno (self):
+        raise OSError
+
+
+def slow_file ():
+    return io.TextIOWrapper(io.BufferedWriter(SlowDisk()), encoding = "utf-8")
+
+
+class SyncLogFile (object):
+    # Format and write each record on the calling thread.
+    def __init__ (self, time_zero):
+        self.f = slow_file()
+        self.time_zero = time_zero
+
+    def write (self, time, value):
+        self.f.write("{:.2f},{:.2f},{}\n".format(time, time - self.time_zero, value))
+
+    def close (self):
+        self.f.close()
+
+
+def buffered (directory, i):
+    f = LogFile(directory, "v{:d}".format(i), 0)
+    f.f.close()
+    f.f = slow_file()
+
+    return f
+
+
+def measure (files):
+    calls = []
+
+    for n in range(RATE * DURATION):
+        for f in files:
+            start = time.perf_counter()
+            f.write(n / RATE, 20.0 + n % 7)
+            calls.append(time.perf_counter() - start)
+
+    for f in files:
+        f.close()
+
+    return sum(calls), max(calls)
+
+
+def main ():
+    print("{:d} variables at {:d} Hz, {:d} s of records, {:.0f} ms per disk write".format(
+        VARIABLES, RATE, DURATION, LATENCY * 1e3
+    ))
+    print("{:>10s} {:>16s} {:>16s}".format("", "total (ms)", "longest (ms)"))
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, files in (
+            ("sync", [SyncLogFile(0) for i in range(VARIABLES)]),
+            ("buffered", [buffered(directory, i) for i in range(VARIABLES)])
+        ):
+            total, longest = measure(files)
+            print("{:>10s} {:>16.1f} {:>16.3f}".format(name, total * 1e3, longest * 1e3))
+
+        _writer.stop()
+
+
+if __name__ == "__main__":
+    main()
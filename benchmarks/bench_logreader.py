@@ -0,0 +1,64 @@
+"""
+Benchmark of reading a time range from the end of a long CSV log.
+
+Writes a log of 5M rows (two months at 1 s) in the LogFile format,
+then reads one minute near the end: with pandas from the start of
+the file, with LogReader building its seek index (the first read),
+and with LogReader using the saved index (later reads).
+
+Run with:
+    python benchmarks/bench_logreader.py
+"""
+
+# System Imports
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+# Package Imports
+from octopus.sequence.logfile import LogReader
+
+import numpy as np
+import pandas as pd
+
+
+ROWS = 5000000
+T0 = 1.6e9
+RANGE = (T0 + ROWS - 3600, T0 + ROWS - 3540)
+
+
+def main ():
+    with tempfile.TemporaryDirectory() as directory:
+        times = T0 + np.arange(ROWS, dtype = np.float64)
+        pd.DataFrame({
+            "time": times, "elapsed": times - T0,
+            "value": 20 + np.random.default_rng(0).normal(0, 1, ROWS)
+        }).to_csv(
+            os.path.join(directory, "temp.csv"),
+            header = False, index = False, float_format = "%.2f"
+        )
+
+        size = os.path.getsize(os.path.join(directory, "temp.csv"))
+        print("{:d} rows, {:.0f} MB; one minute from the end".format(ROWS, size / 1e6))
+
+        start = time.perf_counter()
+        data = pd.read_csv(os.path.join(directory, "temp.csv"), header = None, names = ["time", "elapsed", "value"])
+        data = data[(data["time"] >= RANGE[0]) & (data["time"] <= RANGE[1])]
+        print("{:>24s} {:>10.1f} ms".format("pandas read_csv", (time.perf_counter() - start) * 1e3))
+
+        start = time.perf_counter()
+        LogReader(directory).read_range("temp", *RANGE)
+        print("{:>24s} {:>10.1f} ms".format("first read (indexing)", (time.perf_counter() - start) * 1e3))
+
+        start = time.perf_counter()
+        series = LogReader(directory).read_range("temp", *RANGE)
+        print("{:>24s} {:>10.1f} ms".format("indexed read", (time.perf_counter() - start) * 1e3))
+
+        assert len(series) == len(data) == 61
+
+
+if __name__ == "__main__":
+    main()
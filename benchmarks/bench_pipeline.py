@@ -0,0 +1,71 @@
+"""
+Benchmark of command pipelining in QueuedLineReceiver.
+
+A loopback TCP device answers each query after a fixed latency
+(handling queries concurrently, like a device behind a terminal
+server). Polls per second are measured for several pipeline depths.
+
+Run with:
+    python benchmarks/bench_pipeline.py
+"""
+
+# System Imports
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+# Twisted Imports
+from twisted.internet import reactor, defer, protocol
+from twisted.protocols.basic import LineOnlyReceiver
+
+# Package Imports
+from octopus.protocol.basic import QueuedLineReceiver
+
+
+LATENCY = 0.02
+POLLS = 200
+DEPTHS = (1, 2, 4, 8)
+
+
+class Device (LineOnlyReceiver):
+    delimiter = b"\r"
+
+    def lineReceived (self, line):
+        reactor.callLater(LATENCY, self.sendLine, b"OK " + line)
+
+
+class Client (QueuedLineReceiver):
+    delimiter = b"\r"
+
+
+@defer.inlineCallbacks
+def main ():
+    port = reactor.listenTCP(0, protocol.Factory.forProtocol(Device), interface = "127.0.0.1")
+
+    print("{:d} polls, {:.0f} ms latency".format(POLLS, LATENCY * 1e3))
+    print("{:>8s} {:>12s}".format("depth", "polls/s"))
+
+    for depth in DEPTHS:
+        client = yield protocol.ClientCreator(reactor, Client).connectTCP(
+            "127.0.0.1", port.getHost().port
+        )
+        client.pipeline_depth = depth
+
+        start = time.perf_counter()
+        yield defer.gatherResults([
+            client.write("P{:d}".format(i))
+            for i in range(POLLS)
+        ])
+        elapsed = time.perf_counter() - start
+
+        print("{:>8d} {:>12.1f}".format(depth, POLLS / elapsed))
+        client.transport.loseConnection()
+
+    yield port.stopListening()
+
+
+if __name__ == "__main__":
+    main().addBoth(lambda result: reactor.stop() or result)
+    reactor.run()
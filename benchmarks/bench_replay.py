@@ -0,0 +1,98 @@
+"""
+Benchmark of replaying a logged run at full speed.
+
+Writes CSV logs of a 24 h run of 10 variables sampled every second
+(864k records), then replays them into variables that feed
+expressions (error = temperature - setpoint, and a comparison on it)
+with change listeners, and a Tick that reads the expressions every
+second of virtual time. Reports the replay time and rate.
+
+Run with:
+    python benchmarks/bench_replay.py
+"""
+
+# System Imports
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+# Twisted Imports
+from twisted.internet import reactor
+
+# Package Imports
+from octopus.data import Variable
+from octopus.sequence.replay import Replay
+from octopus.sequence.util import Tick
+
+import numpy as np
+import pandas as pd
+
+
+VARIABLES = 10
+DURATION = 24 * 3600
+
+
+def write_run (directory):
+    times = 1.6e9 + np.arange(DURATION, dtype = np.float64)
+    rng = np.random.default_rng(0)
+
+    for i in range(VARIABLES):
+        pd.DataFrame({
+            "time": times, "elapsed": times - times[0],
+            "value": 20 + np.cumsum(rng.normal(0, 0.05, DURATION))
+        }).to_csv(
+            os.path.join(directory, "m.v{:d}.csv".format(i)),
+            header = False, index = False, float_format = "%.2f"
+        )
+
+
+def main ():
+    with tempfile.TemporaryDirectory() as directory:
+        write_run(directory)
+
+        variables = []
+
+        for i in range(VARIABLES):
+            v = Variable(float)
+            v.alias = "m.v{:d}".format(i)
+            variables.append(v)
+
+        error = variables[0] - variables[1]
+        alarm = error > 5
+        counts = { "changes": 0, "ticks": 0, "alarms": 0 }
+
+        def changed (data):
+            counts["changes"] += 1
+
+        def tick ():
+            counts["ticks"] += 1
+            counts["alarms"] += bool(alarm.value)
+
+        error.on("change", changed)
+
+        start = time.perf_counter()
+        replay = Replay(directory, variables)
+        loaded = time.perf_counter() - start
+
+        def done (result):
+            elapsed = time.perf_counter() - start
+            print("{:d} variables, {:d} s of records ({:d} records)".format(VARIABLES, DURATION, VARIABLES * DURATION))
+            print("  load {:.1f} s, replay {:.1f} s, {:.0f} records/s, {:.0f}x real time".format(
+                loaded, elapsed - loaded, VARIABLES * DURATION / (elapsed - loaded), DURATION / elapsed
+            ))
+            print("  {changes:d} expression changes, {ticks:d} ticks".format(**counts))
+            reactor.stop()
+
+        replay.run().addCallback(done)
+
+        # Started once the replay has installed its clock.
+        Tick(tick, 1).run()
+
+        reactor.run()
+
+
+if __name__ == "__main__":
+    main()
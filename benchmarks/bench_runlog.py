@@ -0,0 +1,89 @@
+"""
+Benchmark of a CSV LogFile per variable against a single RunLog.
+
+Logs 150 float variables, each updated every second, for an hour of
+records. Reports the time spent in write() on the calling thread,
+the time taken to write out all files (by the writer thread), the
+open files and the size on disk.
+
+Run with:
+    python benchmarks/bench_runlog.py
+"""
+
+# System Imports
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+# Package Imports
+from octopus.sequence.logfile import LogFile, RunLog, _writer
+
+import numpy as np
+
+
+VARIABLES = 150
+TICKS = 3600
+
+
+def csv_files (directory):
+    files = [LogFile(directory, "v{:d}".format(i), 0) for i in range(VARIABLES)]
+    return files, files
+
+
+def run_log (directory):
+    log = RunLog(directory, 0)
+    return [log.channel("v{:d}".format(i), float, "C") for i in range(VARIABLES)], [log]
+
+
+def measure (open_files):
+    rng = np.random.default_rng(0)
+    values = (20 + rng.normal(0, 1, (TICKS, VARIABLES))).tolist()
+
+    with tempfile.TemporaryDirectory() as directory:
+        logs, files = open_files(directory)
+
+        start = time.perf_counter()
+
+        for tick in range(TICKS):
+            row = values[tick]
+
+            for i, log in enumerate(logs):
+                log.write(1.6e9 + tick, row[i])
+
+        writes = time.perf_counter() - start
+
+        start = time.perf_counter()
+
+        for f in files:
+            f.close()
+
+        _writer.stop()
+        flush = time.perf_counter() - start
+
+        size = sum(
+            os.path.getsize(os.path.join(directory, name))
+            for name in os.listdir(directory)
+        )
+
+    return writes, flush, len(files), size
+
+
+def main ():
+    print("{:d} variables, {:d} records each".format(VARIABLES, TICKS))
+    print("{:>8s} {:>14s} {:>14s} {:>8s} {:>10s}".format(
+        "", "write (ms)", "flush (ms)", "files", "size (MB)"
+    ))
+
+    for name, open_files in (("csv", csv_files), ("binary", run_log)):
+        writes, flush, files, size = measure(open_files)
+
+        print("{:>8s} {:>14.1f} {:>14.1f} {:>8d} {:>10.2f}".format(
+            name, writes * 1e3, flush * 1e3, files, size / 1e6
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark of machine polling: one LoopingCall per machine against
+the shared scheduler.
+
+Simulates (on task.Clock) 24 machines polling every second and one
+every 0.1 s (like the Vapourtec R2 pressure), each poll taking 2 ms
+of reactor time. Reports the most polls due in any 10 ms window and
+the delay before each poll could start, i.e. the reactor latency
+seen by other events.
+
+Run with:
+    python benchmarks/bench_scheduler.py
+"""
+
+# System Imports
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+# Twisted Imports
+from twisted.internet import task
+
+# Package Imports
+from octopus.scheduler import Scheduler
+
+import numpy as np
+
+
+MACHINES = 24
+WORK = 0.002
+DURATION = 60
+
+
+def intervals ():
+    return [1.0] * MACHINES + [0.1]
+
+
+def looping_calls (clock, fn):
+    for interval in intervals():
+        c = task.LoopingCall(fn)
+        c.clock = clock
+        c.start(interval, now = True)
+
+
+def scheduled (clock, fn):
+    scheduler = Scheduler(clock)
+
+    for interval in intervals():
+        scheduler.add(fn, interval)
+
+
+def simulate (start):
+    clock = task.Clock()
+    times = []
+
+    def poll ():
+        times.append(clock.seconds())
+
+    start(clock, poll)
+
+    clock.pump([0.001] * int(DURATION / 0.001))
+
+    # Polls are run one after another, each taking WORK seconds.
+    times = np.array(times)
+    delays = np.empty(len(times))
+    free = 0.0
+
+    for i, t in enumerate(times):
+        begin = max(t, free)
+        delays[i] = begin - t
+        free = begin + WORK
+
+    burst = np.bincount((times / 0.01).astype(int)).max()
+
+    return len(times), burst, delays
+
+
+def main ():
+    print("{:d} machines at 1 s and one at 0.1 s for {:d} s, {:.0f} ms per poll".format(
+        MACHINES, DURATION, WORK * 1e3
+    ))
+    print("{:>14s} {:>8s} {:>12s} {:>16s} {:>15s}".format(
+        "", "polls", "max/10 ms", "mean delay (ms)", "max delay (ms)"
+    ))
+
+    for name, start in (("LoopingCall", looping_calls), ("Scheduler", scheduled)):
+        polls, burst, delays = simulate(start)
+
+        print("{:>14s} {:>8d} {:>12d} {:>16.2f} {:>15.2f}".format(
+            name, polls, burst, delays.mean() * 1e3, delays.max() * 1e3
+        ))
+
+
+if __name__ == "__main__":
+    main()
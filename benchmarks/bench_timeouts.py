@@ -0,0 +1,83 @@
+"""
+Simulation of response timeouts: fixed against adaptive (RoundTripTimer).
+
+Two simulated devices each answer 20000 queries:
+
+    fast   ~20 ms round trip, 1% of responses lost
+    slow   ~300 ms round trip, 3% of responses take 1.2 s
+
+For each, reports the time spent waiting for lost responses (stall)
+and the number of responses that arrived after the timeout (false
+timeouts). Late responses are sampled, as QueuedLineReceiver does.
+
+Run with:
+    python benchmarks/bench_timeouts.py
+"""
+
+# System Imports
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+# Package Imports
+from octopus.protocol.basic import QueuedLineReceiver, RoundTripTimer
+
+import numpy as np
+
+
+QUERIES = 20000
+
+
+def fast (rng):
+    rtt = rng.lognormal(np.log(0.02), 0.2, QUERIES)
+    rtt[rng.random(QUERIES) < 0.01] = np.inf
+
+    return rtt
+
+
+def slow (rng):
+    rtt = rng.lognormal(np.log(0.3), 0.1, QUERIES)
+    rtt[rng.random(QUERIES) < 0.03] = 1.2
+
+    return rtt
+
+
+def simulate (rtts, adaptive):
+    p = QueuedLineReceiver
+    timer = RoundTripTimer(p.timeout, p.timeout_floor, p.timeout_ceiling)
+    stall = 0.0
+    false = 0
+
+    for rtt in rtts:
+        timeout = timer.timeout if adaptive else p.timeout
+
+        if rtt <= timeout:
+            timer.sample(rtt)
+            continue
+
+        timer.expired()
+
+        if np.isinf(rtt):
+            stall += timeout
+        else:
+            false += 1
+            timer.sample(rtt)
+
+    return stall, false
+
+
+def main ():
+    print("{:d} queries per device".format(QUERIES))
+    print("{:>8s} {:>10s} {:>12s} {:>16s}".format("device", "timeout", "stall (s)", "false timeouts"))
+
+    for name, device in (("fast", fast), ("slow", slow)):
+        rtts = device(np.random.default_rng(0))
+
+        for mode, adaptive in (("fixed", False), ("adaptive", True)):
+            stall, false = simulate(rtts, adaptive)
+            print("{:>8s} {:>10s} {:>12.1f} {:>16d}".format(name, mode, stall, false))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 # System Imports
+from bisect import bisect_left, bisect_right
 from math import ceil
 import operator
 
@@ -8,26 +9,28 @@ from ..events import EventEmitter
 
 # Sibling Imports
 from . import errors
+from .series import Series, Pyramid
+
+# NumPy
+import numpy as np
 
 
 def _upper_bound (list, time):
     # Return the index of the first item in {list} which
     # is greater than or equal to {time}.
-    # http://stackoverflow.com/q/2236906/
-    return next((i for i, t in enumerate(list) if t >= time), None)
+    # {list} must be sorted in ascending order.
+    i = bisect_left(list, time)
 
+    return i if i < len(list) else None
 
-def _lower_bound (list, time):
-    l = len(list)
 
+def _lower_bound (list, time):
     # Return the index of the last item in {list} which
     # is less than or equal to {time}.
-    try:
-        return l - 1 - next(
-            (i for i, t in enumerate(reversed(list)) if t <= time)
-        )
-    except StopIteration:
-        return None
+    # {list} must be sorted in ascending order.
+    i = bisect_right(list, time) - 1
+
+    return i if i >= 0 else None
 
 
 def _interp (x, x0, y0, x1, y1):
@@ -51,11 +54,26 @@ def _prepare (start, interval):
     return start, interval
 
 
+def _tolist (values):
+    try:
+        return values.tolist()
+    except AttributeError:
+        return list(values)
+
+
+def _item (value):
+    # Convert NumPy scalars into the equivalent Python object.
+    try:
+        return value.item()
+    except AttributeError:
+        return value
+
+
 def _get (x_vals, y_vals, x_max, x_min, start, interval):
 
     # Return all data
     if start is None and interval is None:
-        return list(zip(x_vals, y_vals))
+        return list(zip(_tolist(x_vals), _tolist(y_vals)))
 
     if interval is None:
         interval = 0
@@ -63,15 +81,15 @@ def _get (x_vals, y_vals, x_max, x_min, start, interval):
     # Request range is outside data range
     if start > x_max:
         if interval == 0:
-            return [(start, y_vals[-1])]
+            return [(start, _item(y_vals[-1]))]
         else:
-            return [(start, y_vals[-1]), (start + interval, y_vals[-1])]
+            return [(start, _item(y_vals[-1])), (start + interval, _item(y_vals[-1]))]
     if start + interval < x_min:
         try:
             if interval == 0:
-                return [(start, y_vals[0])]
+                return [(start, _item(y_vals[0]))]
             else:
-                return [(start, y_vals[0]), (start + interval, y_vals[0])]
+                return [(start, _item(y_vals[0])), (start + interval, _item(y_vals[0]))]
         except IndexError:
             if interval == 0:
                 return [(start, 0)]
@@ -85,24 +103,67 @@ def _get (x_vals, y_vals, x_max, x_min, start, interval):
     if i_end is not None:
         i_end += 1 # Return the interval length of data
 
-    vals = list(zip(x_vals[i_start:i_end], y_vals[i_start:i_end]))
+    vals = list(zip(_tolist(x_vals[i_start:i_end]), _tolist(y_vals[i_start:i_end])))
 
     # Fill in the start and end points if necessary.
     try:
         if start < x_min:
-            vals.insert(0, (start, y_vals[0]))
+            vals.insert(0, (start, _item(y_vals[0])))
     except IndexError:
         pass
 
     try:
         if start + interval > x_max:
-            vals.append((start + interval, y_vals[-1]))
+            vals.append((start + interval, _item(y_vals[-1])))
     except IndexError:
         pass
 
     return vals
 
 
+def _view (x_vals, y_vals, start, interval):
+    # Return the slices of {x_vals} and {y_vals} that cover
+    # [start, start + interval], including the points either
+    # side of the range (as for _get, but without filling in
+    # the edges). For NumPy arrays the slices are views.
+    if start is None and interval is None:
+        return x_vals, y_vals
+
+    if interval is None:
+        interval = 0
+
+    i_start = _lower_bound(x_vals, start)
+    i_end   = _upper_bound(x_vals, start + interval)
+
+    if i_end is not None:
+        i_end += 1
+
+    return x_vals[i_start:i_end], y_vals[i_start:i_end]
+
+
+def _interp_grid (x_vals, y_vals, grid, hold = False):
+    # Sample the series ({x_vals}, {y_vals}) at each time in {grid},
+    # by linear interpolation or (if {hold}) by taking the most recent
+    # value. Values before the first point are taken from the first point.
+    if len(x_vals) == 0:
+        return np.full(len(grid), np.nan)
+
+    if not hold:
+        return np.interp(grid, x_vals, y_vals)
+
+    i = np.searchsorted(x_vals, grid, "right") - 1
+    np.maximum(i, 0, out = i)
+
+    return np.asarray(y_vals)[i]
+
+
+def _str_array (values):
+    out = np.empty(len(values), object)
+    out[:] = [str(v) for v in _tolist(values)]
+
+    return out
+
+
 def _at (val, time):
     if len(val) == 1:
         return val[0][1]
@@ -118,84 +179,409 @@ class Archive (object):
     threshold_factor = 0.05
     min_delta = 10
 
-    def __init__ (self):
+    # Set deviation to a maximum absolute error to use swinging door
+    # compression instead of threshold_factor / min_delta.
+    deviation = None
+
+    # Set levels to a tuple of bucket widths (in seconds), e.g.
+    # Pyramid.default_widths, to keep aggregated data alongside the
+    # raw data for long-range queries with max_points.
+    levels = None
+
+    @property
+    def _x (self):
+        return self._data.x
+
+    @property
+    def _y (self):
+        return self._data.y
+
+    def __init__ (self, type = float):
         self._prev_x = None
         self._prev_y = None
+        self._data = Series(type)
         self.truncate()
 
     def truncate (self):
         self._zero = now()
 
-        self._x = [self._prev_x] if self._prev_x is not None else []
-        self._y = [self._prev_y] if self._prev_y is not None else []
+        self._data.clear()
+
+        if self._prev_x is not None:
+            self._data.append(self._prev_x, self._prev_y)
 
         self._y_min = 0
         self._y_max = 0
         self._min_since_last = None
         self._max_since_last = None
 
+        # Swinging door state: the last permanently stored point
+        # and the slopes of the upper and lower doors.
+        self._anchor = (self._prev_x, self._prev_y) if self._prev_x is not None else None
+        self._door = None
+
+        self._pyramid = None
+
+    @property
+    def threshold (self):
+        """
+        The change in value that is currently large enough to be
+        stored, or None if all values are stored.
+        """
+
+        if self.threshold_factor is None:
+            return None
+
+        if self.deviation is not None:
+            return self.deviation
+
+        return max(self.threshold_factor * (self._y_max - self._y_min), self.min_delta)
+
     def push (self, x, y):
         # Ignore data points at times earlier than the most recent reset.
         if x < self._zero:
             return
 
-        if self.threshold_factor is not None:
+        if self.levels is not None:
+            if self._pyramid is None:
+                self._pyramid = Pyramid(self.levels)
+
+            self._pyramid.push(x, y)
+
+        self._compress((x,), (y,))
+
+    def push_many (self, xs, ys):
+        """
+        Add a batch of points in one pass.
+
+        xs and ys are sequences (or NumPy arrays) of equal length,
+        in time order.
+        """
+
+        xs = np.asarray(xs, np.float64)
+        ys = np.asarray(ys, self._data.dtype)
+
+        # Ignore data points at times earlier than the most recent reset.
+        if len(xs) > 0 and xs[0] < self._zero:
+            keep = xs >= self._zero
+            xs = xs[keep]
+            ys = ys[keep]
+
+        if len(xs) == 0:
+            return
+
+        if self.levels is not None:
+            if self._pyramid is None:
+                self._pyramid = Pyramid(self.levels)
+
+            self._pyramid.push_many(xs.tolist(), ys.tolist())
+
+        if self.deviation is None and self.threshold_factor is not None \
+        and ys.dtype.kind in "if":
+            self._compress_array(xs, ys)
+        else:
+            self._compress(xs.tolist(), ys.tolist())
+
+    def _compress (self, xs, ys):
+        # Store the points from xs, ys that pass the threshold test.
+        if self.deviation is not None and self.threshold_factor is not None:
+            return self._compress_swinging_door(xs, ys)
+
+        factor = self.threshold_factor
+        prev_x = self._prev_x
+        prev_y = self._prev_y
+
+        # Store everything
+        if factor is None:
+            if len(xs) > 0:
+                self._data.extend(xs, ys)
+                self._prev_x = xs[-1]
+                self._prev_y = ys[-1]
+
+            return
+
+        min_delta = self.min_delta
+        y_min = self._y_min
+        y_max = self._y_max
+        min_since_last = self._min_since_last
+        max_since_last = self._max_since_last
+
+        stored_x = []
+        stored_y = []
+
+        for x, y in zip(xs, ys):
             # Update max and min
-            if y > self._y_max:
-                self._y_max = y
-            elif y < self._y_min:
-                self._y_min = y
+            if y > y_max:
+                y_max = y
+            elif y < y_min:
+                y_min = y
 
             # The delta must be at least {factor} * absolute spread
             # of values collected so far, and at least {min_delta}.
-            threshold = max(
-                self.threshold_factor * (self._y_max - self._y_min),
-                self.min_delta
-            )
+            threshold = factor * (y_max - y_min)
+            if threshold < min_delta:
+                threshold = min_delta
 
             # Update Min / Max values
-            if self._min_since_last is None \
-            or y < self._min_since_last[1]:
-                self._min_since_last = (x, y)
-
-            if self._max_since_last is None \
-            or y > self._max_since_last[1]:
-                self._max_since_last = (x, y)
-
-        # Store the values if the delta exceeds the threshold
-        if self._prev_y is None \
-        or self.threshold_factor is None \
-        or abs(self._prev_y - y) > threshold:
-
-            # Add up to one local maximum (or minimum)
-            # to retain concave curve shapes.
-            if self.threshold_factor is not None and self._prev_y is not None:
-                if self._max_since_last[1] > self._prev_y \
-                and self._max_since_last[1] > y:
-                    self._x.append(self._max_since_last[0])
-                    self._y.append(self._max_since_last[1])
-                elif self._min_since_last[1] < self._prev_y \
-                and self._min_since_last[1] < y:
-                    self._x.append(self._min_since_last[0])
-                    self._y.append(self._min_since_last[1])
-
-                self._min_since_last = (x, y)
-                self._max_since_last = (x, y)
-
-            self._x.append(x)
-            self._y.append(y)
-            self._prev_x = x
-            self._prev_y = y
+            if min_since_last is None or y < min_since_last[1]:
+                min_since_last = (x, y)
+
+            if max_since_last is None or y > max_since_last[1]:
+                max_since_last = (x, y)
+
+            # Store the values if the delta exceeds the threshold
+            if prev_y is None or abs(prev_y - y) > threshold:
+
+                # Add up to one local maximum (or minimum)
+                # to retain concave curve shapes.
+                if prev_y is not None:
+                    if max_since_last[1] > prev_y and max_since_last[1] > y:
+                        stored_x.append(max_since_last[0])
+                        stored_y.append(max_since_last[1])
+                    elif min_since_last[1] < prev_y and min_since_last[1] < y:
+                        stored_x.append(min_since_last[0])
+                        stored_y.append(min_since_last[1])
+
+                    min_since_last = (x, y)
+                    max_since_last = (x, y)
+
+                stored_x.append(x)
+                stored_y.append(y)
+                prev_x = x
+                prev_y = y
+
+        self._y_min = y_min
+        self._y_max = y_max
+        self._min_since_last = min_since_last
+        self._max_since_last = max_since_last
+        self._prev_x = prev_x
+        self._prev_y = prev_y
+
+        if len(stored_x) > 0:
+            self._data.extend(stored_x, stored_y)
+
+    def _compress_array (self, xs, ys):
+        # As _compress (the threshold heuristic), for numeric arrays.
+        # The spread and so the threshold at each point are computed
+        # for the whole batch at once, and each point to store is
+        # found with a vectorized search from the last, so that the
+        # work in Python is per stored point rather than per point.
+        n = len(xs)
+        i = 0
+        prev_x = self._prev_x
+        prev_y = self._prev_y
+        min_since_last = self._min_since_last
+        max_since_last = self._max_since_last
+
+        stored_x = []
+        stored_y = []
+
+        # The first point of all is stored without a threshold test.
+        if prev_y is None:
+            prev_x = xs[0].item()
+            prev_y = ys[0].item()
+            min_since_last = max_since_last = (prev_x, prev_y)
+            stored_x.append(prev_x)
+            stored_y.append(prev_y)
+            i = 1
+
+        y_max = self._y_max
+        y_min = self._y_min
+        batch_max = ys.max().item()
+        batch_min = ys.min().item()
+
+        # Usually the batch is within the spread so far, and the
+        # threshold is the same for every point.
+        if batch_max <= y_max and batch_min >= y_min:
+            threshold = self.threshold_factor * (y_max - y_min)
+            threshold = np.full(n, max(threshold, self.min_delta))
+        else:
+            threshold = self.threshold_factor * (
+                np.maximum(np.maximum.accumulate(ys), y_max)
+                - np.minimum(np.minimum.accumulate(ys), y_min)
+            )
+            np.maximum(threshold, self.min_delta, out = threshold)
+            y_max = max(y_max, batch_max)
+            y_min = min(y_min, batch_min)
+
+        start = i
+
+        while i < n:
+            # The next point that differs from the last stored one by
+            # more than the threshold.
+            exceeds = np.abs(ys[i:] - prev_y) > threshold[i:]
+            j = int(exceeds.argmax())
+
+            if not exceeds[j]:
+                break
+
+            j += i
+            x = xs[j].item()
+            y = ys[j].item()
+
+            # Add up to one local maximum (or minimum) since the last
+            # stored point, to retain concave curve shapes. As in
+            # _compress, the earliest extreme is kept.
+            segment = ys[start:j + 1]
+            k = start + int(segment.argmax())
+            peak = (xs[k].item(), ys[k].item())
+            if max_since_last is not None and max_since_last[1] >= peak[1]:
+                peak = max_since_last
+
+            k = start + int(segment.argmin())
+            trough = (xs[k].item(), ys[k].item())
+            if min_since_last is not None and min_since_last[1] <= trough[1]:
+                trough = min_since_last
+
+            if peak[1] > prev_y and peak[1] > y:
+                stored_x.append(peak[0])
+                stored_y.append(peak[1])
+            elif trough[1] < prev_y and trough[1] < y:
+                stored_x.append(trough[0])
+                stored_y.append(trough[1])
+
+            stored_x.append(x)
+            stored_y.append(y)
+            prev_x = x
+            prev_y = y
+            min_since_last = max_since_last = (x, y)
+            i = start = j + 1
+
+        # Carry the extremes since the last stored point forward.
+        if start < n:
+            segment = ys[start:]
+
+            k = start + int(segment.argmax())
+            if max_since_last is None or ys[k] > max_since_last[1]:
+                max_since_last = (xs[k].item(), ys[k].item())
+
+            k = start + int(segment.argmin())
+            if min_since_last is None or ys[k] < min_since_last[1]:
+                min_since_last = (xs[k].item(), ys[k].item())
+
+        self._y_min = y_min
+        self._y_max = y_max
+        self._min_since_last = min_since_last
+        self._max_since_last = max_since_last
+        self._prev_x = prev_x
+        self._prev_y = prev_y
+
+        if len(stored_x) > 0:
+            self._data.extend(stored_x, stored_y)
+
+    def _compress_swinging_door (self, xs, ys):
+        # Swinging door trending: a point is only stored when a line
+        # from the last stored point can no longer pass within
+        # {deviation} of every point received since. The most recent
+        # point is always stored provisionally (and replaced by the next
+        # point if the doors are still open), so that the archive
+        # extends to the latest value. O(1) per point.
+        deviation = self.deviation
+        data = self._data
+        anchor = self._anchor
+        door = self._door
+
+        for x, y in zip(xs, ys):
+            # First point, or no time has passed since the last stored
+            # point: store it as the new anchor.
+            if anchor is None or x <= anchor[0]:
+                data.append(x, y)
+                anchor = (x, y)
+                door = None
+                continue
+
+            dx = x - anchor[0]
+            upper = (y + deviation - anchor[1]) / dx
+            lower = (y - deviation - anchor[1]) / dx
+
+            # Only the anchor has been stored: start a new segment.
+            if door is None:
+                data.append(x, y)
+                door = (upper, lower)
+                continue
+
+            upper = min(upper, door[0])
+            lower = max(lower, door[1])
+
+            # The doors are still open: replace the provisional point.
+            if lower <= upper:
+                data.replace(x, y)
+                door = (upper, lower)
+
+            # The doors have closed: the provisional point is kept and
+            # becomes the anchor of a new segment. Its value is moved
+            # (by at most {deviation}) onto the nearest line that lies
+            # within the doors, so that the segment is within
+            # {deviation} of every point that it replaces.
+            else:
+                held_x = data.x[-1].item()
+                slope = (data.y[-1].item() - anchor[1]) / (held_x - anchor[0])
+                slope = min(max(slope, door[1]), door[0])
+
+                anchor = (held_x, anchor[1] + slope * (held_x - anchor[0]))
+                data.replace(*anchor)
+                data.append(x, y)
+                dx = x - anchor[0]
+
+                if dx > 0:
+                    door = (
+                        (y + deviation - anchor[1]) / dx,
+                        (y - deviation - anchor[1]) / dx
+                    )
+                else:
+                    anchor = (x, y)
+                    door = None
+
+        self._anchor = anchor
+        self._door = door
+
+        if len(xs) > 0:
+            self._prev_x = xs[-1]
+            self._prev_y = ys[-1]
+
+    def get (self, start = None, interval = None, max_points = None, aggregate = "envelope"):
+        """
+        Returns a list of (time, value) pairs for the requested period.
+
+        If max_points is given and aggregated levels are being kept
+        (see Archive.levels), the data are taken from the coarsest level
+        that still provides at least max_points points. aggregate selects
+        the minimum and maximum ("envelope") or the mean ("mean") of
+        each bucket.
+        """
 
-    def get (self, start = None, interval = None):
         start, interval = _prepare(start, interval)
 
         # Nothing in archive
         if self._prev_x is None:
             return []
 
+        if max_points is not None and self._pyramid is not None:
+            if start is None:
+                start = self._x[0]
+                interval = self._prev_x - start
+
+            level = self._pyramid.level_for(interval or 0, max_points, aggregate)
+
+            if level is not None:
+                x, y = level.get(start, start + interval, aggregate)
+
+                if len(x) > 0:
+                    return _get(x, y, x[-1], x[0], start, interval)
+
         return _get(self._x, self._y, self._prev_x, self._x[0], start, interval)
 
+    def view (self, start = None, interval = None):
+        """
+        Returns (times, values) NumPy arrays covering the requested
+        period. These are views onto the archive, not copies, and
+        are only valid until the next push().
+        """
+
+        start, interval = _prepare(start, interval)
+
+        return _view(self._x, self._y, start, interval)
+
     def at (self, time):
         val = self.get(time, 0)
 
@@ -206,16 +592,113 @@ class Archive (object):
 
 
 class StringArchive (Archive):
+    """
+    Archive for non-numeric variables (e.g. status or mode strings).
+
+    Only changes of value are stored: each as a time and an integer
+    code, with a table of the distinct values seen. A change costs
+    12 bytes however long the value is.
+    """
+
+    threshold_factor = None
 
     def __init__ (self, variable):
-        Archive.__init__(self)
+        self._symbols = []
+        self._codes = {}
+
+        Archive.__init__(self, np.int32)
         self._variable = variable
 
+    @property
+    def symbols (self):
+        """The distinct values stored in the archive, indexed by code."""
+
+        return self._symbols
+
+    def _encode (self, value):
+        try:
+            return self._codes[value]
+        except KeyError:
+            code = self._codes[value] = len(self._symbols)
+            self._symbols.append(value)
+
+            return code
+
     def push (self, x, y):
-        pass
+        # Ignore data points at times earlier than the most recent reset.
+        if x < self._zero:
+            return
+
+        code = self._encode(y)
+
+        if code != self._prev_y:
+            self._data.append(x, code)
+            self._prev_x = x
+            self._prev_y = code
+
+    def push_many (self, xs, ys):
+        xs = np.asarray(xs, np.float64)
+
+        if len(xs) == 0:
+            return
+
+        encode = self._encode
+        codes = np.fromiter((encode(y) for y in ys), np.int32, len(xs))
+
+        # Ignore data points at times earlier than the most recent reset.
+        if xs[0] < self._zero:
+            keep = xs >= self._zero
+            xs = xs[keep]
+            codes = codes[keep]
+
+            if len(xs) == 0:
+                return
+
+        prev = np.empty(len(codes), np.int64)
+        prev[0] = -1 if self._prev_y is None else self._prev_y
+        prev[1:] = codes[:-1]
+        changed = codes != prev
+
+        if changed.any():
+            self._data.extend(xs[changed], codes[changed])
+            self._prev_x = xs[changed][-1].item()
+            self._prev_y = codes[changed][-1].item()
+
+    def get (self, start = None, interval = None, max_points = None, aggregate = None):
+        start, interval = _prepare(start, interval)
+
+        # Nothing in archive
+        if self._prev_x is None:
+            return []
+
+        symbols = self._symbols
+
+        return [
+            (x, symbols[code])
+            for x, code in _get(self._x, self._y, self._prev_x, self._x[0], start, interval)
+        ]
+
+    def view (self, start = None, interval = None):
+        """
+        Returns (times, values) NumPy arrays covering the requested
+        period. The times are a view onto the archive; the values are
+        decoded into a new object array.
+        """
+
+        x, codes = Archive.view(self, start, interval)
+        symbols = np.empty(len(self._symbols), object)
+        symbols[:] = self._symbols
+
+        return x, symbols[codes]
 
     def at (self, time):
-        return "StringArchive.at not implemented" # _at(self.get(time, 0), time)
+        # Values are held until the next change.
+        if self._prev_x is None:
+            return ""
+
+        i = _lower_bound(self._x, time)
+
+        return self._symbols[self._y[i if i is not None else 0]]
 
 
 _default_alias_counters = {}
@@ -250,6 +733,22 @@ class BaseVariable (EventEmitter):
     def get_value (self):
         return self.value
 
+    def interp (self, start, interval, step):
+        """
+        Returns the value of the variable every {step} seconds over a
+        particular time period, as a NumPy array.
+
+        start and interval are as for get(). The corresponding times
+        are given by timerange(start, interval, step).
+        """
+
+        start, interval = _prepare(start, interval)
+
+        return self._resample(timerange(start, interval, step))
+
+    def _resample (self, grid):
+        raise NotImplementedError
+
     def __str__ (self):
         return str(self.get_value())
 
@@ -276,9 +775,22 @@ class BaseVariable (EventEmitter):
 
 _numeric_types = (int, float, complex)
 
+
 class Variable (BaseVariable):
     length = 30 # in seconds
 
+    # How interp() fills in between stored points: "linear" or "step".
+    # Non-numeric variables always use "step".
+    interpolation = "linear"
+
+    @property
+    def _x (self):
+        return self._data.x
+
+    @property
+    def _y (self):
+        return self._data.y
+
     def __init__ (self, type, value = None):
         self.alias = _default_alias(self)
 
@@ -286,11 +798,11 @@ class Variable (BaseVariable):
         self._value = None
         self._type = type
 
-        self._x = []
-        self._y = []
+        # Recent data (at least {length} seconds)
+        self._data = Series(type)
 
         if type in _numeric_types:
-            self._archive = Archive()
+            self._archive = Archive(type)
         else:
             self._archive = StringArchive(self)
 
@@ -304,14 +816,11 @@ class Variable (BaseVariable):
         Empty the variable of all stored data.
         """
 
-        if self._value is None:
-            self._x = []
-            self._y = []
-        else:
-            self._time = now()
+        self._data.clear()
 
-            self._x = [self._time]
-            self._y = [self._value]
+        if self._value is not None:
+            self._time = now()
+            self._data.append(self._time, self._value)
 
         self._archive.truncate()
 
@@ -321,7 +830,7 @@ class Variable (BaseVariable):
     def set (self, value):
         self._push(value)
 
-    def get (self, start = None, interval = None):
+    def get (self, start = None, interval = None, max_points = None):
         """
         Returns the value of the variable over a particular time period.
 
@@ -336,21 +845,58 @@ class Variable (BaseVariable):
 
         If start < 0, then this number of seconds is subtracted
         from the current time.
+
+        If max_points is given, long periods may be returned at reduced
+        resolution (see Archive.get).
         """
 
         if start is None and interval is None:
-            return self._archive.get()
+            return self._archive.get(max_points = max_points)
 
         if start < self._x[0]:
-            return self._archive.get(start, interval)
+            return self._archive.get(start, interval, max_points)
 
         start, interval = _prepare(start, interval)
 
         return _get(self._x, self._y, self._time, self._x[0], start, interval)
 
+    def view (self, start = None, interval = None):
+        """
+        Returns the data for a particular time period as a pair of
+        NumPy arrays (times, values), without copying.
+
+        The arguments are as for get(), but the start and end points
+        are not filled in: the arrays run from the last point at or
+        before start to the first point at or after start + interval.
+        The arrays are only valid until the variable next changes.
+        """
+
+        if start is None and interval is None:
+            return self._archive.view()
+
+        start, interval = _prepare(start, interval)
+
+        if len(self._data) == 0 or start < self._x[0]:
+            return self._archive.view(start, interval)
+
+        return _view(self._x, self._y, start, interval)
+
     def at (self, time):
+        # Non-numeric values cannot be interpolated.
+        if self._type not in _numeric_types:
+            return self._archive.at(time)
+
         return _at(self.get(time, 0), time)
 
+    def _resample (self, grid):
+        if len(grid) == 0:
+            return np.empty(0)
+
+        x, y = self.view(grid[0], grid[-1] - grid[0])
+        hold = self.interpolation == "step" or self._type not in _numeric_types
+
+        return _interp_grid(x, y, grid, hold)
+
     def _push (self, value, time = None):
         if value is None:
             return
@@ -365,21 +911,19 @@ class Variable (BaseVariable):
 
         # Only store changes
         if self._value == value \
-        and len(self._x) > 2 \
+        and len(self._data) > 2 \
         and self._y[-2] == value:
-            self._x[-1] = time
+            self._data.retime(time)
             changed = False
         else:
-            self._x.append(time)
-            self._y.append(value)
+            self._data.append(time, value)
 
             changed = True
 
             # Trim old data
-            mid = len(self._x) // 2
+            mid = len(self._data) // 2
             if time - self._x[mid] > self.length:
-                self._y = self._y[mid:]
-                self._x = self._x[mid:]
+                self._data.discard(mid)
 
         self._value = value
         self._time  = time
@@ -391,11 +935,149 @@ class Variable (BaseVariable):
         if changed:
             self.emit("change", time = time, value = value)
 
+    def _coerce_many (self, values):
+        # Convert a sequence of values into an array of this variable's type.
+        dtype = self._data.dtype
+
+        if isinstance(values, np.ndarray) and dtype != object:
+            return values.astype(dtype, copy = False)
+
+        # Lists of numbers are converted by NumPy, where this gives
+        # the same result as converting each value.
+        if dtype.kind in "if" and not isinstance(values, np.ndarray):
+            array = np.asarray(values)
+
+            if array.dtype.kind == "i" or (array.dtype.kind == "f" and dtype.kind == "f"):
+                return array.astype(dtype, copy = False)
+
+        t = self._type
+        n = len(values)
+        values = (v if type(v) is t else t(v) for v in values)
+
+        if dtype == object:
+            array = np.empty(n, object)
+            array[:] = list(values)
+            return array
+
+        return np.fromiter(values, dtype, n)
+
+    def _step_changes (self, values, times):
+        # For variables that store step changes (e.g. Properties):
+        # given a batch of values, return (values, times) containing only
+        # the changes, each preceded by the previous value at the same time.
+        values = self._coerce_many(values)
+        times = np.asarray(times, np.float64)
+
+        prev = np.empty(len(values), values.dtype)
+        prev[1:] = values[:-1]
+
+        if len(values) > 0:
+            prev[0] = self._value if self._value is not None else values[0]
+
+        changed = values != prev
+
+        if self._value is None and len(values) > 0:
+            changed[0] = True
+
+        changed = np.flatnonzero(changed)
+
+        step_values = np.empty(len(changed) * 2, values.dtype)
+        step_values[0::2] = prev[changed]
+        step_values[1::2] = values[changed]
+        step_times = np.repeat(times[changed], 2)
+
+        # There is no previous value before the very first point.
+        if self._value is None:
+            return step_values[1:], step_times[1:]
+
+        return step_values, step_times
+
+    def _push_many (self, values, times):
+        """
+        Add a batch of values (e.g. buffered history from a device)
+        in one operation.
+
+        values and times are sequences (or NumPy arrays) of equal
+        length, with times in ascending order. This is equivalent to
+        calling _push() for each value, except that a single "change"
+        event is emitted for the batch. As well as the latest time and
+        value, the event carries the "times" and "values" of the batch.
+        """
+
+        if len(values) != len(times):
+            raise ValueError("values and times must be the same length")
+
+        # Skip None values, as _push does.
+        if not (isinstance(values, np.ndarray) and values.dtype != object) \
+        and None in values:
+            times = [t for t, v in zip(times, values) if v is not None]
+            values = [v for v in values if v is not None]
+
+        if len(values) == 0:
+            return
+
+        values = self._coerce_many(values)
+        times = np.asarray(times, np.float64)
+
+        if (self._time is not None and times[0] < self._time) \
+        or (times[1:] < times[:-1]).any():
+            raise Exception("Cannot insert values earlier than latest value")
+
+        # Only store changes: drop any point which has the same value
+        # as the points either side of it (see _push). As in _push, this
+        # only applies once more than two points have been stored.
+        length = len(self._data)
+        n_prev = min(length, 2)
+        y = np.concatenate((self._y[length - n_prev:], values))
+        interior = np.zeros(len(y), bool)
+        interior[1:-1] = (y[1:-1] == y[:-2]) & (y[1:-1] == y[2:])
+        interior[:max(0, 2 - length + n_prev)] = False
+
+        keep = ~interior[n_prev:]
+        kept = int(np.count_nonzero(keep))
+        replaced = int(n_prev > 0 and interior[n_prev - 1])
+
+        if replaced:
+            self._data.pop()
+
+        if kept == len(values):
+            self._data.extend(times, values)
+        else:
+            self._data.extend(times[keep], values[keep])
+
+        # Trim old data
+        cut = _lower_bound(self._x, times[-1] - self.length)
+        if cut:
+            self._data.discard(cut)
+
+        time = times[-1].item()
+        value = _item(values[-1])
+
+        self._value = value
+        self._time  = time
+
+        self._archive.push_many(times, values)
+        self._log_many(times, values)
+
+        # Trigger change event
+        if kept > replaced:
+            self.emit("change", time = time, value = value, times = times, values = values)
+
     # Todo: Put these in event watchers in the experiment.
     def _log (self, time, value):
         if self._log_file is not None:
             self._log_file.write(time, value)
 
+    def _log_many (self, times, values):
+        if self._log_file is not None:
+            try:
+                write_many = self._log_file.write_many
+            except AttributeError:
+                for time, value in zip(times.tolist(), values.tolist()):
+                    self._log_file.write(time, value)
+            else:
+                write_many(times.tolist(), values.tolist())
+
     def setLogFile (self, logFile):
         if self._log_file is not None:
             self._log_file.close()
@@ -431,12 +1113,401 @@ class Constant (BaseVariable):
     def at (self, time):
         return self._value
 
+    def _resample (self, grid):
+        if isinstance(self._value, _numeric_types + (bool,)):
+            return np.full(len(grid), self._value)
+
+        return np.full(len(grid), self._value, object)
+
     def serialize (self):
         return str(self._value)
 
 
+_unset = object()
+
+
+class _Program (object):
+    """
+    An expression tree compiled into flat Python code.
+
+    Every leaf variable and every expression node has a slot in
+    {cache}. For each leaf there is a generated function that
+    re-evaluates only the nodes that depend on that leaf.
+    """
+
+    __slots__ = ("cache", "leaves", "full", "root")
+
+    def __init__ (self, expr):
+        slots = {}
+        namespace = {}
+        leaves = []
+        nodes = []
+        depends = {}
+
+        def visit (var):
+            # Returns the source for the value of {var}.
+            key = id(var)
+
+            if key in slots:
+                return "c[{:d}]".format(slots[key])
+
+            if isinstance(var, Constant):
+                name = "k{:d}".format(len(namespace))
+                namespace[name] = var._value
+
+                return name
+
+            if isinstance(var, Expression):
+                args = [visit(o) for o in var._operands]
+                slot = slots[key] = len(slots)
+                depends[slot] = set().union(*(
+                    depends.get(slots.get(id(o)), ()) for o in var._operands
+                ))
+                nodes.append((slot, var._source(slot, args, namespace)))
+            else:
+                slot = slots[key] = len(slots)
+                depends[slot] = { slot }
+                leaves.append((slot, var))
+
+            return "c[{:d}]".format(slot)
+
+        self.root = int(visit(expr)[2:-1])
+
+        def function (name, lines):
+            return ["def {:s} (c):".format(name)] + \
+                ["    " + line for line in lines] + ["    pass", ""]
+
+        source = function("full", [l for slot, code in nodes for l in code])
+
+        for slot, leaf in leaves:
+            source += function("path{:d}".format(slot), [
+                l for node, code in nodes if slot in depends[node] for l in code
+            ])
+
+        exec(compile("\n".join(source), "<" + expr.alias + ">", "exec"), namespace)
+
+        self.cache = [_unset] * len(slots)
+        self.full = namespace["full"]
+        self.leaves = [
+            (slot, leaf, namespace["path{:d}".format(slot)])
+            for slot, leaf in leaves
+        ]
+
+
+def _fallback (operatorFn, lhs, rhs):
+    # Returns a function to apply operatorFn to string versions of
+    # the values if it fails and either operand is a string. (This
+    # does not refer to the expression itself, so that compiled
+    # expressions do not form reference cycles.)
+    def fallback (l, r):
+        if lhs.type is str or rhs.type is str:
+            return operatorFn(str(l), str(r))
+        else:
+            raise
+
+    return fallback
+
+
+def _history_of (variable):
+    # Returns (times, values, final) for an operand of an expression.
+    if isinstance(variable, Expression):
+        return variable._history()
+
+    if isinstance(variable, Constant):
+        return None, None, np.inf
+
+    try:
+        x, y = variable._archive.view()
+    except AttributeError:
+        return np.empty(0), np.empty(0), -np.inf
+
+    # Only the latest stored point may still be replaced.
+    final = x[-1] if len(x) else -np.inf
+
+    # Points after it (e.g. not yet stored by the archive's
+    # compression), up to the current value, are in the live data.
+    try:
+        live_x, live_y = variable._x, variable._y
+    except AttributeError:
+        return x, y, final
+
+    i = int(np.searchsorted(live_x, final, "right"))
+
+    if i < len(live_x):
+        x = np.concatenate((x, live_x[i:]))
+        y = np.concatenate((y, live_y[i:]))
+
+    return x, y, final
+
+
 class Expression (BaseVariable):
-    pass
+    """
+    An operation on one or two variables.
+
+    An expression listens for changes to the variables at the leaves
+    of its tree, and on each change re-evaluates only the operations
+    that depend on the changed variable, emitting a single change
+    event. An expression that is used within another expression and
+    has no listeners of its own does not listen for changes: its
+    value is evaluated when requested.
+    """
+
+    _program = None
+    _attached = False
+    _strong = False
+    _history_key = None
+
+    @property
+    def value (self):
+        if not self._attached:
+            self._refresh()
+
+        return self._value
+
+    @property
+    def type (self):
+        if self._type is None:
+            value = self.value
+
+            if value is not None:
+                self._type = type(value)
+
+        return self._type
+
+    def on (self, name, function = None, weak = False):
+        if function is None:
+            return lambda function: self.on(name, function, weak)
+
+        if name in ("change", "all"):
+            self._attach()
+
+        result = BaseVariable.on(self, name, function, weak)
+
+        if name in ("change", "all"):
+            self._hold(True)
+
+        return result
+
+    def off (self, name = None, function = None):
+        BaseVariable.off(self, name, function)
+
+        if not (self.listeners("change") or self.listeners("all")):
+            self._hold(False)
+
+    def _attach (self):
+        if self._attached:
+            return
+
+        self._program = self._program or _Program(self)
+        self._attached = True
+
+        # Variables refer to the expression weakly, so that expressions
+        # which are no longer in use do not go on being evaluated,
+        # unless it has listeners of its own (see _hold()).
+        for slot, leaf, path in self._program.leaves:
+            leaf.on("change", self._changed, weak = not self._strong)
+
+        self._refresh()
+
+    def _hold (self, strong):
+        # Subscribe to the leaves strongly while the expression has
+        # listeners, so that an expression referred to only by its
+        # leaves, e.g. (a > 2).on("change", f), is kept alive.
+        if strong == self._strong:
+            return
+
+        self._strong = strong
+
+        if self._attached:
+            for slot, leaf, path in self._program.leaves:
+                leaf.off("change", self._changed)
+                leaf.on("change", self._changed, weak = not strong)
+
+    def _detach (self):
+        # Stop listening for changes, unless there are listeners.
+        if not self._attached or self.listeners("change") or self.listeners("all"):
+            return
+
+        self._attached = False
+
+        for slot, leaf, path in self._program.leaves:
+            leaf.off("change", self._changed)
+
+    def _refresh (self):
+        program = self._program = self._program or _Program(self)
+        c = program.cache
+        update = None
+
+        for slot, leaf, path in program.leaves:
+            value = leaf.value
+            old = c[slot]
+
+            if value is old or (value == old and type(value) is type(old)):
+                continue
+
+            c[slot] = value
+            update = path if update is None else program.full
+
+        if update is not None:
+            try:
+                update(c)
+            except:
+                # Re-evaluate everything next time.
+                for slot, leaf, path in program.leaves:
+                    c[slot] = _unset
+
+                raise
+
+        self._value = c[program.root]
+
+    def _changed (self, data):
+        self._refresh()
+
+        # Let go of the leaves once all (weak) listeners have gone.
+        if not self.emit("change", time = data['time'], value = self._value) \
+        and self._strong:
+            self._hold(False)
+
+    def get (self, start = None, interval = None):
+        """
+        Returns the value of the expression over a particular time
+        period, as for Variable.get().
+
+        The history of the expression is evaluated from the archives
+        of its variables: there is a point at each time when one of
+        the variables changed.
+        """
+
+        x, y, final = self._history()
+
+        if len(x) == 0:
+            return []
+
+        start, interval = _prepare(start, interval)
+
+        return _get(x, y, x[-1], x[0], start, interval)
+
+    def get_archive (self, store = True):
+        x, y, final = self._history()
+
+        return list(zip(_tolist(x), _tolist(y)))
+
+    def at (self, time):
+        return _at(self.get(time, 0), time)
+
+    def _history (self):
+        # Returns (times, values, final) arrays for the whole history
+        # of the expression. Points earlier than {final} will not change
+        # as more data arrive, so only later points are re-evaluated on
+        # the next call.
+        key = tuple(
+            getattr(getattr(leaf, "_archive", None), "_zero", None)
+            for slot, leaf, path in self._program.leaves
+        )
+
+        # Variables have been truncated.
+        if key != self._history_key:
+            self._history_key = key
+            self._history_cache = (np.empty(0), np.empty(0), -np.inf)
+
+        cache_x, cache_y, start = self._history_cache
+        operands = [_history_of(o) for o in self._operands]
+        final = min(h[2] for h in operands)
+
+        x, y = self._merge(operands, start)
+
+        i = int(np.searchsorted(cache_x, start, "left"))
+
+        if i > 0:
+            x = np.concatenate((cache_x[:i], x))
+            y = np.concatenate((cache_y[:i], y))
+
+        self._history_cache = (x, y, final)
+
+        return x, y, final
+
+    def _merge (self, operands, start):
+        # Evaluate the expression at each point of the operands
+        # from time {start}. Each operand's value is carried forward
+        # to the points of the others (a sort-merge join).
+        series = []
+
+        for x, y, final in operands:
+            if x is not None:
+                # Include the preceding point for its value at {start}.
+                i = max(0, int(np.searchsorted(x, start, "left")) - 1)
+                series.append((x[i:], y[i:]))
+
+        if len(series) == 0:
+            return np.empty(0), np.empty(0)
+
+        if len(series) == 1:
+            merged_x = series[0][0]
+            index = [np.arange(len(merged_x))]
+
+        else:
+            # One point per time, so that operands with points at the
+            # same time are combined only at their latest values.
+            merged_x = np.unique(np.concatenate([x for x, y in series]))
+
+            # Index of the latest point of each operand at each time.
+            index = [np.searchsorted(x, merged_x, "right") - 1 for x, y in series]
+
+        # Skip times before every operand has a value.
+        keep = merged_x >= start
+
+        for i in index:
+            keep &= i >= 0
+
+        merged_x = merged_x[keep]
+        values = []
+        series = iter(series)
+        index = iter(index)
+
+        for (x, y, final), operand in zip(operands, self._operands):
+            if x is None:
+                values.append(operand._resample(merged_x))
+            else:
+                values.append(next(series)[1][next(index)[keep]])
+
+        return merged_x, self._apply(values)
+
+    def _resample (self, grid):
+        return self._apply([o._resample(grid) for o in self._operands])
+
+    def _apply (self, values):
+        # Apply the operation to arrays of operand values.
+        with np.errstate(all = "ignore"):
+            try:
+                return self._array_op(*values)
+            except TypeError:
+                if any(o.type is str for o in self._operands):
+                    return self._array_op(*[_str_array(v) for v in values])
+                else:
+                    raise
+
+    def _source (self, slot, args, namespace):
+        # Returns lines of Python that evaluate this operation
+        # into c[slot], given the sources of the operands.
+        op = "op{:d}".format(slot)
+        namespace[op] = self._op
+
+        if len(args) == 1:
+            return [
+                "x = " + args[0],
+                "c[{:d}] = None if x is None else {:s}(x)".format(slot, op),
+            ]
+
+        fallback = "fb{:d}".format(slot)
+        namespace[fallback] = _fallback(self._op, *self._operands)
+
+        return [
+            "l = {:s}; r = {:s}".format(*args),
+            "if l is None or r is None: c[{:d}] = None".format(slot),
+            "else:",
+            "    try: c[{:d}] = {:s}(l, r)".format(slot, op),
+            "    except TypeError: c[{:d}] = {:s}(l, r)".format(slot, fallback),
+        ]
 
 # Variable should emulate a numerical variable
 _unary_ops = (
@@ -453,6 +1524,13 @@ _binary_ops = (
     (" and ", lambda a, b: a and b), (" or ", lambda a, b: a or b),
 )
 
+# Operators without an element-wise equivalent in the operator module
+_array_ops = {
+    " not ": np.logical_not,
+    " and ": np.logical_and,
+    " or ": np.logical_or,
+}
+
 # http://stackoverflow.com/questions/100003/what-is-a-metaclass-in-python/6581949#6581949
 def _def_binary_op (symbol, operatorFn):
     if symbol in (" and ", " or "):
@@ -469,112 +1547,24 @@ def _def_binary_op (symbol, operatorFn):
             attrName = "__" + operatorFn.__name__ + "__"
             rattrName = "__r" + operatorFn.__name__ + "__"
 
+    # Element-wise equivalent of operatorFn for NumPy arrays
+    arrayFn = _array_ops.get(symbol, operatorFn)
+
     def init (self, lhs, rhs):
         self.alias = _default_alias(self)
 
-        self._archive_x = None
-        self._archive_y = None
-
         lhs = lhs if isinstance(lhs, BaseVariable) else Constant(lhs)
         rhs = rhs if isinstance(rhs, BaseVariable) else Constant(rhs)
         self._lhs = lhs
         self._rhs = rhs
+        self._operands = (lhs, rhs)
+        self._type = None
 
-        if lhs.value is not None and rhs.value is not None:
-            try:
-                self._value = operatorFn(lhs.value, rhs.value)
-            except TypeError:
-                if lhs.type is str or rhs.type is str:
-                    self._value = operatorFn(str(lhs.value), str(rhs.value))
-                else:
-                    raise
-
-            self._type = type(self._value)
-        else:
-            self._value = None
-            self._type = None
-
-        lhs.on("change", self._changed)
-        rhs.on("change", self._changed)
-
-    def _changed (self, data):
-        try:
-            self._value = operatorFn(self._lhs.value, self._rhs.value)
-        except TypeError:
-            if self._lhs.type is str or self._rhs.type is str:
-                self._value = operatorFn(str(self._lhs.value), str(self._rhs.value))
-            else:
-                raise
-
-        if self._archive_x is not None:
-            self._archive_x.append(data['time'])
-            self._archive_y.append(self._value)
+        for operand in self._operands:
+            if isinstance(operand, Expression):
+                operand._detach()
 
-        self.emit("change", time = data['time'], value = self._value)
-
-    def get_type (self):
-        if self._type is None and self._value is not None:
-            self._type = type(self._value)
-
-        return self._type
-
-    def get (self, start = None, interval = None):
-        if self._archive_x is None:
-            self.get_archive()
-
-        return _get(self._archive_x, self._archive_y, self._archive_x[-1], self._archive_x[0], start, interval)
-
-    def at (self, time):
-        return _at(self.get(time, 0), time)
-
-    def get_archive (self, store = True):
-        if self._archive_x is not None:
-            return list(zip(self._archive_x, self._archive_y))
-
-        x = []
-        y = []
-
-        try:
-            lhsa = self._lhs.get_archive(store = False)
-        except AttributeError:
-            lhsa = self._lhs.get()
-
-        try:
-            rhsa = self._rhs.get_archive(store = False)
-        except AttributeError:
-            rhsa = self._rhs.get()
-
-        if self._lhs.type is str or self._rhs.type is str:
-            def op (l, r):
-                return operatorFn(l, r)
-        else:
-            def op (l, r):
-                return operatorFn(str(l), str(r))
-
-        r_max = len(rhsa)
-        l_max = len(rhsa)
-        r_i = l_i = 0
-
-        while r_i < r_max and l_i < l_max:
-            l_t, c_l = lhs[l_i]
-
-            while rhs[r_i][0] < l_t:
-                x.append(rhs[r_i][0])
-                y.append(op(c_l, rhs[r_i][0]))
-                r_i += 1
-
-            r_t, c_r = rhs[r_i]
-
-            while lhs[r_i][0] < r_t:
-                x.append(rhs[l_i][0])
-                y.append(op(lhs[l_i][0], c_r))
-                l_i += 1
-
-        if store:
-            self._archive_x = x
-            self._archive_y = y
-
-        return list(zip(x, y))
+        self._attach()
 
     def serialize (self):
         return "(" + \
@@ -586,12 +1576,9 @@ def _def_binary_op (symbol, operatorFn):
         (Expression,),
         {
             "__init__": init,
-            "type": property(get_type),
+            "_op": staticmethod(operatorFn),
+            "_array_op": staticmethod(arrayFn),
             "serialize": serialize,
-            "_changed": _changed,
-            "get_archive": get_archive,
-            "get": get,
-            "at": at
         }
     )
 
@@ -607,60 +1594,20 @@ def _def_binary_op (symbol, operatorFn):
         setattr(BaseVariable, rattrName, op_rfn)
 
 def _def_unary_op (symbol, operatorFn):
+    # Element-wise equivalent of operatorFn for NumPy arrays
+    arrayFn = _array_ops.get(symbol, operatorFn)
+
     def init (self, operand):
         self.alias = _default_alias(self)
 
         self._operand = operand
+        self._operands = (operand,)
+        self._type = None
 
-        if operand.value is not None:
-            self._value = operatorFn(operand.value)
-            self._type = type(self._value)
-        else:
-            self._value = None
-            self._type = None
+        if isinstance(operand, Expression):
+            operand._detach()
 
-        operand.on("change", self._changed)
-
-    def _changed (self, data):
-        self._value = operatorFn(self._operand.value)
-        self.emit("change", time = data['time'], value = self._value)
-
-    def get_type (self):
-        if self._type is None and self._value is not None:
-            self._type = type(self._value)
-
-        return self._type
-
-    def get (self, start = None, interval = None):
-        if self._archive_x is None:
-            self.get_archive()
-
-        return _get(self._archive_x, self._archive_y, self._archive_x[-1], self._archive_x[0], start, interval)
-
-    def at (self, time):
-        return _at(self.get(time, 0), time)
-
-    def get_archive (self, store = True):
-        if self._archive_x is not None:
-            return list(zip(self._archive_x, self._archive_y))
-
-        x = []
-        y = []
-
-        try:
-            opa = self._operand.get_archive(store = False)
-        except AttributeError:
-            opa = self._operand.get()
-
-        for o_x, o_y in opa:
-            x.append(o_x)
-            y.append(operatorFn(o_y))
-
-        if store:
-            self._archive_x = x
-            self._archive_y = y
-
-        return list(zip(x, y))
+        self._attach()
 
     def serialize (self):
         return symbol + self._operand.serialize()
@@ -668,23 +1615,23 @@ def _def_unary_op (symbol, operatorFn):
     op = operatorFn
 
     cls = type(
-        op.__name__[2:-2].capitalize() + "Expression",
+        op.__name__.strip("_").capitalize() + "Expression",
         (Expression,),
         {
             "__init__": init,
-            "type": property(get_type),
+            "_op": staticmethod(operatorFn),
+            "_array_op": staticmethod(arrayFn),
             "serialize": serialize,
-            "_changed": _changed,
-            "get_archive": get_archive,
-            "get": get,
-            "at": at
         }
     )
 
-    def op_fn (self, other):
-        return cls(self, op)
+    def op_fn (self):
+        return cls(self)
 
     setattr(BaseVariable, op.__name__, op_fn)
 
+    if op is not operator.not_:
+        setattr(BaseVariable, "__" + op.__name__ + "__", op_fn)
+
 [_def_unary_op(symbol, op) for symbol, op in _unary_ops]
 [_def_binary_op(symbol, op) for symbol, op in _binary_ops]
@@ -1,4 +1,5 @@
 # System Imports
+from collections import deque
 import math
 
 # Sibling Imports
@@ -27,13 +28,13 @@ _counter = _Counter()
 
 
 class Function (data.Variable):
-    def __init__ (self, expr):
-        if not isinstance(expr, data.Variable):
+    def __init__ (self, expr, type = None):
+        if not isinstance(expr, data.BaseVariable):
             raise data.errors.InvalidType
 
         self._expr = expr
 
-        data.Variable.__init__(self, expr.type)
+        data.Variable.__init__(self, type or expr.type)
 
         #if alias is None:
         self.alias = _counter.alias(self.__class__.__name__)
@@ -61,6 +62,11 @@ class Function (data.Variable):
     def interp (self, start, interval, step):
         raise NotImplementedError
 
+    def _resample (self, grid):
+        # Allow functions to be used within expressions.
+        step = grid[1] - grid[0] if len(grid) > 1 else 1
+        return self.interp(grid[0], (len(grid) - 0.5) * step, step)
+
     def serialize (self):
         raise NotImplementedError
 
@@ -76,11 +82,10 @@ class FramedManipulation (Function):
 
 class Differential (FramedManipulation):
     def interp (self, start, interval, step):
-        n = max(1, int(self._frame / interval))
-        return np.gradient(self._expr.interp(start, interval, step), n)
+        return np.gradient(self._expr.interp(start, interval, step), step)
 
     def get_value (self):
-        return self.get(-5, 5, 0.1).tolist().pop()
+        return self.interp(-5, 5, 0.1).tolist().pop()
 
     def serialize (self):
         return " Diff (" + self._expr.serialize() + ")"
@@ -88,16 +93,15 @@ class Differential (FramedManipulation):
 
 class SecondDifferential (Differential):
     def interp (self, start, interval, step):
-        n = max(1, int(self._frame / interval))
-        diff1 = np.gradient(self._expr.interp(start, interval, step), n)
-        return np.gradient(diff1, n)
+        diff1 = np.gradient(self._expr.interp(start, interval, step), step)
+        return np.gradient(diff1, step)
 
     def serialize (self):
         return " 2ndDiff (" + self._expr.serialize() + ")"
 
 
 class Max (FramedManipulation):
-    def get (self, start, interval, step):
+    def interp (self, start, interval, step):
         new_x = data.timerange(start, interval, step)
         m = np.max(self._expr.interp(-self._frame, self._frame, step))
         return np.ones_like(new_x) * m
@@ -110,7 +114,7 @@ class Max (FramedManipulation):
 
 
 class Min (FramedManipulation):
-    def get (self, start, interval, step):
+    def interp (self, start, interval, step):
         new_x = data.timerange(start, interval, step)
         m = np.min(self._expr.interp(-self._frame, self._frame, step))
         return np.ones_like(new_x) * m
@@ -128,14 +132,14 @@ class Smooth (FramedManipulation):
 
         self._frame = float(frame)
         self._window_len = len(window)
-        self._half_window_len = (self._window_len - 1) / 2
+        self._half_window_len = (self._window_len - 1) // 2
         self._window = window / window.sum() # Normalised
 
-        if int(self._half_window_len) != self._half_window_len:
+        if self._window_len % 2 != 1:
             raise Exception ("Smooth(): length of supplied window must be 2n+1")
 
-    def get (self, start, interval, step):
-
+    def interp (self, start, interval, step):
+        start, interval = data._prepare(start, interval)
         new_x = data.timerange(start, interval, step)
 
         # Get the slice of y according to frame.
@@ -156,7 +160,7 @@ class Smooth (FramedManipulation):
     def get_value (self):
         try:
             # Cast is required to avoid getting a numpy.float64 result!
-            return float(self.get(-self._frame, self._frame, 0.1)[-1])
+            return float(self.interp(-self._frame, self._frame, 0.1)[-1])
         except IndexError:
             return None
 
@@ -166,9 +170,204 @@ class Smooth (FramedManipulation):
 ## average?
 
 
+class Rolling (Function):
+    """
+    Base class for aggregates over a moving window, updated as each
+    new value of the expression arrives.
+
+    The window holds the values received in the last {frame} seconds,
+    together with the value in effect at the start of the window. Each
+    update costs O(1) (amortised), and the result is stored like any
+    other variable so it can be used within expressions.
+    """
+
+    def __init__ (self, expr, frame = 60.0, title = "", alias = None, type = None):
+        # The type of an expression is not known until it has a value.
+        Function.__init__(self, expr, type or expr.type or float)
+
+        if frame <= 0:
+            raise ValueError("frame must be positive")
+
+        self.title = title
+        self._frame = float(frame)
+        self._window = deque()
+        self._count = 0
+
+        if alias is not None:
+            self.alias = alias
+
+        expr.on("change", self._changed)
+
+        if expr.value is not None:
+            self._changed({
+                "time": getattr(expr, "_time", None) or data.now(),
+                "value": expr.value
+            })
+
+    def get_value (self):
+        return self._value
+
+    get = data.Variable.get
+    interp = data.BaseVariable.interp
+    _resample = data.Variable._resample
+
+    def _changed (self, event):
+        try:
+            times = data._tolist(event["times"])
+            values = data._tolist(event["values"])
+        except KeyError:
+            times = [event["time"]]
+            values = [event["value"]]
+
+        add = self._add
+        pairs = [(t, v) for t, v in zip(times, values) if v is not None]
+        times = [t for t, v in pairs]
+        results = [add(t, v) for t, v in pairs]
+
+        if len(results) == 1:
+            self._push(results[0], times[0])
+        elif len(results) > 1:
+            self._push_many(results, times)
+
+    def _add (self, time, value):
+        window = self._window
+        window.append((time, value))
+        self._insert(self._count, value)
+        self._count += 1
+
+        # Drop values that were replaced before the start of the window.
+        start = time - self._frame
+        removed = self._count - len(window)
+
+        while len(window) > 1 and window[1][0] <= start:
+            self._remove(removed, window.popleft()[1])
+            removed += 1
+
+        return self._result()
+
+    def _insert (self, index, value):
+        raise NotImplementedError
+
+    def _remove (self, index, value):
+        raise NotImplementedError
+
+    def _result (self):
+        raise NotImplementedError
+
+    def serialize (self):
+        return " " + self.__class__.__name__ + " (" + self._expr.serialize() + ", " + str(self._frame) + ")"
+
+
+class _RollingExtremum (Rolling):
+    # Candidates for the result, in order of arrival: each is
+    # better than all of those that arrived after it.
+    def __init__ (self, expr, frame = 60.0, title = "", alias = None):
+        self._candidates = deque()
+
+        Rolling.__init__(self, expr, frame, title, alias)
+
+    def _insert (self, index, value):
+        candidates = self._candidates
+        beats = self._beats
+
+        while candidates and not beats(candidates[-1][1], value):
+            candidates.pop()
+
+        candidates.append((index, value))
+
+    def _remove (self, index, value):
+        if self._candidates[0][0] == index:
+            self._candidates.popleft()
+
+    def _result (self):
+        return self._candidates[0][1]
+
+
+class RollingMax (_RollingExtremum):
+    _beats = staticmethod(lambda a, b: a > b)
+
+
+class RollingMin (_RollingExtremum):
+    _beats = staticmethod(lambda a, b: a < b)
+
+
+class RollingMean (Rolling):
+    """
+    Mean of the values in the window.
+
+    Running sums are kept relative to the first value received,
+    to limit rounding error when the variation is small compared
+    with the values themselves.
+    """
+
+    def __init__ (self, expr, frame = 60.0, title = "", alias = None):
+        self._shift = None
+        self._sum = 0.0
+        self._sum_sq = 0.0
+
+        Rolling.__init__(self, expr, frame, title, alias, float)
+
+    def _insert (self, index, value):
+        if self._shift is None:
+            self._shift = value
+
+        value -= self._shift
+        self._sum += value
+        self._sum_sq += value * value
+
+    def _remove (self, index, value):
+        value -= self._shift
+        self._sum -= value
+        self._sum_sq -= value * value
+
+    def _result (self):
+        return self._shift + self._sum / len(self._window)
+
+
+class RollingStd (RollingMean):
+    """
+    Standard deviation (sample) of the values in the window.
+    """
+
+    def _result (self):
+        n = len(self._window)
+
+        if n < 2:
+            return 0.0
+
+        variance = (self._sum_sq - self._sum * self._sum / n) / (n - 1)
+
+        return math.sqrt(max(variance, 0.0))
+
+
+class EWMA (Rolling):
+    """
+    Exponentially weighted moving average with a time constant
+    of {frame} seconds. Irregularly spaced values are weighted by
+    the time elapsed since the previous value.
+    """
+
+    def __init__ (self, expr, frame = 60.0, title = "", alias = None):
+        self._average = None
+        self._last_time = None
+
+        Rolling.__init__(self, expr, frame, title, alias, float)
+
+    def _add (self, time, value):
+        if self._average is None:
+            self._average = float(value)
+        else:
+            alpha = 1 - math.exp(-(time - self._last_time) / self._frame)
+            self._average += alpha * (value - self._average)
+
+        self._last_time = time
+
+        return self._average
+
+
 class Square (Function):
-    def get (self, start, interval, step):
-        return np.square(self._expr.get(start, interval, step))
+    def interp (self, start, interval, step):
+        return np.square(self._expr.interp(start, interval, step))
 
     def get_value (self):
         return self._expr.value ** 2
@@ -178,7 +377,7 @@ class Square (Function):
 
 
 class Sqrt (Function):
-    def get (self, start, interval, step):
+    def interp (self, start, interval, step):
         return np.sqrt(self._expr.interp(start, interval, step))
 
     def get_value (self):
@@ -189,7 +388,7 @@ class Sqrt (Function):
 
 
 class Abs (Function):
-    def get (self, start, interval, step):
+    def interp (self, start, interval, step):
         return np.absolute(self._expr.interp(start, interval, step))
 
     def get_value (self):
@@ -200,7 +399,7 @@ class Abs (Function):
 
 
 class Sin (Function):
-    def get (self, start, interval, step):
+    def interp (self, start, interval, step):
         return np.sin(self._expr.interp(start, interval, step))
 
     def get_value (self):
@@ -211,7 +410,7 @@ class Sin (Function):
 
 
 class Cos (Function):
-    def get (self, start, interval, step):
+    def interp (self, start, interval, step):
         return np.cos(self._expr.interp(start, interval, step))
 
     def get_value (self):
@@ -222,7 +421,7 @@ class Cos (Function):
 
 
 class Tan (Function):
-    def get (self, start, interval, step):
+    def interp (self, start, interval, step):
         return np.tan(self._expr.interp(start, interval, step))
 
     def get_value (self):
@@ -0,0 +1,314 @@
+"""
+Column-oriented storage for (time, value) data.
+
+Times are always stored as float64. Values of numeric types are stored
+in a NumPy array of the matching dtype, other types in an object array.
+A float Series therefore costs 16 bytes per point, and the x and y
+properties are views onto the stored data (no copying).
+
+Views are only valid until the Series is next modified.
+"""
+
+# System Imports
+import builtins
+
+# NumPy
+import numpy as np
+
+
+_dtypes = {
+    float: np.float64,
+    int: np.int64,
+    bool: np.bool_,
+    complex: np.complex128,
+}
+
+
+def dtype_for (type):
+    """Return the NumPy dtype used to store values of {type}."""
+
+    try:
+        return _dtypes[type]
+    except (KeyError, TypeError):
+        pass
+
+    # NumPy scalar types (e.g. np.int32) are used as they are.
+    if isinstance(type, np.dtype) \
+    or (isinstance(type, builtins.type) and issubclass(type, np.generic)):
+        return type
+
+    return object
+
+
+class Series (object):
+    """
+    A growable buffer of (x, y) pairs, appended at the end and
+    discarded from the start.
+
+    Discarding old points only moves a cursor. The remaining data is
+    shifted back to the start of the buffer (or the buffer is enlarged)
+    when the end of the buffer is reached, so both append() and
+    discard() are amortised O(1) and the stored points always occupy
+    one contiguous block.
+    """
+
+    __slots__ = ("_x", "_y", "_head", "_tail")
+
+    min_capacity = 16
+
+    def __init__ (self, type = float, capacity = None):
+        capacity = max(capacity or 0, self.min_capacity)
+
+        self._x = np.empty(capacity, np.float64)
+        self._y = np.empty(capacity, dtype_for(type))
+        self._head = 0
+        self._tail = 0
+
+    @property
+    def x (self):
+        return self._x[self._head:self._tail]
+
+    @property
+    def y (self):
+        return self._y[self._head:self._tail]
+
+    @property
+    def dtype (self):
+        return self._y.dtype
+
+    @property
+    def nbytes (self):
+        """Memory used by the stored points (excluding spare capacity)."""
+
+        return len(self) * (self._x.itemsize + self._y.itemsize)
+
+    def __len__ (self):
+        return self._tail - self._head
+
+    def append (self, x, y):
+        if self._tail == len(self._x):
+            self._reserve(1)
+
+        self._x[self._tail] = x
+        self._y[self._tail] = y
+        self._tail += 1
+
+    def extend (self, x, y):
+        n = len(x)
+
+        if self._tail + n > len(self._x):
+            self._reserve(n)
+
+        self._x[self._tail:self._tail + n] = x
+        self._y[self._tail:self._tail + n] = y
+        self._tail += n
+
+    def retime (self, x):
+        """Move the most recent point to time {x}."""
+
+        self._x[self._tail - 1] = x
+
+    def replace (self, x, y):
+        """Replace the most recent point."""
+
+        self._x[self._tail - 1] = x
+        self._y[self._tail - 1] = y
+
+    def pop (self):
+        """Remove the most recent point."""
+
+        if self._tail > self._head:
+            self._tail -= 1
+
+    def discard (self, n):
+        """Remove the {n} oldest points."""
+
+        self._head = min(self._head + n, self._tail)
+
+        if self._head == self._tail:
+            self._head = self._tail = 0
+
+    def clear (self):
+        self._head = self._tail = 0
+
+    def _reserve (self, n):
+        length = self._tail - self._head
+        capacity = len(self._x)
+        needed = length + n
+
+        # Enough room once the discarded points are reclaimed:
+        # shift the data back to the start of the buffer.
+        if needed <= capacity // 2:
+            self._x[:length] = self._x[self._head:self._tail]
+            self._y[:length] = self._y[self._head:self._tail]
+
+        # Otherwise allocate a larger buffer.
+        else:
+            capacity = max(capacity * 2, needed)
+
+            x = np.empty(capacity, np.float64)
+            y = np.empty(capacity, self._y.dtype)
+            x[:length] = self._x[self._head:self._tail]
+            y[:length] = self._y[self._head:self._tail]
+
+            self._x = x
+            self._y = y
+
+        self._head = 0
+        self._tail = length
+
+
+class _Level (object):
+    """
+    Aggregates of a series over fixed-width time buckets.
+
+    Completed buckets are stored in three Series: the minimum and
+    maximum (each at the time they occurred) and the mean (at the
+    start of the bucket). The bucket currently being filled is kept
+    separately until a point arrives in a later bucket.
+    """
+
+    def __init__ (self, width):
+        self.width = float(width)
+
+        self.min = Series(float)
+        self.max = Series(float)
+        self.mean = Series(float)
+
+        self._bucket = None
+
+    def push (self, x, y):
+        bucket = x // self.width
+
+        if bucket != self._bucket:
+            self._close()
+
+            self._bucket = bucket
+            self._min = (x, y)
+            self._max = (x, y)
+            self._sum = y
+            self._count = 1
+
+        else:
+            if y < self._min[1]:
+                self._min = (x, y)
+            elif y > self._max[1]:
+                self._max = (x, y)
+
+            self._sum += y
+            self._count += 1
+
+    def _close (self):
+        if self._bucket is None:
+            return
+
+        self.min.append(*self._min)
+        self.max.append(*self._max)
+        self.mean.append(self._bucket * self.width, self._sum / self._count)
+
+    def __len__ (self):
+        return len(self.mean) + (self._bucket is not None)
+
+    def _columns (self, i_start, i_end):
+        # Return the min, max and mean columns for buckets [i_start:i_end],
+        # including the incomplete current bucket if it is in range.
+        columns = [
+            [self.min.x[i_start:i_end], self.min.y[i_start:i_end]],
+            [self.max.x[i_start:i_end], self.max.y[i_start:i_end]],
+            [self.mean.x[i_start:i_end], self.mean.y[i_start:i_end]],
+        ]
+
+        if i_end is None and self._bucket is not None:
+            current = (
+                self._min,
+                self._max,
+                (self._bucket * self.width, self._sum / self._count)
+            )
+
+            for column, (x, y) in zip(columns, current):
+                column[0] = np.append(column[0], x)
+                column[1] = np.append(column[1], y)
+
+        return columns
+
+    def get (self, start, end, aggregate = "envelope"):
+        """
+        Return (times, values) arrays for the buckets overlapping
+        [start, end], plus one bucket either side.
+
+        aggregate = "envelope" returns the minimum and maximum of each
+        bucket in time order (so that peaks are preserved when plotted);
+        aggregate = "mean" returns one mean value per bucket.
+        """
+
+        bucket_x = self.mean.x
+        i_start = max(0, int(np.searchsorted(bucket_x, start - self.width, "right")) - 1)
+        i_end = int(np.searchsorted(bucket_x, end, "right")) + 1
+
+        if i_end >= len(bucket_x):
+            i_end = None
+
+        (min_x, min_y), (max_x, max_y), (mean_x, mean_y) = self._columns(i_start, i_end)
+
+        if aggregate == "mean":
+            return mean_x, mean_y
+
+        # Interleave minimum and maximum points in time order.
+        min_first = min_x <= max_x
+
+        x = np.empty(len(min_x) * 2)
+        y = np.empty(len(min_x) * 2)
+        x[0::2] = np.where(min_first, min_x, max_x)
+        y[0::2] = np.where(min_first, min_y, max_y)
+        x[1::2] = np.where(min_first, max_x, min_x)
+        y[1::2] = np.where(min_first, max_y, min_y)
+
+        # Buckets with a single value only need one point.
+        keep = np.ones(len(x), bool)
+        keep[1::2] = min_x != max_x
+
+        return x[keep], y[keep]
+
+
+class Pyramid (object):
+    """
+    Multi-resolution aggregates of a series.
+
+    Each level summarises the data in buckets of a fixed width (in
+    seconds). Every push() updates each level in O(1), so a query over
+    a long period can be answered from a coarse level at a cost
+    proportional to the number of points returned rather than to the
+    amount of data stored.
+    """
+
+    default_widths = (1, 10, 60, 600)
+
+    def __init__ (self, widths = None):
+        self.levels = [_Level(w) for w in sorted(widths or self.default_widths)]
+
+    def push (self, x, y):
+        for level in self.levels:
+            level.push(x, y)
+
+    def push_many (self, xs, ys):
+        for level in self.levels:
+            push = level.push
+
+            for x, y in zip(xs, ys):
+                push(x, y)
+
+    def level_for (self, interval, max_points, aggregate = "envelope"):
+        """
+        Return the coarsest level that still provides at least
+        {max_points} points over {interval} seconds, or None if even
+        the finest level is too coarse.
+        """
+
+        points_per_bucket = 2 if aggregate == "envelope" else 1
+        width = interval * points_per_bucket / max(max_points, 1)
+
+        for level in reversed(self.levels):
+            if level.width <= width:
+                return level
+
+        return None
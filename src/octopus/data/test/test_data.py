@@ -3,7 +3,11 @@ from twisted.trial import unittest
 
 from unittest.mock import Mock
 
-from .. import data
+import gc
+
+import numpy as np
+
+from .. import data, manipulation
 
 class UtilsTestCase (unittest.TestCase):
     def setUp (self):
@@ -18,6 +22,17 @@ class UtilsTestCase (unittest.TestCase):
         self.assertEqual(data._lower_bound(self.x, 3.5), 2)
         self.assertEqual(data._lower_bound(self.x, 4), 3)
 
+        # Out of range
+        self.assertEqual(data._upper_bound(self.x, 5), None)
+        self.assertEqual(data._upper_bound(self.x, 0), 0)
+        self.assertEqual(data._lower_bound(self.x, 0), None)
+        self.assertEqual(data._lower_bound(self.x, 5), 3)
+
+        # Repeated times (e.g. step changes in a Property)
+        x = [1, 2, 2, 2, 3]
+        self.assertEqual(data._upper_bound(x, 2), 1)
+        self.assertEqual(data._lower_bound(x, 2), 3)
+
     def test_get (self):
         # Get all data
         self.assertEqual(
@@ -75,7 +90,7 @@ class VariablesTestCase (unittest.TestCase):
         self.v.set(3)
         self.v.set(4)
         self.v.set(5)
-        self.assertEqual(self.v._y, [2, 3, 4, 5])
+        self.assertEqual(list(self.v._y), [2, 3, 4, 5])
         self.assertEqual([y for x, y in self.v.get()], [2, 3, 4, 5])
 
     def test_get (self):
@@ -85,10 +100,155 @@ class VariablesTestCase (unittest.TestCase):
         v._push(3, 2)
         v._push(4, 3)
         v._push(5, 4)
-        self.assertEqual(v._x, [1, 2, 3, 4])
-        self.assertEqual(v._y, [2, 3, 4, 5])
+        self.assertEqual(list(v._x), [1, 2, 3, 4])
+        self.assertEqual(list(v._y), [2, 3, 4, 5])
         self.assertEqual(v.get(2, 1), [(2, 3), (3, 4)])
 
+    def test_view (self):
+        v = data.Variable(float)
+        v._archive.min_delta = 0
+
+        for i in range(1, 11):
+            v._push(i * 1.5, i)
+
+        x, y = v.view(3.5, 2)
+        self.assertEqual(x.tolist(), [3, 4, 5, 6])
+        self.assertEqual(y.tolist(), [4.5, 6, 7.5, 9])
+
+        # Views share memory with the stored data
+        self.assertTrue(np.shares_memory(x, v._x))
+
+    def test_trim (self):
+        v = data.Variable(float)
+        v.length = 10
+
+        for i in range(1000):
+            v._push(float(i), i)
+
+        self.assertLess(len(v._x), 50)
+        self.assertEqual(v._x[-1], 999)
+        self.assertEqual(v.at(995), 995)
+        self.assertEqual(v._data.nbytes, len(v._x) * 16)
+
+class PushManyTestCase (unittest.TestCase):
+    def setUp (self):
+        self.values = [1, 1, 1, 2, 3, 3, 3, 3, 2, 2, 5, 1, 1]
+        self.times = [float(t) for t in range(1, len(self.values) + 1)]
+
+    def _compare (self, make):
+        single = make()
+        for value, time in zip(self.values, self.times):
+            single._push(value, time)
+
+        batch = make()
+        batch._push_many(self.values[:5], self.times[:5])
+        batch._push_many(self.values[5:], self.times[5:])
+
+        self.assertEqual(list(batch._x), list(single._x))
+        self.assertEqual(list(batch._y), list(single._y))
+        self.assertEqual(batch._archive.get(), single._archive.get())
+        self.assertEqual(batch.value, single.value)
+        self.assertEqual(type(batch.value), type(single.value))
+        self.assertEqual(batch._time, single._time)
+
+    def test_equivalent (self):
+        def make ():
+            v = data.Variable(int)
+            v._archive.min_delta = 2
+            return v
+
+        self._compare(make)
+
+    def test_equivalent_float (self):
+        def make ():
+            v = data.Variable(float)
+            v._archive.threshold_factor = None
+            return v
+
+        self._compare(make)
+
+    def test_archive_random (self):
+        # The vectorized compression stores the same points as the
+        # point by point one, however the data are batched.
+        rng = np.random.default_rng(4)
+
+        for type in (int, float):
+            values = np.cumsum(rng.integers(-30, 31, 2000)) * 10
+            times = np.arange(2000, dtype = float)
+
+            single = data.Archive(type)
+            batch = data.Archive(type)
+            single._zero = batch._zero = 0
+
+            for t, y in zip(times.tolist(), values.tolist()):
+                single.push(t, type(y))
+
+            i = 0
+            while i < len(times):
+                n = int(rng.integers(1, 200))
+                batch.push_many(times[i:i + n], values[i:i + n].astype(type))
+                i += n
+
+            self.assertEqual(batch.get(), single.get())
+            self.assertEqual(
+                (batch._min_since_last, batch._max_since_last, batch._prev_x, batch._prev_y),
+                (single._min_since_last, single._max_since_last, single._prev_x, single._prev_y)
+            )
+
+    def test_none (self):
+        # None values are skipped, as by _push.
+        self.values = [1, None, 2, 2, None, 3, None]
+        self.times = [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0]
+
+        def make ():
+            v = data.Variable(float)
+            v._archive.threshold_factor = None
+            return v
+
+        self._compare(make)
+
+        v = make()
+        v._push_many(np.array([None, None], dtype = object), [1, 2])
+        self.assertEqual(v.value, None)
+        self.assertEqual(len(v._x), 0)
+
+    def test_events (self):
+        v = data.Variable(float)
+        changed = Mock()
+        v.on("change", changed)
+
+        v._push_many([1, 2, 3], [1, 2, 3])
+
+        self.assertEqual(changed.call_count, 1)
+        event = changed.call_args[0][0]
+        self.assertEqual(event["time"], 3)
+        self.assertEqual(event["value"], 3.0)
+        self.assertEqual(list(event["values"]), [1, 2, 3])
+        self.assertEqual(list(event["times"]), [1, 2, 3])
+
+        # Repeated values are merged into the last point
+        v._push_many([3, 3], [4, 5])
+        v._push_many([3, 3], [6, 7])
+        self.assertEqual(changed.call_count, 2)
+        self.assertEqual(list(v._x), [1, 2, 3, 7])
+
+    def test_order (self):
+        v = data.Variable(float)
+        v._push_many([1, 2], [5, 6])
+
+        self.assertRaises(Exception, v._push_many, [1, 2], [4, 7])
+        self.assertRaises(Exception, v._push_many, [1, 2], [8, 7])
+        self.assertRaises(ValueError, v._push_many, [1, 2], [8])
+
+    def test_log (self):
+        v = data.Variable(float)
+        log = Mock(spec = ["write", "write_many", "close"])
+        v.setLogFile(log)
+
+        v._push_many([1, 2, 3], [1, 2, 3])
+        log.write_many.assert_called_once_with([1, 2, 3], [1, 2, 3])
+
+
 class ExpressionsTestCase (unittest.TestCase):
     def setUp (self):
         self.v = data.Variable(int, 2)
@@ -112,3 +272,439 @@ class ExpressionsTestCase (unittest.TestCase):
 
         self.assertEqual(add.value, 6)
 
+    def test_emit_once (self):
+        a = data.Variable(float, 1.0)
+        b = data.Variable(float, 2.0)
+        c = data.Variable(float, 4.0)
+
+        inner = a + b
+        expr = ((inner > c) | (a > 10)) & (b < 5)
+
+        changed = Mock()
+        expr.on("change", changed)
+
+        # Only the root listens for changes
+        self.assertNotIn(inner._changed, a._events["change"])
+        self.assertEqual(a._events["change"].count(expr._changed), 1)
+
+        a._push(3.0)
+        self.assertEqual(changed.call_count, 1)
+        self.assertEqual(expr.value, True)
+
+        # Sub-expressions are evaluated on request
+        self.assertEqual(inner.value, 5)
+
+        b._push(7.0)
+        self.assertEqual(changed.call_count, 2)
+        self.assertEqual(expr.value, False)
+
+    def test_affected_path (self):
+        calls = []
+
+        def op (*args):
+            calls.append(args)
+            return sum(args)
+
+        a = data.Variable(int, 1)
+        b = data.Variable(int, 2)
+        c = data.Variable(int, 3)
+        expr = (a + b) * c
+
+        # Replace the operations so that evaluations can be counted
+        expr._program = None
+        expr._lhs._op = op
+        expr._op = op
+        expr._refresh()
+        self.assertEqual(len(calls), 2)
+
+        del calls[:]
+        c._push(4)
+        self.assertEqual(calls, [(3, 4)])
+
+    def test_transient (self):
+        a = data.Variable(int, 1)
+
+        for i in range(10):
+            expr = (a + i) * 2
+
+        # Expressions that are no longer referred to stop listening
+        self.assertEqual(len(a.listeners("change")), 1)
+        self.assertEqual(a.listeners("change")[0], expr._changed)
+
+    def test_reattach (self):
+        a = data.Variable(int, 1)
+        inner = a + 1
+        outer = inner * 2
+
+        changed = Mock()
+        inner.on("change", changed)
+        a._push(2)
+
+        self.assertEqual(changed.call_count, 1)
+        self.assertEqual(inner.value, 3)
+        self.assertEqual(outer.value, 6)
+
+    def test_unreferenced (self):
+        # An expression kept only by its listener goes on listening.
+        a = data.Variable(int, 1)
+        b = data.Variable(int, 0)
+        values = []
+
+        (a + b > 2).on("change", lambda event: values.append(event["value"]))
+        gc.collect()
+
+        a._push(3)
+        self.assertEqual(values, [True])
+
+        # Once it has no listeners, it is held weakly again.
+        expr = a + b > 2
+        f = lambda event: None
+        expr.on("change", f)
+        expr.off("change", f)
+        del expr
+        gc.collect()
+
+        self.assertEqual(len(a.listeners("change")), 1)
+
+    def test_weak (self):
+        class Listener (object):
+            values = []
+
+            def changed (self, data):
+                self.values.append(data["value"])
+
+        a = data.Variable(int, 1)
+        expr = a + 1
+        listener = Listener()
+        expr.on("change", listener.changed, weak = True)
+
+        a._push(2)
+        self.assertEqual(Listener.values, [3])
+
+        del listener
+        a._push(3)
+        self.assertEqual(Listener.values, [3])
+        self.assertEqual(expr.listeners("change"), ())
+
+    def test_none (self):
+        a = data.Variable(int)
+        expr = (a + 1) * 2
+        self.assertEqual(expr.value, None)
+
+        a._push(1)
+        self.assertEqual(expr.value, 4)
+
+    def _variable (self, type, points):
+        v = data.Variable(type)
+        v._archive._zero = 0
+        v._archive.threshold_factor = None
+
+        for x, y in points:
+            v._push(y, x)
+
+        return v
+
+    def test_history (self):
+        a = self._variable(float, [(0, 1), (10, 2)])
+        b = self._variable(float, [(5, 5), (12, 7)])
+
+        self.assertEqual((a - b).get(), [(5, -4), (10, -3), (12, -5)])
+        self.assertEqual((a * 2).get(), [(0, 2), (10, 4)])
+        self.assertEqual((a > b).not_().get(), [(5, True), (10, True), (12, True)])
+        self.assertEqual((a - b).get(10, 2), [(10, -3), (12, -5)])
+
+        s = self._variable(str, [(1, "x"), (11, "y")])
+        self.assertEqual((s + a).get(), [(1, "x1.0"), (10, "x2.0"), (11, "y2.0")])
+
+    def test_history_same_times (self):
+        a = self._variable(float, [(1, 100), (2, 200), (3, 300)])
+        b = self._variable(float, [(1, 100), (2, 200), (3, 300)])
+
+        # One point per time, from the latest values.
+        self.assertEqual((a - b).get(), [(1, 0), (2, 0), (3, 0)])
+        self.assertEqual(((a > 150) & (a < 250)).get(), [(1, False), (2, True), (3, False)])
+
+    def test_history_live (self):
+        # Points not yet stored by the archive are included, up to
+        # the current value.
+        a = data.Variable(float)
+        b = data.Variable(float)
+        b._push(1, 0)
+        a._push(1, 0)
+
+        for i in range(10):
+            a._push(20 + i / 2, 2 + i)
+
+        e = a - b
+        self.assertEqual(e.value, 23.5)
+        self.assertEqual(e.at(11), e.value)
+        self.assertEqual(e.get()[-1], (11, 23.5))
+
+    def test_history_extend (self):
+        rng = np.random.default_rng(2)
+        a = self._variable(float, [])
+        b = self._variable(float, [])
+        expr = (a - b) * (a + 1)
+
+        for i in range(50):
+            a._push(float(rng.normal()), float(i * 2))
+            b._push(float(rng.normal()), float(i * 3 + 1))
+
+            if i % 7 == 0:
+                expr.get()
+
+        # The cached history matches one computed from scratch.
+        self.assertEqual(expr.get(), ((a - b) * (a + 1)).get())
+        self.assertEqual(expr.get()[-1][1], expr.value)
+
+    def test_history_truncate (self):
+        a = self._variable(float, [(0, 1), (10, 2)])
+        expr = a + 1
+        self.assertEqual(len(expr.get()), 2)
+
+        # The history restarts from the last value (and the current
+        # point, at the time of truncation).
+        a.truncate()
+        self.assertEqual(expr.get()[0], (10, 3))
+        self.assertEqual(expr.get()[-1], (a._time, 3))
+        self.assertLessEqual(len(expr.get()), 2)
+
+    def test_str (self):
+        s = data.Variable(str, "abc")
+        expr = (s + 1) + "d"
+        self.assertEqual(expr.value, "abc1d")
+
+        s._push("x")
+        self.assertEqual(expr.value, "x1d")
+
+
+
+class ArchivePyramidTestCase (unittest.TestCase):
+    def setUp (self):
+        self.a = data.Archive(float)
+        self.a.threshold_factor = None
+        self.a.levels = (1, 10, 60, 600)
+        self.a._zero = 0
+
+        # One day at 1 Hz: a triangle wave with a 20 minute period.
+        for i in range(86400):
+            self.a.push(float(i), float(abs(i % 1200 - 600)))
+
+    def test_raw (self):
+        self.assertEqual(len(self.a.get(0, 86400)), 86401)
+        self.assertEqual(len(self.a.get(0, 86400, max_points = 100000)), 86401)
+
+    def test_levels (self):
+        vals = self.a.get(0, 86400, max_points = 500)
+
+        # From the 600 s level: two points per bucket (plus the end point)
+        self.assertGreaterEqual(len(vals), 500)
+        self.assertLessEqual(len(vals), 5000)
+
+        # Peaks are preserved, times are in order
+        ys = [y for x, y in vals]
+        self.assertEqual(max(ys), 600)
+        self.assertEqual(min(ys), 0)
+        self.assertEqual([x for x, y in vals], sorted(x for x, y in vals))
+
+        # The edges of the requested period are filled in
+        self.assertEqual(vals[0][0], 0)
+        self.assertEqual(vals[-1][0], 86400)
+
+    def test_mean (self):
+        vals = self.a.get(3600, 3600, max_points = 60, aggregate = "mean")
+
+        self.assertGreaterEqual(len(vals), 60)
+        self.assertLessEqual(len(vals), 70)
+
+        for x, y in vals[1:-1]:
+            self.assertEqual(x % 60, 0)
+            self.assertAlmostEqual(y, abs((x + 29.5) % 1200 - 600), delta = 30)
+
+    def test_current_bucket (self):
+        self.a.push(86400.5, 1000.0)
+        vals = self.a.get(80000, 6401, max_points = 10)
+
+        self.assertEqual(vals[-1], (86401, 1000.0))
+
+
+class SwingingDoorTestCase (unittest.TestCase):
+    def _archive (self, deviation):
+        a = data.Archive(float)
+        a.deviation = deviation
+        a._zero = 0
+        return a
+
+    def _check (self, a, x, y, deviation):
+        stored = a.get()
+        sx = [p[0] for p in stored]
+        sy = [p[1] for p in stored]
+
+        # The stored points reproduce every input point to within deviation
+        # (up to the start of the segment that is still open).
+        closed = x <= sx[-2]
+        error = np.abs(np.interp(x[closed], sx, sy) - y[closed])
+        self.assertLessEqual(error.max(), deviation + 1e-9)
+
+        # The latest point is always stored
+        self.assertEqual(stored[-1], (x[-1], y[-1]))
+
+        return stored
+
+    def test_sine (self):
+        x = np.arange(0, 600, 0.1)
+        y = 20 + 0.5 * np.sin(x / 30)
+
+        a = self._archive(0.01)
+        for xi, yi in zip(x.tolist(), y.tolist()):
+            a.push(xi, yi)
+
+        stored = self._check(a, x, y, 0.01)
+        self.assertLess(len(stored), len(x) / 20)
+
+    def test_batch (self):
+        rng = np.random.default_rng(1)
+        x = np.arange(0, 1000, 0.1)
+        y = np.cumsum(rng.normal(0, 0.05, len(x)))
+
+        single = self._archive(0.2)
+        for xi, yi in zip(x.tolist(), y.tolist()):
+            single.push(xi, yi)
+
+        batch = self._archive(0.2)
+        batch.push_many(x[:5000], y[:5000])
+        batch.push_many(x[5000:], y[5000:])
+
+        self.assertEqual(batch.get(), single.get())
+        self._check(batch, x, y, 0.2)
+
+    def test_constant (self):
+        a = self._archive(0.1)
+        for i in range(1000):
+            a.push(float(i), 5.0)
+
+        self.assertEqual(a.get(), [(0, 5), (999, 5)])
+
+    def test_repeated_times (self):
+        a = self._archive(0.1)
+        for x, y in [(0, 0), (1, 0), (2, 5), (2, 6), (3, 6)]:
+            a.push(float(x), float(y))
+
+        self.assertEqual(a.get(), [(0, 0), (1, 0), (2, 5), (2, 6), (3, 6)])
+
+class StringArchiveTestCase (unittest.TestCase):
+    def _archive (self):
+        a = data.StringArchive(None)
+        a._zero = 0
+        return a
+
+    def test_changes (self):
+        a = self._archive()
+        for x, y in [(0, "off"), (1, "off"), (2, "on"), (3, "on"), (4, "off")]:
+            a.push(float(x), y)
+
+        self.assertEqual(a.get(), [(0, "off"), (2, "on"), (4, "off")])
+        self.assertEqual(a.symbols, ["off", "on"])
+        self.assertEqual(a._data.nbytes, 3 * 12)
+
+    def test_at (self):
+        a = self._archive()
+        for x, y in [(0, "a"), (10, "b"), (20, "c")]:
+            a.push(float(x), y)
+
+        self.assertEqual(a.at(-5), "a")
+        self.assertEqual(a.at(0), "a")
+        self.assertEqual(a.at(9.9), "a")
+        self.assertEqual(a.at(10), "b")
+        self.assertEqual(a.at(25), "c")
+        self.assertEqual(self._archive().at(5), "")
+
+    def test_get_range (self):
+        a = self._archive()
+        for x, y in [(0, "a"), (10, "b"), (20, "c"), (30, "a")]:
+            a.push(float(x), y)
+
+        # One change either side of the range is included
+        self.assertEqual(a.get(12, 10), [(10, "b"), (20, "c"), (30, "a")])
+
+        x, y = a.view(5, 20)
+        self.assertEqual(x.tolist(), [0, 10, 20, 30])
+        self.assertEqual(y.tolist(), ["a", "b", "c", "a"])
+
+    def test_batch (self):
+        values = ["idle", "idle", "run", "run", "run", "idle", "error", "idle"]
+        times = [float(i) for i in range(len(values))]
+
+        single = self._archive()
+        for x, y in zip(times, values):
+            single.push(x, y)
+
+        batch = self._archive()
+        batch.push_many(times[:3], values[:3])
+        batch.push_many(times[3:], values[3:])
+
+        self.assertEqual(batch.get(), single.get())
+
+    def test_variable (self):
+        v = data.Variable(str, "a")
+        t = v._x[0]
+        v._push("b", t + 10)
+        v._push("c", t + 20)
+
+        self.assertEqual(v.at(t + 15), "b")
+        self.assertEqual(v._archive.at(t + 25), "c")
+        self.assertEqual(v._archive.symbols, ["a", "b", "c"])
+
+class InterpTestCase (unittest.TestCase):
+    def _variable (self, type, points):
+        v = data.Variable(type)
+        v._archive._zero = 0
+        v._archive.threshold_factor = None
+
+        for x, y in points:
+            v._push(y, x)
+
+        return v
+
+    def test_linear (self):
+        v = self._variable(float, [(0, 0), (10, 10), (20, 0)])
+
+        self.assertEqual(v.interp(5, 0, 1).tolist(), [])
+        self.assertEqual(
+            v.interp(5, 10, 2.5).tolist(),
+            [5, 7.5, 10, 7.5]
+        )
+
+    def test_step (self):
+        v = self._variable(str, [(0, "a"), (10, "b"), (20, "c")])
+
+        self.assertEqual(
+            v.interp(5, 20, 5).tolist(),
+            ["a", "b", "b", "c"]
+        )
+
+    def test_expression (self):
+        a = self._variable(float, [(0, 0), (10, 10)])
+        b = self._variable(float, [(0, 4), (10, 4)])
+
+        e = (a * 2 + b) / b
+        self.assertEqual(e.interp(0, 10, 5).tolist(), [1, 3.5])
+
+        c = (a > 4).and_(b < 5)
+        self.assertEqual(c.interp(0, 10, 5).tolist(), [False, True])
+
+        n = (a > 4).not_()
+        self.assertEqual(n.interp(0, 10, 5).tolist(), [True, False])
+
+        s = self._variable(str, [(0, "x"), (3, "y")])
+        self.assertEqual((s + a).interp(0, 10, 5).tolist(), ["x0.0", "y5.0"])
+        self.assertEqual(abs(-a + 5).interp(0, 10, 5).tolist(), [5, 0])
+
+    def test_manipulation (self):
+        a = self._variable(float, [(0, 0), (10, 20)])
+
+        d = manipulation.Differential(a)
+        self.assertEqual(d.interp(0, 10, 1).tolist(), [2] * 10)
+
+        s = manipulation.Sqrt(a * 0.5 + 4)
+        self.assertEqual(s.interp(0, 10, 5).tolist(), [2, 3])
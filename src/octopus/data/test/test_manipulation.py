@@ -0,0 +1,110 @@
+from twisted.trial import unittest
+
+from unittest.mock import Mock
+
+import numpy as np
+
+from .. import data, manipulation
+
+class RollingTestCase (unittest.TestCase):
+    def setUp (self):
+        self.v = data.Variable(float)
+        self.v._archive._zero = 0
+
+        rng = np.random.default_rng(3)
+        self.times = np.cumsum(rng.uniform(0.1, 2, 300)).tolist()
+        self.values = (100 + rng.normal(0, 5, 300)).tolist()
+
+    def _window (self, frame):
+        # Expected window contents at each time: the values of the
+        # last {frame} seconds plus the value in effect at its start.
+        for i, t in enumerate(self.times):
+            first = 0
+            while first < i and self.times[first + 1] <= t - frame:
+                first += 1
+
+            yield self.values[first:i + 1]
+
+    def _rolling (self, cls, frame):
+        r = cls(self.v, frame)
+        results = []
+
+        for t, y in zip(self.times, self.values):
+            self.v._push(y, t)
+            results.append(r.value)
+
+        return r, results
+
+    def test_max (self):
+        r, results = self._rolling(manipulation.RollingMax, 10)
+        self.assertEqual(results, [max(w) for w in self._window(10)])
+        self.assertEqual(r.value, results[-1])
+
+    def test_min (self):
+        r, results = self._rolling(manipulation.RollingMin, 10)
+        self.assertEqual(results, [min(w) for w in self._window(10)])
+
+    def test_mean (self):
+        r, results = self._rolling(manipulation.RollingMean, 10)
+        np.testing.assert_allclose(results, [np.mean(w) for w in self._window(10)])
+
+    def test_std (self):
+        r, results = self._rolling(manipulation.RollingStd, 10)
+        expected = [np.std(w, ddof = 1) if len(w) > 1 else 0 for w in self._window(10)]
+        np.testing.assert_allclose(results, expected, atol = 1e-9)
+
+    def test_ewma (self):
+        r, results = self._rolling(manipulation.EWMA, 5)
+
+        average = self.values[0]
+        for t0, t1, y in zip(self.times, self.times[1:], self.values[1:]):
+            average += (1 - np.exp(-(t1 - t0) / 5)) * (y - average)
+
+        self.assertAlmostEqual(r.value, average)
+
+    def test_batch (self):
+        single = manipulation.RollingMax(self.v, 10)
+
+        v = data.Variable(float)
+        v._archive._zero = 0
+        batch = manipulation.RollingMax(v, 10)
+
+        for r in (single, batch):
+            r._archive._zero = 0
+            r._archive.threshold_factor = None
+
+        for t, y in zip(self.times, self.values):
+            self.v._push(y, t)
+
+        v._push_many(self.values[:150], self.times[:150])
+        v._push_many(self.values[150:], self.times[150:])
+
+        self.assertEqual(batch.value, single.value)
+        self.assertEqual(batch.get(), single.get())
+
+    def test_batch_none (self):
+        # None values are skipped, keeping the others at their times.
+        r = manipulation.RollingMax(self.v, 10)
+        r._changed({ "times": [1, 2, 3], "values": [5.0, None, 1.0] })
+
+        self.assertEqual(list(r._window), [(1, 5.0), (3, 1.0)])
+        self.assertEqual(r.value, 5.0)
+
+    def test_expression (self):
+        r = manipulation.RollingMax(self.v * 2, 10)
+        guard = r > 250
+
+        changed = Mock()
+        guard.on("change", changed)
+
+        self.v._push(100.0, 1)
+        self.v._push(130.0, 2)
+        self.assertEqual(guard.value, True)
+        self.assertEqual(changed.call_count, 2)
+
+        # 130 is still in effect at the start of the window
+        self.v._push(100.0, 20)
+        self.assertEqual(guard.value, True)
+
+        self.v._push(110.0, 31)
+        self.assertEqual(guard.value, False)
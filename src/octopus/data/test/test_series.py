@@ -0,0 +1,56 @@
+from twisted.trial import unittest
+
+import numpy as np
+
+from ..series import Series
+
+
+class SeriesTestCase (unittest.TestCase):
+    def test_append (self):
+        s = Series(float)
+
+        for i in range(100):
+            s.append(i, i * 2)
+
+        self.assertEqual(len(s), 100)
+        self.assertEqual(s.x.tolist(), list(range(100)))
+        self.assertEqual(s.y.tolist(), [i * 2 for i in range(100)])
+        self.assertEqual(s.dtype, np.float64)
+        self.assertEqual(s.nbytes, 1600)
+
+    def test_discard (self):
+        s = Series(int)
+
+        for i in range(1000):
+            s.append(i, i)
+
+            if len(s) > 20:
+                s.discard(10)
+
+        self.assertEqual(s.y.tolist(), list(range(s.y[0], 1000)))
+        self.assertLessEqual(len(s._x), 64)
+
+    def test_extend (self):
+        s = Series(float)
+        s.append(0, 0)
+        s.extend(np.arange(1, 101), np.arange(1, 101) * 3)
+
+        self.assertEqual(len(s), 101)
+        self.assertEqual(s.y[-1], 300)
+
+    def test_modify_last (self):
+        s = Series(str)
+        s.append(1, "a")
+        s.append(2, "b")
+
+        s.retime(3)
+        self.assertEqual(s.x.tolist(), [1, 3])
+
+        s.replace(4, "c")
+        self.assertEqual(s.y.tolist(), ["a", "c"])
+
+        s.pop()
+        self.assertEqual(s.y.tolist(), ["a"])
+
+        s.clear()
+        self.assertEqual(len(s), 0)
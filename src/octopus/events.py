@@ -1,5 +1,7 @@
 # System Imports
+from collections import Counter
 import functools
+import weakref
 
 # Twisted Imports
 from twisted.python import log
@@ -30,24 +32,201 @@ class Event (object):
     __len__  = getHandlerCount
 
 
+def _key (function):
+    # Bound methods are created afresh on each attribute access,
+    # so are identified by their object and function.
+    try:
+        return (id(function.__self__), id(function.__func__))
+    except AttributeError:
+        return id(function)
+
+
+class _Listeners (object):
+    """
+    The listeners for one event of an EventEmitter.
+
+    Listeners are kept in insertion order in a dict, so adding and
+    removing one is O(1). A listener may be held by weak reference,
+    in which case it is removed when its object is garbage collected.
+    """
+
+    __slots__ = ("_entries", "_snapshot", "__weakref__")
+
+    def __init__ (self):
+        self._entries = {}
+        self._snapshot = ()
+
+    def add (self, function, weak = False):
+        key = _key(function)
+
+        if key in self._entries:
+            return
+
+        if weak:
+            remove = _remove_callback(self, key)
+
+            try:
+                ref = weakref.WeakMethod(function, remove)
+            except TypeError:
+                ref = weakref.ref(function, remove)
+
+            self._entries[key] = (ref, True)
+        else:
+            self._entries[key] = (function, False)
+
+        self._snapshot = None
+
+    def remove (self, function):
+        try:
+            del self._entries[_key(function)]
+        except KeyError:
+            raise ValueError("{!r} is not a listener".format(function))
+
+        self._snapshot = None
+
+    def clear (self):
+        self._entries = {}
+        self._snapshot = ()
+
+    def entries (self):
+        # A tuple of (listener or reference, is weak), which is
+        # replaced rather than modified when listeners change.
+        if self._snapshot is None:
+            self._snapshot = tuple(self._entries.values())
+
+        return self._snapshot
+
+    def __iter__ (self):
+        for function, weak in self.entries():
+            if weak:
+                function = function()
+
+                if function is None:
+                    continue
+
+            yield function
+
+    def __contains__ (self, function):
+        return _key(function) in self._entries
+
+    def count (self, function):
+        return int(function in self)
+
+    def __len__ (self):
+        return len(self._entries)
+
+
+def _remove_callback (listeners, key):
+    listeners = weakref.ref(listeners)
+
+    def remove (ref):
+        l = listeners()
+
+        if l is not None and l._entries.get(key, (None,))[0] is ref:
+            del l._entries[key]
+            l._snapshot = None
+
+    return remove
+
+
+# Emitters that have listeners, for leak_report().
+_emitters = weakref.WeakValueDictionary()
+
+
+def leak_report (threshold = 10):
+    """
+    Returns the events that have at least {threshold} listeners, as a
+    list of (emitter, event name, number of listeners, Counter of
+    listener names), largest first.
+
+    Listeners that are added repeatedly and never removed (e.g.
+    expressions created in a loop) show up as a large count of one
+    name that grows over time.
+    """
+
+    report = []
+
+    for emitter in list(_emitters.values()):
+        for name, listeners in list(getattr(emitter, "_events", {}).items()):
+            if len(listeners) >= threshold:
+                kinds = Counter(
+                    getattr(f, "__qualname__", type(f).__name__)
+                    for f in listeners
+                )
+                report.append((emitter, name, len(listeners), kinds))
+
+    report.sort(key = lambda item: item[2], reverse = True)
+
+    return report
+
+
+class _Batcher (object):
+    """
+    Collects coalesced events and delivers them once per reactor turn.
+
+    Repeated events from the same emitter are collapsed into one
+    delivery, carrying the most recent data and the number of events
+    that were skipped ("skipped").
+    """
+
+    def __init__ (self):
+        self.clock = None
+        self._pending = {}
+        self._call = None
+
+    def add (self, emitter, event, data):
+        key = (id(emitter), event)
+
+        try:
+            self._pending[key][2] = data
+            self._pending[key][3] += 1
+        except KeyError:
+            self._pending[key] = [emitter, event, data, 0]
+
+        if self._call is None:
+            clock = self.clock
+
+            if clock is None:
+                from twisted.internet import reactor as clock
+
+            self._call = clock.callLater(0, self.flush)
+
+    def flush (self):
+        self._call = None
+        pending = self._pending
+        self._pending = {}
+
+        for emitter, event, data, skipped in pending.values():
+            data["skipped"] = skipped
+            emitter._dispatch(event, data)
+
+_batcher = _Batcher()
+
+
 class EventEmitter (object):
-    def on (self, name, function = None):
+    # Events that are delivered in batches (see coalesce()).
+    _coalesced = frozenset()
+
+    def on (self, name, function = None, weak = False):
+        """
+        Call {function} when event {name} is emitted.
+
+        If weak is True, the listener is held by weak reference (a
+        bound method by weak reference to its object) and is removed
+        once nothing else refers to it.
+        """
+
         def _on (function):
             try:
-                self._events[name]
-            except (TypeError, AttributeError):
+                listeners = self._events[name]
+            except AttributeError:
                 self._events = {}
-                self._events[name] = []
+                _emitters[id(self)] = self
+                listeners = self._events[name] = _Listeners()
             except KeyError:
-                self._events[name] = []
+                listeners = self._events[name] = _Listeners()
 
-            # Use is instead of in to avoid equality comparison
-            # (this would create extra expression objects).
-            for f in self._events[name]:
-                if function is f:
-                    return function
-
-            self._events[name].append(function)
+            listeners.add(function, weak)
 
             return function
 
@@ -82,10 +261,8 @@ class EventEmitter (object):
 
         # If no function is passed, remove all functions
         elif function is None:
-            try:
-                self._events[name] = []
-            except KeyError:
-                pass
+            if name in self._events:
+                self._events[name].clear()
 
         # Remove handler [function] from [name]
         else:
@@ -93,36 +270,77 @@ class EventEmitter (object):
 
     def listeners (self, event):
         try:
-            return self._events[event]
+            return tuple(self._events[event])
         except (AttributeError, KeyError):
-            return []
+            return ()
+
+    def coalesce (self, name = "change", enable = True):
+        """
+        Deliver {name} events at most once per reactor turn.
+
+        Events emitted in the same turn are collapsed into one, with the
+        data of the most recent event plus "skipped": the number of
+        events that were not delivered. Listeners that need every value
+        should not be attached to a coalesced event.
+        """
+
+        if enable:
+            self._coalesced = self._coalesced | { name }
+        else:
+            self._coalesced = self._coalesced - { name }
 
     def emit (self, _event, **data):
-        handled = False
+        if _event in self._coalesced:
+            _batcher.add(self, _event, data)
+
+            try:
+                return bool(len(self._events.get(_event, ())) or len(self._events.get("all", ())))
+            except AttributeError:
+                return False
 
+        return self._dispatch(_event, data)
+
+    def _dispatch (self, _event, data):
         try:
-            events = self._events[_event][:]
+            events = self._events
         except AttributeError:
             return False # No events defined yet
+
+        handled = False
+
+        try:
+            listeners = events[_event].entries()
         except KeyError:
             pass
         else:
-            handled |= bool(len(events))
+            for function, weak in listeners:
+                if weak:
+                    function = function()
+
+                    if function is None:
+                        continue
+
+                handled = True
 
-            for function in events:
                 try:
                     function(data)
                 except:
                     log.err()
 
         try:
-            events = self._events["all"][:]
+            listeners = events["all"].entries()
         except KeyError:
             pass
         else:
-            handled |= bool(len(events))
+            for function, weak in listeners:
+                if weak:
+                    function = function()
+
+                    if function is None:
+                        continue
+
+                handled = True
 
-            for function in events:
                 try:
                     function(_event, data)
                 except:
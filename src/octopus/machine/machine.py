@@ -1,5 +1,5 @@
 # Twisted Imports
-from twisted.internet import defer, task
+from twisted.internet import defer
 from twisted.python import failure, log
 
 # System Imports
@@ -9,6 +9,8 @@ import logging
 from .. import util, data
 from ..data.data import BaseVariable
 from ..image.data import Image
+from ..queue import priority as queue_priority
+from ..scheduler import scheduler
 
 # Sibling Imports
 from .interface import InterfaceSection
@@ -162,7 +164,14 @@ class Machine (Component):
     protocolFactory  = None
     protocol         = None
     ui               = InterfaceSection()
-    _ticks           = []
+    _ticks           = ()
+
+    # If adaptive_polling is True, polls started with _tick() run more
+    # often while the machine's variables are changing and less often
+    # while they are steady (see _Adaptive).
+    adaptive_polling  = False
+    min_poll_interval = 0.25
+    max_poll_interval = 8
 
     @property
     def connected (self):
@@ -185,6 +194,7 @@ class Machine (Component):
             alias = self.__class__.__name__ + "_" + str(Machine._machine_count)
 
         self.ready = defer.Deferred()
+        self._ticks = []
         self.setup(**kwargs)
 
         # Must be called after setup() as this assignment
@@ -239,11 +249,63 @@ class Machine (Component):
     def resume (self):
         return defer.succeed(None)
 
-    def _tick (self, fn, interval):
-        c = task.LoopingCall(fn)
-        c.start(interval, now = True)
+    def _tick (self, fn, interval, deadline = None, watch = None):
+        """
+        Call {fn} every {interval} seconds until stopped, using the
+        shared scheduler (which spreads the polls of all machines
+        over the interval). Returns the scheduler.Poll.
+
+        If {fn} returns a Deferred, it is not called again until that
+        has fired, and is cancelled after {deadline} seconds if given.
+
+        If adaptive_polling is set, the interval is varied between
+        min_poll_interval and max_poll_interval according to the
+        activity of the variables in {watch}: a dict of variable to
+        tolerance, or a list of variables (default: all of the
+        machine's archived variables). See _Adaptive.
+        """
+
+        adaptive = None
+
+        if self.adaptive_polling:
+            if watch is None:
+                watch = [
+                    v for v in self.variables.values()
+                    if isinstance(v, data.Variable)
+                    and getattr(v, "_archive", None) is not None
+                ]
+
+            adaptive = _Adaptive(
+                watch, interval,
+                self.min_poll_interval, self.max_poll_interval
+            )
+
+        # Commands queued by monitoring functions have poll priority,
+        # so that they do not delay control commands.
+        def poll ():
+            # The device is polled even if adapting the interval fails.
+            if adaptive is not None:
+                try:
+                    adaptive.update()
+                except Exception:
+                    log.err(None, "Error adapting poll interval of {!s}".format(self.alias))
+
+            with queue_priority("poll"):
+                return fn()
+
+        # The first poll runs straight away, so that the variables are
+        # set as soon as the machine has started.
+        c = scheduler.add(poll, interval, deadline, now = True, name = "{!s}.{!s}".format(
+            self.alias, getattr(fn, "__name__", "poll")
+        ))
         self._ticks.append(c)
 
+        if adaptive is not None:
+            adaptive.start(c, [
+                v for v in self.variables.values()
+                if isinstance(v, Property)
+            ])
+
         return c
 
     def _stopTicks (self):
@@ -251,6 +313,8 @@ class Machine (Component):
             if t.running:
                 t.stop()
 
+        self._ticks = []
+
     def __str__ (self):
         return "<%s at %s (%s)>" % (
             self.__class__.__name__,
@@ -262,12 +326,17 @@ class Machine (Component):
 
 # Continuous variables
 class Stream (data.Variable):
-    def __init__ (self, title, type, unit = None):
+    def __init__ (self, title, type, unit = None, deviation = None):
         data.Variable.__init__(self, type)
 
         self.title = title
         self.unit = unit
 
+        # Archive values to within +/- deviation (in units of the
+        # stream) using swinging door compression.
+        if deviation is not None:
+            self._archive.deviation = deviation
+
     def set (self, value):
         raise data.errors.Immutable
 
@@ -283,8 +352,122 @@ class Stream (data.Variable):
     # _push is used internally to add data coming in from the machine.
 
 
+class _Adaptive (object):
+    """
+    Varies the interval of a poll with the activity of the variables
+    that it updates.
+
+    Before each run, each variable in {watch} (a dict of variable to
+    tolerance, or a list of variables) is checked for a significant
+    change since the previous run: a new point stored by its archive
+    (which stores only significant changes), or a change in value of
+    more than its tolerance (by default the archive's threshold). If
+    any variable has changed, the interval is halved; after {patience}
+    runs without a change it is doubled. Intervals are kept to powers
+    of two times {interval}, between {minimum} and {maximum}, so that
+    polls stay on a common grid.
+
+    Setting one of the machine's properties returns the poll to the
+    shortest interval and runs it straight away.
+    """
+
+    patience = 4
+
+    def __init__ (self, watch, interval, minimum, maximum):
+        if not isinstance(watch, dict):
+            watch = dict.fromkeys(watch)
+
+        self.watch = watch
+        self.interval = interval
+        self.minimum = interval
+        self.maximum = interval
+
+        while self.minimum / 2 >= minimum:
+            self.minimum /= 2
+
+        while self.maximum * 2 <= maximum:
+            self.maximum *= 2
+
+        self.poll = None
+        self.flat = 0
+        self._state = {}
+
+    def start (self, poll, properties):
+        self.poll = poll
+
+        # Held weakly, so that the listeners go with the poll.
+        for p in properties:
+            p.on("set", self.boost, weak = True)
+
+    def update (self):
+        """Adjust the interval to the activity since the last run."""
+
+        if self._changed():
+            self.flat = 0
+            interval = max(self.interval / 2, self.minimum)
+        else:
+            self.flat += 1
+
+            if self.flat < self.patience:
+                return
+
+            self.flat = 0
+            interval = min(self.interval * 2, self.maximum)
+
+        if interval != self.interval:
+            self.interval = interval
+            self.poll.reschedule(interval)
+
+    def boost (self, data = None):
+        """Poll at the shortest interval, starting now."""
+
+        self.flat = 0
+        self.interval = self.minimum
+        self.poll.reschedule(self.minimum, soon = True)
+
+    def _changed (self):
+        changed = False
+        state = self._state
+
+        for variable, tolerance in self.watch.items():
+            archive = getattr(variable, "_archive", None)
+
+            if archive is None:
+                continue
+
+            stored = len(archive._data)
+            value = variable.value
+
+            try:
+                prev_stored, prev_value = state[variable]
+            except KeyError:
+                pass
+            else:
+                if tolerance is None:
+                    tolerance = archive.threshold
+
+                if stored != prev_stored:
+                    changed = True
+                elif value != prev_value:
+                    if tolerance is None or prev_value is None or value is None:
+                        changed = True
+                    elif abs(value - prev_value) > tolerance:
+                        changed = True
+                    else:
+                        # Keep comparing with the earlier value, so
+                        # that slow drifts are still seen.
+                        continue
+
+            state[variable] = (stored, value)
+
+        return changed
+
+
 # Discrete (ish) variables
 class Property (Stream):
+    # Properties change in steps
+    interpolation = "step"
+
     def __init__ (self, title, type, options = None, min = None, max = None, unit = None, setter = None):
         Stream.__init__(self, title, type, unit)
 
@@ -309,6 +492,7 @@ class Property (Stream):
 
         try:
             self.check(value)
+            self.emit("set", value = value)
             return defer.maybeDeferred(self._setter, value)
         except Exception as err:
             return defer.fail(err)
@@ -326,6 +510,10 @@ class Property (Stream):
 
             data.Variable._push(self, value, time)
 
+    def _push_many (self, values, times):
+        values, times = self._step_changes(values, times)
+        data.Variable._push_many(self, values, times)
+
     def check (self, value):
         if self.options is not None and value not in self.options:
             raise data.errors.InvalidValue(f"{self.alias}: {value!r} is not a valid option. Allowed values: {self.options}")
@@ -0,0 +1,111 @@
+from twisted.internet import defer, task
+from twisted.trial import unittest
+
+from .. import machine
+from ... import scheduler
+from ...image.data import ImageProperty
+
+
+class AdaptiveTestCase (unittest.TestCase):
+    def setUp (self):
+        self.clock = task.Clock()
+        self.s = scheduler.Scheduler(self.clock)
+
+        self.stream = machine.Stream("Temperature", float)
+        self.setpoint = machine.Property("Setpoint", float, setter = lambda value: None)
+        self.step = 0
+        self.noise = 0
+        self.runs = []
+
+        self.adaptive = machine._Adaptive({ self.stream: 0.1 }, 1, 0.25, 8)
+        self.poll = self.s.add(self.poll_device, 1)
+        self.adaptive.start(self.poll, [self.setpoint])
+
+    def poll_device (self):
+        self.adaptive.update()
+        self.runs.append(self.clock.seconds())
+        self.stream._push(20 + self.step * len(self.runs) + self.noise * (len(self.runs) % 2))
+
+    def test_bounds (self):
+        adaptive = machine._Adaptive([], 1, 0.1, 10)
+        self.assertEqual((adaptive.minimum, adaptive.maximum), (0.125, 8))
+
+    def test_flat (self):
+        self.clock.pump([0.25] * 160)
+
+        self.assertEqual(self.adaptive.interval, 8)
+        self.assertEqual(self.poll.interval, 8)
+
+    def test_ramp (self):
+        self.step = 1
+        self.clock.pump([0.25] * 40)
+
+        self.assertEqual(self.poll.interval, 0.25)
+
+        # Back off once the ramp has finished.
+        self.step = 0
+        self.stream._push(1e6)
+        self.clock.pump([0.25] * 160)
+
+        self.assertEqual(self.poll.interval, 8)
+
+    def test_noise (self):
+        # Changes within the tolerance are not activity.
+        self.noise = 0.05
+        self.clock.pump([0.25] * 160)
+
+        self.assertEqual(self.poll.interval, 8)
+
+    def test_boost (self):
+        self.clock.pump([0.25] * 160)
+        runs = len(self.runs)
+
+        self.setpoint.set(50)
+        self.clock.advance(0)
+
+        self.assertEqual(len(self.runs), runs + 1)
+        self.assertEqual(self.poll.interval, 0.25)
+
+
+class Camera (machine.Machine):
+    adaptive_polling = True
+
+    def setup (self):
+        self.temp = machine.Stream("Temperature", float)
+        self.image = ImageProperty("Image", lambda: None)
+
+
+class MachineTestCase (unittest.TestCase):
+    def setUp (self):
+        self.clock = task.Clock()
+        self.patch(machine, "scheduler", scheduler.Scheduler(self.clock))
+
+        # Never connected.
+        self.machine = Camera(defer.Deferred(), alias = "camera")
+
+    def test_first_poll (self):
+        # The first poll is not held back to the poll's phase.
+        runs = []
+        self.machine._tick(lambda: runs.append(self.clock.seconds()), 1)
+
+        self.assertEqual(runs, [0])
+
+    def test_default_watch (self):
+        # Variables without an archive (e.g. images) are not watched.
+        runs = []
+        self.machine._tick(lambda: runs.append(self.clock.seconds()), 1)
+        self.clock.pump([0.25] * 20)
+
+        self.assertGreaterEqual(len(runs), 4)
+        self.assertEqual(self.flushLoggedErrors(), [])
+
+    def test_error (self):
+        # The device is polled if the change check fails.
+        runs = []
+        self.patch(machine._Adaptive, "_changed", lambda self: 1 / 0)
+        self.machine._tick(lambda: runs.append(self.clock.seconds()), 1, watch = [self.machine.temp])
+
+        self.clock.pump([0.25] * 20)
+
+        self.assertGreaterEqual(len(runs), 4)
+        self.assertEqual(len(self.flushLoggedErrors(ZeroDivisionError)), len(runs))
@@ -149,3 +149,29 @@ class OptionsTestCase (unittest.TestCase):
         
         for value in ("anteater", "bear", "cat"):
             self.assertFailure(self.p_str.set(value), data.errors.InvalidValue)
+
+
+class PushManyTestCase (unittest.TestCase):
+    def test_steps (self):
+        values = ["a", "a", "b", "b", "c", "a"]
+        times = [1, 2, 3, 4, 5, 6]
+
+        single = machine.Property("Single", type=str)
+        for value, time in zip(values, times):
+            single._push(value, time)
+
+        batch = machine.Property("Batch", type=str)
+        batch._push_many(values[:3], times[:3])
+        batch._push_many(values[3:], times[3:])
+
+        self.assertEqual(list(batch._x), list(single._x))
+        self.assertEqual(list(batch._y), list(single._y))
+        self.assertEqual(batch.value, "a")
+
+    def test_convert (self):
+        p = machine.Property("Int", type=int)
+        p._push_many(["1", 2.5, 3], [1, 2, 3])
+
+        self.assertEqual(list(p._y), [1, 1, 2, 2, 3])
+        self.assertEqual(p.value, 3)
+        self.assertEqual(type(p.value), int)
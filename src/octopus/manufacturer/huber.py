@@ -23,6 +23,7 @@ class HuberCC3 (Machine):
 
     protocolFactory = Factory.forProtocol(QueuedLineReceiver)
     name = "Huber CC3"
+    adaptive_polling = True
 
     def setup (self):
 
@@ -69,7 +70,12 @@ class HuberCC3 (Machine):
             for cmd, fn in to_monitor:
                 self.protocol.write(cmd).addCallback(fn)
 
-        self._monitor = self._tick(monitor, 1)
+        self._monitor = self._tick(monitor, 1, watch = {
+            self.bath_temp: 0.1,
+            self.external_temp: 0.1,
+            self.setpoint: None,
+            self.power: None
+        })
 
     def stop (self):
         if self._monitor:
@@ -27,6 +27,7 @@ class IKAEurostar (Machine):
 
     protocolFactory = Factory.forProtocol(IKALineReceiver)
     name = "IKA Eurostar"
+    adaptive_polling = True
 
     def setup (self):
 
@@ -76,7 +77,11 @@ class IKAEurostar (Machine):
             for cmd, fn in to_monitor:
                 self.protocol.write(cmd).addCallback(fn)
 
-        self._monitor = self._tick(monitor, 1)
+        self._monitor = self._tick(monitor, 1, watch = {
+            self.rpm: 5,
+            self.torque: 0.5,
+            self.setpoint: None
+        })
 
     def stop (self):
         if self._monitor:
@@ -117,6 +122,7 @@ class RCT5 (Machine):
 
     protocolFactory = Factory.forProtocol(QueuedLineReceiver)
     name = "IKA RCT 5"
+    adaptive_polling = True
 
     def setup (self):
 
@@ -170,7 +176,12 @@ class RCT5 (Machine):
             for cmd, fn in to_monitor:
                 self.protocol.write(cmd).addCallback(fn)
 
-        self._monitor = self._tick(monitor, 1)
+        self._monitor = self._tick(monitor, 1, watch = {
+            self.external_temperature: 0.1,
+            self.hotplate_temperature: 0.5,
+            self.stirrer_speed: 5,
+            self.viscosity: 1
+        })
 
     def stop (self):
         if self._monitor:
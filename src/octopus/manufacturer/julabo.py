@@ -23,6 +23,7 @@ class JulaboF25 (Machine):
 
     protocolFactory = Factory.forProtocol(QueuedLineReceiver)
     name = "Julabo F25"
+    adaptive_polling = True
 
     def setup (self):
 
@@ -57,7 +58,12 @@ class JulaboF25 (Machine):
             for cmd, fn in to_monitor:
                 self.protocol.write(cmd).addCallback(fn)
 
-        self._monitor = self._tick(monitor, 1)
+        self._monitor = self._tick(monitor, 1, watch = {
+            self.bath_temp: 0.1,
+            self.external_temp: 0.1,
+            self.setpoint_1: None,
+            self.power: None
+        })
 
     def stop (self):
         if self._monitor:
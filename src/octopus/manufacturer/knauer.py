@@ -24,9 +24,7 @@ class K120LineReceiver (QueuedLineReceiver):
             if r is None \
             and self._current.line == "S?" \
             and len(self._buffer) >= 3:
-                line = self._buffer[:3]
-                self._buffer = self._buffer[3:]
-                self.lineReceived(line)
+                self.lineReceived(self._buffer.take(3))
 
         except AttributeError:
             pass
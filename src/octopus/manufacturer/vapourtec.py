@@ -234,71 +234,78 @@ class R2R4 (Machine):
             if timeDiff < -0.05:
                 self._timeZero -= timeDiff
 
+            times = []
+            system, pump1, pump2 = [], [], []
+
             for v in result:
                 if len(v) < 4:
-                    return
+                    break
+
+                times.append(self._timeZero + (float(v[0]) / 10))
+                system.append(int(v[1]) * 10)
+                pump1.append(int(v[2]) * 10)
+                pump2.append(int(v[3]) * 10)
 
-                time = self._timeZero + (float(v[0]) / 10)
-                self.pressure._push(int(v[1]) * 10, time)
-                self.pump1.pressure._push(int(v[2]) * 10, time)
-                self.pump2.pressure._push(int(v[3]) * 10, time)
+            self.pressure._push_many(system, times)
+            self.pump1.pressure._push_many(pump1, times)
+            self.pump2.pressure._push_many(pump2, times)
 
         def interpretHistory (result):
             if result == "OK":
                 return
 
 
+            def pushColumns (data, width, columns):
+                # Push each column of the history data to a variable
+                # in one batch. columns is a list of (variable, fn)
+                # where fn converts a row into the variable's value.
+                rows = [v for v in data if len(v) >= width]
+
+                if len(rows) == 0:
+                    return
+
+                times = [self._timeZero + (float(v[0]) / 10) for v in rows]
+
+                for variable, fn in columns:
+                    variable._push_many([fn(v) for v in rows], times)
+
             for type, parts in [x.split("{") for x in result[:-1].split("}")]:
                 data = [x.split(",") for x in parts.split("&")]
 
                 if type == "T":
-                    for v in data:
-                        if len(v) < 9:
-                            continue
-
-                        time = self._timeZero + (float(v[0]) / 10)
-                        self.heater1.mode._push(heaterMode[v[1]], time)
-                        self.heater1.temp._push(heaterTemp(v[2]), time)
-                        self.heater2.mode._push(heaterMode[v[3]], time)
-                        self.heater2.temp._push(heaterTemp(v[4]), time)
-                        self.heater3.mode._push(heaterMode[v[5]], time)
-                        self.heater3.temp._push(heaterTemp(v[6]), time)
-                        self.heater4.mode._push(heaterMode[v[7]], time)
-                        self.heater4.temp._push(heaterTemp(v[8]), time)
+                    pushColumns(data, 9, [
+                        (self.heater1.mode, lambda v: heaterMode[v[1]]),
+                        (self.heater1.temp, lambda v: heaterTemp(v[2])),
+                        (self.heater2.mode, lambda v: heaterMode[v[3]]),
+                        (self.heater2.temp, lambda v: heaterTemp(v[4])),
+                        (self.heater3.mode, lambda v: heaterMode[v[5]]),
+                        (self.heater3.temp, lambda v: heaterTemp(v[6])),
+                        (self.heater4.mode, lambda v: heaterMode[v[7]]),
+                        (self.heater4.temp, lambda v: heaterTemp(v[8])),
+                    ])
 
                 if type == "W":
-                    for v in data:
-                        if len(v) < 5:
-                            continue
-
-                        time = self._timeZero + (float(v[0]) / 10)
-                        self.heater1.power._push(int(v[1]), time)
-                        self.heater2.power._push(int(v[2]), time)
-                        self.heater3.power._push(int(v[3]), time)
-                        self.heater4.power._push(int(v[4]), time)
+                    pushColumns(data, 5, [
+                        (self.heater1.power, lambda v: int(v[1])),
+                        (self.heater2.power, lambda v: int(v[2])),
+                        (self.heater3.power, lambda v: int(v[3])),
+                        (self.heater4.power, lambda v: int(v[4])),
+                    ])
 
                 if type == "F":
-                    for v in data:
-                        if len(v) < 3:
-                            continue
-
-                        time = self._timeZero + (float(v[0]) / 10)
-                        self.pump1.rate._push(int(v[1]), time)
-                        self.pump2.rate._push(int(v[2]), time)
+                    pushColumns(data, 3, [
+                        (self.pump1.rate, lambda v: int(v[1])),
+                        (self.pump2.rate, lambda v: int(v[2])),
+                    ])
 
                 if type == "V":
-                    for v in data:
-                        if len(v) < 2:
-                            continue
-
-                        time = self._timeZero + (float(v[0]) / 10)
-                        v = int(v[1])
-
-                        self.pump1.input._push("reagent" if v & 1 else "solvent", time)
-                        self.pump2.input._push("reagent" if v & 2 else "solvent", time)
-                        self.loop1._push("inject" if v & 4 else "load", time)
-                        self.loop2._push("inject" if v & 8 else "load", time)
-                        self.output._push("collect" if v & 16 else "waste", time)
+                    pushColumns(data, 2, [
+                        (self.pump1.input, lambda v: "reagent" if int(v[1]) & 1 else "solvent"),
+                        (self.pump2.input, lambda v: "reagent" if int(v[1]) & 2 else "solvent"),
+                        (self.loop1, lambda v: "inject" if int(v[1]) & 4 else "load"),
+                        (self.loop2, lambda v: "inject" if int(v[1]) & 8 else "load"),
+                        (self.output, lambda v: "collect" if int(v[1]) & 16 else "waste"),
+                    ])
 
             # Reset the R2's internal clock before it runs out
             # of numbers for timing (v[0] ~ 2**15 ?)
@@ -1,6 +1,6 @@
 # Twisted Imports
 from twisted.internet import reactor, defer, task
-from twisted.internet.error import TimeoutError, AlreadyCalled, AlreadyCancelled
+from twisted.internet.error import TimeoutError
 from twisted.protocols.basic import LineOnlyReceiver
 from twisted.python import failure
 from twisted.logger import Logger
@@ -10,7 +10,7 @@ from collections import deque
 import logging
 
 # Package Imports
-from ..queue import AsyncQueue, AsyncQueueRetry
+from ..queue import AsyncQueue, AsyncQueueRetry, AsyncQueueDropped, default_priority
 
 
 def _IndexGenerator (max):
@@ -22,6 +22,191 @@ def _IndexGenerator (max):
         i %= max
 
 
+# something weird to do with the brainboxes?
+_brainboxes = b'\xff\xfd\x03\xff\xfd\x00\xff\xfd,'
+
+
+class _ReceiveBuffer (object):
+    """
+    Received data waiting to be framed.
+
+    Data are appended to a bytearray and consumed by moving a cursor.
+    Consumed data are only removed once they make up more than half
+    of the buffer, so framing is linear in the amount of data received
+    however it is divided into messages (or discarded as noise).
+
+    scanned is the number of bytes already searched for a delimiter,
+    so that a search can resume where the previous one finished.
+    """
+
+    __slots__ = ("_data", "_offset", "scanned")
+
+    def __init__ (self):
+        self._data = bytearray()
+        self._offset = 0
+        self.scanned = 0
+
+    def __len__ (self):
+        return len(self._data) - self._offset
+
+    def append (self, data):
+        if isinstance(data, str):
+            data = data.encode('latin-1')
+
+        self._data += data
+
+    def startswith (self, prefix):
+        return self._data.startswith(_bytes(prefix), self._offset)
+
+    def find (self, sub, start = 0):
+        """Return the position of {sub} at or after {start}, or -1."""
+
+        idx = self._data.find(_bytes(sub), self._offset + start)
+        return idx if idx < 0 else idx - self._offset
+
+    def rfind (self, sub, start = 0):
+        """Return the position of the last {sub} at or after {start}, or -1."""
+
+        idx = self._data.rfind(_bytes(sub), self._offset + start)
+        return idx if idx < 0 else idx - self._offset
+
+    def peek (self, start = 0, end = None):
+        """Return a copy of bytes [start:end] without consuming them."""
+
+        offset = self._offset
+        end = len(self._data) if end is None else offset + end
+
+        # Copy once, via a view (the view must be released before
+        # the bytearray can be resized).
+        with memoryview(self._data) as view:
+            return bytes(view[offset + start:end])
+
+    def skip (self, n):
+        """Consume {n} bytes."""
+
+        self._offset = min(self._offset + n, len(self._data))
+        self.scanned = max(0, self.scanned - n)
+
+        if self._offset == len(self._data):
+            del self._data[:]
+            self._offset = 0
+
+        elif self._offset > len(self._data) // 2:
+            del self._data[:self._offset]
+            self._offset = 0
+
+    def take (self, n):
+        """Consume and return {n} bytes."""
+
+        data = self.peek(0, n)
+        self.skip(n)
+
+        return data
+
+
+def _remove (commands, command):
+    # Commands are dicts, so compare by identity.
+    for i, c in enumerate(commands):
+        if c is command:
+            del commands[i]
+            return True
+
+    return False
+
+
+def _bytes (delimiter):
+    # Delimiters may be given as str (e.g. '\r') or bytes.
+    if isinstance(delimiter, str):
+        return delimiter.encode('latin-1')
+
+    return delimiter
+
+
+class RoundTripTimer (object):
+    """
+    Estimates the round-trip time of a connection and derives the time
+    to wait for a response, as TCP does (RFC 6298).
+
+    srtt is the smoothed round-trip time and rttvar its mean deviation.
+    The timeout is srtt + 4 * rttvar, and at least {peak_margin} times
+    the longest of the last {window} round-trip times (peak), so that
+    a device with occasional slow responses does not time out on each
+    of them. It is limited to [floor, ceiling]; until the first
+    response it is {initial}. Each timeout doubles the timeout until
+    a response is next sampled.
+
+    Responses to commands that were sent more than once must not be
+    sampled, as it is not known which transmission they answer.
+    """
+
+    alpha = 1 / 8
+    beta = 1 / 4
+    k = 4
+    window = 256
+    peak_margin = 1.5
+    max_backoff = 64
+
+    def __init__ (self, initial = 1, floor = 0.2, ceiling = 10):
+        self.initial = initial
+        self.floor = floor
+        self.ceiling = ceiling
+
+        self.srtt = None
+        self.rttvar = None
+        self.samples = 0
+        self.timeouts = 0
+        self._backoff = 1
+
+        # Candidates for the peak: (sample number, rtt), with
+        # decreasing rtt (as in data.manipulation.RollingMax).
+        self._peaks = deque()
+
+    @property
+    def peak (self):
+        return self._peaks[0][1] if self._peaks else None
+
+    @property
+    def timeout (self):
+        if self.srtt is None:
+            timeout = self.initial
+        else:
+            timeout = max(
+                self.srtt + self.k * self.rttvar,
+                self.peak * self.peak_margin
+            )
+
+        return min(max(timeout, self.floor) * self._backoff, self.ceiling)
+
+    def sample (self, rtt):
+        """Record a round-trip time of {rtt} seconds."""
+
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar += self.beta * (abs(self.srtt - rtt) - self.rttvar)
+            self.srtt += self.alpha * (rtt - self.srtt)
+
+        peaks = self._peaks
+
+        while peaks and peaks[-1][1] <= rtt:
+            peaks.pop()
+
+        peaks.append((self.samples, rtt))
+
+        if peaks[0][0] <= self.samples - self.window:
+            peaks.popleft()
+
+        self.samples += 1
+        self._backoff = 1
+
+    def expired (self):
+        """Record that a response was not received in time."""
+
+        self.timeouts += 1
+        self._backoff = min(self._backoff * 2, self.max_backoff)
+
+
 class QueuedLineReceiver (LineOnlyReceiver):
 
     class Command (dict):
@@ -31,30 +216,84 @@ class QueuedLineReceiver (LineOnlyReceiver):
         def __setattr__ (self, attr, value):
             self[attr] = value
 
+    # Time to wait for a response (seconds). With adaptive_timeout,
+    # this is only used until the round-trip time has been measured;
+    # the timeout is then derived from the measurements (see
+    # RoundTripTimer, available as self.rtt), within
+    # [timeout_floor, timeout_ceiling].
     timeout = 1
+    adaptive_timeout = True
+    timeout_floor = 0.2
+    timeout_ceiling = 10
+
     character_delay = 0
     max_command_length = 1000
     log = Logger()
 
+    # Debug logging is skipped entirely unless trace is set (so it
+    # costs nothing otherwise). If wire_trace is also set, it records
+    # the bytes sent and received (see protocol.trace).
+    trace = False
+    wire_trace = None
+
+    # A poll that is identical to one already waiting in the queue
+    # is not queued again: both callers receive the one response.
+    # Set to False for devices where a query has side effects.
+    merge_polls = True
+
+    # Maximum number of waiting poll commands. When exceeded, the
+    # oldest is dropped (its Deferred fails with AsyncQueueDropped).
+    max_poll_depth = 20
+
+    # Number of commands that may be awaiting a response at once.
+    # Only for devices that accept requests while busy with others
+    # (typically over TCP). Responses are matched to commands in the
+    # order they were sent, unless commandTag and responseTag are
+    # implemented. Can be changed at any time, e.g. in Machine.setup.
+    pipeline_depth = 1
+
     def __init__ (self):
         self.connection_name = "disconnected"
         self.machine_alias = "machine"
 
         self.queue = AsyncQueue(self._advance, paused = True)
+        self.queue.limits["poll"] = self.max_poll_depth
         self.index = _IndexGenerator(2 ** 16)
+        self._pending_polls = {}
 
-        self._current = None
-        self._queue_d = None
-        self._timeout = None
+        # Commands sent and awaiting a response, oldest first.
+        self._sent = deque()
         self._running = False
 
+        # Commands that timed out, in case a late response arrives.
+        self._late = deque(maxlen = 8)
+        self.rtt = RoundTripTimer(self.timeout, self.timeout_floor, self.timeout_ceiling)
+
+        self._buffer = _ReceiveBuffer()
+
+    @property
+    def _current (self):
+        # The command that the next response is expected to answer.
+        try:
+            return self._sent[0]
+        except IndexError:
+            return None
+
     def connectionMade (self):
         self.queue.resume()
 
     def connectionLost (self, reason):
         self.queue.pause()
 
-    def write (self, line, expectReply = True, wait = 0):
+    def write (self, line, expectReply = True, wait = 0, priority = None):
+        """
+        Queue {line} to be sent to the device.
+
+        priority is "critical", "control" or "poll" (see AsyncQueue).
+        Writes made during a Machine monitoring tick default to "poll",
+        others to "control".
+        """
+
         d = defer.Deferred()
 
         if len(line) > self.max_command_length:
@@ -71,45 +310,121 @@ class QueuedLineReceiver (LineOnlyReceiver):
             wait = float(wait),
             d = d
         )
-        self.queue.append(command)
-
-        self.log.debug(
-            "{log_source.machine_alias!s} [{log_source.connection_name!s}] queued command ({command.index}) {command.line!r}",
-            action = 'queue',
-            command = command,
-            queue_len = len(self.queue)
-        )
+        self._queue(command, priority)
 
         return d
 
+    def _queue (self, command, priority):
+        priority = priority or default_priority()
+
+        # Characters sent one at a time must not be interleaved.
+        self.queue.concurrency = 1 if self.character_delay > 0 else self.pipeline_depth
+
+        if priority == "poll" and self.merge_polls:
+            key = tuple((k, v) for k, v in command.items() if k not in ("index", "d"))
+
+            try:
+                pending = self._pending_polls[key]
+            except KeyError:
+                command.key = key
+                self._pending_polls[key] = command
+            else:
+                pending.setdefault("waiters", []).append(command.d)
+
+                if self.trace:
+                    self.log.debug(
+                        "{log_source.machine_alias!s} [{log_source.connection_name!s}] merged command ({command.index}) {command.line!r} into ({pending.index})",
+                        action = 'merge',
+                        command = command,
+                        pending = pending
+                    )
+
+                return
+
+        self.queue.append(command, priority).addErrback(self._dropped, command)
+
+        if self.trace:
+            self.log.debug(
+                "{log_source.machine_alias!s} [{log_source.connection_name!s}] queued command ({command.index}) {command.line!r}",
+                action = 'queue',
+                command = command,
+                queue_len = len(self.queue)
+            )
+
+    def _forget (self, command):
+        # The command is no longer waiting, so later duplicates
+        # must be queued again.
+        key = command.get("key")
+
+        if key is not None and self._pending_polls.get(key) is command:
+            del self._pending_polls[key]
+
+    def _dropped (self, reason, command):
+        # The queue also reports timeouts, which have already been
+        # passed on to the caller.
+        if not reason.check(AsyncQueueDropped):
+            return
+
+        self._forget(command)
+
+        if self.trace:
+            self.log.debug(
+                "{log_source.machine_alias!s} [{log_source.connection_name!s}] dropped command ({command.index}) {command.line!r}",
+                action = 'drop',
+                command = command
+            )
+
+        self._fire(command, reason.value)
+
+    def _fire (self, command, result):
+        # Fire the Deferred of {command} and of any duplicates merged
+        # into it, with the result or (if an exception) the error.
+        for d in [command.d] + command.get("waiters", []):
+            if isinstance(result, Exception):
+                d.errback(result)
+            else:
+                d.callback(result)
+
     def _advance (self, command):
-        self._current = command
-        self._queue_d = defer.Deferred()
-        
-        self.log.debug(
-            "{log_source.machine_alias!s} [{log_source.connection_name!s}] sent command ({command.index}) {command.line!r}",
-            action = 'send',
-            command = command
-        )
+        self._forget(command)
+        command.done = defer.Deferred()
+        command.tag = self.commandTag(command.line)
+
+        if self.trace:
+            self.log.debug(
+                "{log_source.machine_alias!s} [{log_source.connection_name!s}] sent command ({command.index}) {command.line!r}",
+                action = 'send',
+                command = command
+            )
+
+        data = command.line.encode('ascii') + self.delimiter
+
+        if self.trace and self.wire_trace is not None:
+            self.wire_trace.sent(self.connection_name, data)
 
         if self.character_delay > 0:
-            self.sendLine(command.line.encode('ascii') + self.delimiter)
+            self.sendLine(data)
         else:
-            self.transport.write(command.line.encode('ascii') + self.delimiter)
+            self.transport.write(data)
 
         if command.expectReply:
-            self._timeout = reactor.callLater(
-                (len(command.line) * self.character_delay) + self.timeout,
-                self._timeoutCurrent
+            # Time from the end of sending to the response.
+            command.sent = reactor.seconds() + len(command.line) * self.character_delay
+
+            self._sent.append(command)
+            command.timer = reactor.callLater(
+                (len(command.line) * self.character_delay) + self._responseTimeout(),
+                self._timeoutCommand,
+                command
             )
 
         else:
             # Avoid flooding the network or the device.
             # 30ms is approximately a round-trip time.
-            reactor.callLater(command.wait, command.d.callback, None)
-            reactor.callLater(max(command.wait, 0.03), self._queue_d.callback, None)
+            reactor.callLater(command.wait, self._fire, command, None)
+            reactor.callLater(max(command.wait, 0.03), command.done.callback, None)
 
-        return self._queue_d
+        return command.done
 
     @defer.inlineCallbacks
     def sendLine (self, line: bytes):
@@ -118,23 +433,78 @@ class QueuedLineReceiver (LineOnlyReceiver):
             yield task.deferLater(reactor, self.character_delay, lambda: True)
 
     def dataReceived (self, data: bytes):
-        self._buffer += data
+        if self.trace and self.wire_trace is not None:
+            self.wire_trace.received(self.connection_name, data)
+
+        buffer = self._buffer
+        buffer.append(data)
 
         # something weird to do with the brainboxes?
-        if self._buffer[:9] == b'\xff\xfd\x03\xff\xfd\x00\xff\xfd,':
-            self._buffer = self._buffer[9:]
+        if buffer.startswith(_brainboxes):
+            buffer.skip(len(_brainboxes))
+
+        delimiter = _bytes(self.delimiter)
+
+        # Take every complete line at once. The search resumes where
+        # the last one finished, so a long line is only scanned once.
+        end = buffer.rfind(delimiter, buffer.scanned)
+
+        if end >= 0:
+            lines = buffer.take(end).split(delimiter)
+            buffer.skip(len(delimiter))
 
-        return LineOnlyReceiver.dataReceived(self, b"")
+            for line in lines:
+                if self.transport.disconnecting:
+                    # this is necessary because the transport may be told to lose
+                    # the connection by a line within a larger packet, and it is
+                    # important to disregard all the lines in that packet following
+                    # the one that told it to close.
+                    return
+
+                if len(line) > self.MAX_LENGTH:
+                    return self.lineLengthExceeded(line)
+
+                self.lineReceived(line)
+
+        if len(buffer) > self.MAX_LENGTH:
+            return self.lineLengthExceeded(buffer.take(len(buffer)))
+
+        buffer.scanned = max(0, len(buffer) - len(delimiter) + 1)
 
     def lineReceived (self, line: bytes):
         if len(line) == 0:
             return
 
-        try:
-            self._timeout.cancel()
+        line = line.decode('ascii')
+        tag = self.responseTag(line)
+        command = self._match(tag, self._sent)
+
+        if command is None:
+            # A late response still tells us the round-trip time
+            # (commands are never sent twice), if its tag identifies
+            # the command. Untagged lines may be unsolicited messages,
+            # so are not sampled (Karn's rule).
+            late = self._match(tag, self._late) if tag is not None else None
+
+            if late is not None:
+                _remove(self._late, late)
+                self.rtt.sample(reactor.seconds() - late.sent)
+
+            # Either a late response or an unexpected Message
+            if self.trace:
+                self.log.debug(
+                    "{log_source.machine_alias!s} [{log_source.connection_name!s}] received unexpected response {response!r}",
+                    action = 'unexpected',
+                    response = line
+                )
 
-            command = self._current
+            return self.unexpectedMessage(line)
 
+        _remove(self._sent, command)
+        command.timer.cancel()
+        self.rtt.sample(reactor.seconds() - command.sent)
+
+        if self.trace:
             self.log.debug(
                 "{log_source.machine_alias!s} [{log_source.connection_name!s}] received response ({command.index}) {response!r}",
                 action = 'receive',
@@ -142,23 +512,45 @@ class QueuedLineReceiver (LineOnlyReceiver):
                 response = line
             )
 
-            reactor.callLater(command.wait, command.d.callback, self.processLine(line.decode('ascii')))
-            reactor.callLater(command.wait, self._queue_d.callback, None)
+        reactor.callLater(command.wait, self._fire, command, self.processLine(line))
+        reactor.callLater(command.wait, command.done.callback, None)
 
-        except (AttributeError, AlreadyCalled, AlreadyCancelled):
-            # Either a late response or an unexpected Message
-            self.log.debug(
-                "{log_source.machine_alias!s} [{log_source.connection_name!s}] received unexpected response {response!r}",
-                action = 'unexpected',
-                response = line
-            )
+    def _match (self, tag, commands):
+        # Return the command in {commands} that a response with {tag}
+        # (see responseTag) answers, or None.
+        if not commands:
+            return None
+
+        if tag is None:
+            return commands[0]
+
+        for command in commands:
+            if command.tag == tag:
+                return command
+
+        return None
+
+    def _responseTimeout (self):
+        if self.adaptive_timeout:
+            return self.rtt.timeout
+
+        return self.timeout
+
+    def commandTag (self, line: str):
+        """
+        Return an identifier for command {line} that the device will
+        echo in its response, or None to match responses in order.
+        """
+
+        return None
 
-            return self.unexpectedMessage(line.decode('ascii'))
+    def responseTag (self, line: str):
+        """
+        Return the identifier (see commandTag) of the command that
+        response {line} answers, or None for the oldest command.
+        """
 
-        finally:
-            self._current = None
-            self._queue_d = None
-            self._timeout = None
+        return None
 
     def processLine (self, line: str):
         return line
@@ -166,19 +558,20 @@ class QueuedLineReceiver (LineOnlyReceiver):
     def unexpectedMessage (self, line: bytes):
         pass
 
-    def _timeoutCurrent (self):
-        try:
-            self.log.error(
-                "{log_source.machine_alias!s} [{log_source.connection_name!s}] command timed out ({command.index}) {command.line!r}",
-                action = 'timeout',
-                command = self._current
-            )
-            self._current.d.errback(TimeoutError(self._current.line))
-            self._queue_d.errback(TimeoutError(self._current.line))
+    def _timeoutCommand (self, command):
+        if not _remove(self._sent, command):
+            return
 
-        except AttributeError:
-            # There is actually no current command
-            pass
+        self._late.append(command)
+        self.rtt.expired()
+
+        self.log.error(
+            "{log_source.machine_alias!s} [{log_source.connection_name!s}] command timed out ({command.index}) {command.line!r}",
+            action = 'timeout',
+            command = command
+        )
+        self._fire(command, TimeoutError(command.line))
+        command.done.errback(TimeoutError(command.line))
 
 
 class VaryingDelimiterQueuedLineReceiver (QueuedLineReceiver):
@@ -188,7 +581,7 @@ class VaryingDelimiterQueuedLineReceiver (QueuedLineReceiver):
     length = None
 
     def write (self, line, expect_reply = True, wait = 0, length = None,
-        start_delimiter = None, end_delimiter = None):
+        start_delimiter = None, end_delimiter = None, priority = None):
 
         # length can be a callable, which when passed the
         # contents of the buffer (excluding start delim), should return either
@@ -204,6 +597,9 @@ class VaryingDelimiterQueuedLineReceiver (QueuedLineReceiver):
         if end_delimiter is None:
             end_delimiter = self.end_delimiter
 
+        start_delimiter = _bytes(start_delimiter)
+        end_delimiter = _bytes(end_delimiter)
+
         if callable(length):
             lengthFn = length
             length = None
@@ -226,144 +622,165 @@ class VaryingDelimiterQueuedLineReceiver (QueuedLineReceiver):
             length = length,
             lengthFn = lengthFn,
             endDelimiter = end_delimiter,
-            endDelimiterLength = len(end_delimiter or ''),
+            endDelimiterLength = len(end_delimiter or b''),
             startDelimiter = start_delimiter,
-            startDelimiterLength = len(start_delimiter or ''),
+            startDelimiterLength = len(start_delimiter or b''),
             d = d
         )
-        self.queue.append(command)
+        self._queue(command, priority)
 
         return d
 
     def dataReceived (self, data: bytes):
+        if self.trace and self.wire_trace is not None:
+            self.wire_trace.received(self.connection_name, data)
+
         current = self._current
 
         if current is None:
-            self.log.debug(
-                "{log_source.machine_alias!s} [{log_source.connection_name!s}] received unexpected data {response!r}",
-                action = 'unexpected',
-                response = data
-            )
+            if self.trace:
+                self.log.debug(
+                    "{log_source.machine_alias!s} [{log_source.connection_name!s}] received unexpected data {response!r}",
+                    action = 'unexpected',
+                    response = data
+                )
 
             self.unexpectedMessage(data)
             return
         
-        self.log.debug(
-            "{log_source.machine_alias!s} [{log_source.connection_name!s}] received data ({command.index}) {response!r}",
-            action = 'receive',
-            command = current,
-            response = data
-        )
+        if self.trace:
+            self.log.debug(
+                "{log_source.machine_alias!s} [{log_source.connection_name!s}] received data ({command.index}) {response!r}",
+                action = 'receive',
+                command = current,
+                response = data
+            )
 
-        self._buffer += data
+        buffer = self._buffer
+        buffer.append(data)
 
-        # If there is a start delimiter, discard any data before the delimiter.
-        if current.startDelimiter is not None:
-            try:
-                idx = self._buffer.index(current.startDelimiter)
-                if idx > 0:
-                    self.log.debug(
-                        "{log_source.machine_alias!s} [{log_source.connection_name!s}] discard {discard!r} before start delimiter {command.startDelimiter!r}",
-                        action = 'discard',
-                        command = current,
-                        discard = self._buffer[:idx],
-                        buffer = self._buffer
-                    )
+        # Frame as many responses as are available, in turn for each
+        # command awaiting one.
+        while current is not None:
+            line = self._frame(current, buffer)
 
-                    self._buffer = self._buffer[idx:]
+            if line is None:
+                break
 
-            except ValueError:
-                # Haven't received a start delimiter yet
-                self.log.debug(
-                    "{log_source.machine_alias!s} [{log_source.connection_name!s}] discard {discard!r} before start delimiter {command.startDelimiter!r}",
-                    action = 'discard',
-                    command = current,
-                    discard = self._buffer,
-                    buffer = self._buffer
-                )
+            # (lineReceived logs the response)
+            self.lineReceived(line)
+            current = self._current
 
-                self._buffer = ''
-                return
+        # something weird to do with the brainboxes?
+        if buffer.startswith(_brainboxes):
+            buffer.skip(len(_brainboxes))
 
-        # If the length needs to be calculated, try to do so.
-        if current.length is None and current.lengthFn is not None:
-            try:
-                length = current.lengthFn(self._buffer[current.startDelimiterLength:])
+    def _frame (self, current, buffer):
+        # Return the response to {current} if it has been received,
+        # removing it (and any noise before it) from {buffer}.
+
+        # Noise is logged once rather than per byte skipped.
+        discarded = 0
+
+        # Command attribute access is slow (it falls back to
+        # __getattr__), so read the fields directly.
+        start_delimiter = current["startDelimiter"]
+        start = current["startDelimiterLength"]
+        end_delimiter = current["endDelimiter"]
+        end_length = current["endDelimiterLength"]
+        length_fn = current["lengthFn"]
+        length = current["length"]
+
+        line = None
+
+        while True:
+            # If there is a start delimiter, discard any data before the delimiter.
+            if start_delimiter and not buffer.startswith(start_delimiter):
+                idx = buffer.find(start_delimiter)
+
+                # Haven't received a start delimiter yet. Keep enough
+                # data to hold the start of a partial delimiter.
+                if idx < 0:
+                    idx = max(0, len(buffer) - start + 1)
 
-                if length is not None:
-                    current.length = length
+                discarded += idx
+                buffer.skip(idx)
 
-            except ValueError:
-                self._buffer = self._buffer[1:]
-                return self.dataReceived(b'')
+                if not buffer.startswith(start_delimiter):
+                    break
 
-        # If a length was specified, attempt to return this many characters.
-        if current.length is not None:
-            start = current.startDelimiterLength
-            end = current.startDelimiterLength + current.length
+            # If the length needs to be calculated, try to do so.
+            if length is None and length_fn is not None:
+                try:
+                    length = current.length = length_fn(buffer.peek(start))
 
-            if len(self._buffer) >= end:
-                line = self._buffer[start:end]
+                except ValueError:
+                    discarded += 1
+                    buffer.skip(1)
+                    continue
+
+            # If a length was specified, attempt to return this many characters.
+            if length is not None:
+                end = start + length
+
+                # Wait for the whole message, including the end delimiter.
+                if len(buffer) < end + end_length:
+                    break
 
                 # Check that the end delimiter is present in the correct place
                 # if not, the start delimiter may have been located too early.
                 # Discard the first character in the buffer and start again
-                if current.endDelimiter is not None \
-                and self._buffer[end:end + current.endDelimiterLength] != current.endDelimiter:
-                    self.log.debug(
-                        "{log_source.machine_alias!s} [{log_source.connection_name!s}] Wrong end delimiter. Discard first char of {buffer!r}",
-                        action = 'discard',
-                        command = current,
-                        discard = self._buffer[0],
-                        buffer = self._buffer
-                    )
-
-                    self._buffer = self._buffer[1:]
+                if end_delimiter is not None \
+                and buffer.peek(end, end + end_length) != end_delimiter:
+                    discarded += 1
+                    buffer.skip(1)
 
                     # In this case the length would need to be calculated again
-                    if current.lengthFn is not None:
-                        current.length = None
-
-                # Remove the message from the buffer and return it.
-                else:
-                    self.log.debug(
-                        "{log_source.machine_alias!s} [{log_source.connection_name!s}] received ({command.index}) {line!r}",
-                        action = 'receive',
-                        command = current,
-                        response = line
-                    )
+                    if length_fn is not None:
+                        length = current.length = None
 
-                    self._buffer = self._buffer[end + current.endDelimiterLength:]
-                    self.lineReceived(line.decode('ascii'))
+                    continue
 
-        # If no length was specified, look for the end delimiter
-        elif current.endDelimiter is not None \
-        and current.lengthFn is None:
-            try:
-                # Select data up to the end delimiter
-                idx = self._buffer.index(current.endDelimiter)
-
-            except ValueError:
-                # Haven't received an end delimiter yet
+                # Remove the message from the buffer and return it.
+                line = buffer.peek(start, end)
+                buffer.skip(end + end_length)
+                break
+
+            # If no length was specified, look for the end delimiter
+            elif end_delimiter is not None \
+            and length_fn is None:
+                # Resume the search where the last one finished.
+                idx = buffer.find(end_delimiter, max(start, buffer.scanned))
+
+                if idx < 0:
+                    # Haven't received an end delimiter yet
+                    if self.trace:
+                        self.log.debug(
+                            "{log_source.machine_alias!s} [{log_source.connection_name!s}] waiting for end delimiter {command.endDelimiter!r}",
+                            command = current
+                        )
+
+                    buffer.scanned = max(start, len(buffer) - end_length + 1)
+                    break
+
+                line = buffer.peek(start, idx)
+                buffer.skip(idx + end_length)
+                break
+
+            else:
+                # Waiting for enough data to calculate the length
+                break
+
+        if discarded:
+            # Either data before the start delimiter, or a start
+            # delimiter not followed by the end delimiter at the
+            # right place (so it was located too early).
+            if self.trace:
                 self.log.debug(
-                    "{log_source.machine_alias!s} [{log_source.connection_name!s}] waiting for end delimiter {command.endDelimiter!r}",
+                    "{log_source.machine_alias!s} [{log_source.connection_name!s}] discarded {discarded} bytes before start delimiter {command.startDelimiter!r}",
+                    action = 'discard',
                     command = current,
-                    buffer = self._buffer
+                    discarded = discarded
                 )
-                
-                return
-
-            line = self._buffer[current.startDelimiterLength:idx]
-            self._buffer = self._buffer[idx + current.endDelimiterLength:]
 
-            self.log.debug(
-                "{log_source.machine_alias!s} [{log_source.connection_name!s}] received ({command.index}) {line!r}",
-                command = current,
-                response = line
-            )
-
-            self.lineReceived(line.decode('ascii'))
-
-        # something weird to do with the brainboxes?
-        if self._buffer[:9] == b'\xff\xfd\x03\xff\xfd\x00\xff\xfd,':
-            self._buffer = self._buffer[9:]
+        return line
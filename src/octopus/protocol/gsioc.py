@@ -10,9 +10,13 @@ from time import time as now
 from math import floor
 import logging
 
+# NumPy
+import numpy as np
+
 # Package Imports
 from ..machine import Stream
 from ..transport.gsioc import Slave
+from .basic import RoundTripTimer
 
 
 __all__ = [
@@ -77,9 +81,18 @@ class Receiver (LineReceiver):
     _busy = False
     _timer = None
 
+    # Time to wait for each character (seconds): initially {timeout},
+    # then derived from measured round-trip times (see self.rtt).
+    # A command is sent up to {retries} more times.
+    timeout = 0.2
+    timeout_floor = 0.05
+    timeout_ceiling = 0.5
+    retries = 5
+
     def __init__ (self):
         self._queue = deque()
         self.connection_name = "disconnected"
+        self.rtt = RoundTripTimer(self.timeout, self.timeout_floor, self.timeout_ceiling)
 
     def _log (self, msg, level = None):
         log.msg(
@@ -100,6 +113,10 @@ class Receiver (LineReceiver):
             self._log("discarding data: {!r}".format(data), logging.WARN)
             return
 
+        # A response to a re-sent command may answer either transmission.
+        if not self._resent:
+            self.rtt.sample(reactor.seconds() - self._sent)
+
         # Assume everything other than the last character is
         # junk data (from timed out responses etc.) The program
         # should deal with ensuing errors
@@ -121,17 +138,22 @@ class Receiver (LineReceiver):
         self._d = defer.Deferred()
 
         self.transport.write(string)
-        self._timer = reactor.callLater(0.2, self._timeout, string)
+        self._sent = reactor.seconds()
+        self._resent = False
+        self._timer = reactor.callLater(self.rtt.timeout, self._timeout, string)
 
         return self._d
 
     def _timeout (self, string, count = 0):
-        # Try again (allow 5 retries after a timeout).
-        if count < 5:
+        self.rtt.expired()
+
+        # Try again (allow some retries after a timeout).
+        if count < self.retries:
             self._log("command timed out, retrying: {!s}".format(string), logging.WARN)
 
             self.transport.write(string)
-            self._timer = reactor.callLater(0.5, self._timeout, string, count + 1)
+            self._resent = True
+            self._timer = reactor.callLater(self.rtt.timeout, self._timeout, string, count + 1)
 
         else:
             self._log("command timed out, max retries: {!s}".format(string), logging.WARN)
@@ -463,9 +485,10 @@ class FIFOStream (Stream):
         if not -1 < (expected_timespan / sample_interval) - count < 2:
             sample_interval = (0.75 * (expected_timespan / count)) + (0.25 * self.sample_interval)
 
-        for value in values:
-            current_time += sample_interval
-            self._push(_20b_to_float(value) * factor, current_time)
+        self._push_many(
+            [_20b_to_float(value) * factor for value in values],
+            current_time + sample_interval * np.arange(1, count + 1)
+        )
 
         self._current_20b_value = values[-1]
 
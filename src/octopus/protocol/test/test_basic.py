@@ -0,0 +1,380 @@
+from twisted.internet import defer, reactor, task
+from twisted.internet.error import TimeoutError
+from twisted.internet.testing import StringTransport
+from twisted.trial import unittest
+
+from unittest.mock import Mock
+
+from ...queue import AsyncQueueDropped
+from ..basic import QueuedLineReceiver, VaryingDelimiterQueuedLineReceiver, RoundTripTimer
+
+@defer.inlineCallbacks
+def settle ():
+    # Allow the queue to send the next command.
+    for i in range(5):
+        yield task.deferLater(reactor, 0, lambda: None)
+
+def cancel_timeouts (protocol):
+    for command in protocol._sent:
+        command.timer.cancel()
+
+class QueuedLineReceiverTestCase (unittest.TestCase):
+    def setUp (self):
+        self.p = QueuedLineReceiver()
+        self.p.delimiter = b"\r\n"
+        self.t = StringTransport()
+
+    def tearDown (self):
+        cancel_timeouts(self.p)
+
+    @defer.inlineCallbacks
+    def test_merge_polls (self):
+        a = self.p.write("S?", priority = "poll")
+        b = self.p.write("S?", priority = "poll")
+        c = self.p.write("F?", priority = "poll")
+        self.assertEqual(len(self.p.queue), 2)
+
+        # Control commands are not merged (and are sent first)
+        d = self.p.write("S?")
+        self.assertEqual(len(self.p.queue), 3)
+
+        self.p.makeConnection(self.t)
+        yield settle()
+        self.p.lineReceived(b"control")
+        self.assertEqual((yield d), "control")
+
+        # Merged into the waiting query
+        e = self.p.write("S?", priority = "poll")
+        self.assertEqual(len(self.p.queue), 2)
+
+        yield settle()
+        self.p.lineReceived(b"OK")
+        results = yield defer.gatherResults([a, b, e])
+        self.assertEqual(results, ["OK", "OK", "OK"])
+        self.assertEqual(c.called, False)
+
+        # Once sent, a new query is queued again
+        yield settle()
+        f = self.p.write("F?", priority = "poll")
+        yield settle()
+        self.assertEqual(len(self.p.queue), 1)
+        self.assertEqual(self.t.value(), b"S?\r\nS?\r\nF?\r\n")
+
+    @defer.inlineCallbacks
+    def test_drop_stale (self):
+        self.p.queue.limits["poll"] = 2
+
+        dropped = Mock()
+        a = self.p.write("A?", priority = "poll")
+        a.addErrback(lambda f: f.trap(AsyncQueueDropped) and dropped())
+        b = self.p.write("B?", priority = "poll")
+        b.addErrback(lambda f: f.trap(AsyncQueueDropped) and dropped())
+        c = self.p.write("C?", priority = "poll")
+
+        yield settle()
+        self.assertEqual(dropped.call_count, 1)
+        self.assertEqual(len(self.p.queue), 2)
+
+        # A dropped query is no longer pending
+        self.p.write("A?", priority = "poll").addErrback(lambda f: None)
+        self.assertEqual(len(self.p.queue), 2)
+        self.assertEqual(dropped.call_count, 2)
+
+
+class Tagged (QueuedLineReceiver):
+    # Responses echo the command name: "S?" is answered by "S=1".
+    def commandTag (self, line):
+        return line[0]
+
+    def responseTag (self, line):
+        return line[0]
+
+class PipelineTestCase (unittest.TestCase):
+    def setUp (self):
+        self.t = StringTransport()
+
+    def tearDown (self):
+        cancel_timeouts(self.p)
+
+    @defer.inlineCallbacks
+    def connect (self, protocol, depth):
+        self.p = protocol
+        self.p.delimiter = b"\r"
+        self.p.pipeline_depth = depth
+        self.p.makeConnection(self.t)
+
+        ds = [self.p.write(c, priority = "poll") for c in ("A?", "B?", "C?", "D?")]
+        yield settle()
+
+        defer.returnValue(ds)
+
+    @defer.inlineCallbacks
+    def test_in_order (self):
+        ds = yield self.connect(QueuedLineReceiver(), 3)
+
+        # Three commands are sent without waiting for a response
+        self.assertEqual(self.t.value(), b"A?\rB?\rC?\r")
+
+        self.p.dataReceived(b"a\rb\r")
+        yield settle()
+        self.assertEqual(self.t.value(), b"A?\rB?\rC?\rD?\r")
+
+        self.p.dataReceived(b"c\rd\r")
+        results = yield defer.gatherResults(ds)
+        self.assertEqual(results, ["a", "b", "c", "d"])
+
+    @defer.inlineCallbacks
+    def test_tagged (self):
+        ds = yield self.connect(Tagged(), 4)
+
+        self.p.dataReceived(b"C=3\rA=1\rD=4\rX=0\rB=2\r")
+        results = yield defer.gatherResults(ds)
+        self.assertEqual(results, ["A=1", "B=2", "C=3", "D=4"])
+
+    @defer.inlineCallbacks
+    def test_timeout (self):
+        ds = yield self.connect(Tagged(), 2)
+        ds[0].addErrback(lambda f: f.trap(TimeoutError) and "timeout")
+
+        # A command that times out frees its place in the pipeline
+        self.p._current.timer.reset(0)
+        yield settle()
+        self.assertEqual(self.t.value(), b"A?\rB?\rC?\r")
+
+        self.p.dataReceived(b"C=3\rB=2\r")
+        yield settle()
+        self.p.dataReceived(b"D=4\r")
+        results = yield defer.gatherResults(ds)
+        self.assertEqual(results, ["timeout", "B=2", "C=3", "D=4"])
+
+    @defer.inlineCallbacks
+    def test_varying (self):
+        self.p = VaryingDelimiterQueuedLineReceiver()
+        self.p.pipeline_depth = 2
+        self.p.makeConnection(self.t)
+
+        ds = [self.p.write(c, length = 2, start_delimiter = b">") for c in ("A", "B")]
+        yield settle()
+
+        # Both responses in one packet
+        self.p.dataReceived(b">ab>cd")
+        results = yield defer.gatherResults(ds)
+        self.assertEqual(results, ["ab", "cd"])
+
+
+class RoundTripTimerTestCase (unittest.TestCase):
+    def test_estimate (self):
+        rtt = RoundTripTimer(initial = 1, floor = 0.1, ceiling = 4)
+        rtt.window = 10
+        self.assertEqual(rtt.timeout, 1)
+
+        rtt.sample(0.2)
+        self.assertEqual((rtt.srtt, rtt.rttvar), (0.2, 0.1))
+        self.assertAlmostEqual(rtt.timeout, 0.6)
+
+        rtt.sample(0.4)
+        self.assertAlmostEqual(rtt.srtt, 0.225)
+        self.assertAlmostEqual(rtt.rttvar, 0.125)
+
+        # Steady round-trip times reduce the timeout to the floor
+        for i in range(50):
+            rtt.sample(0.02)
+
+        self.assertAlmostEqual(rtt.srtt, 0.02, places = 3)
+        self.assertEqual(rtt.timeout, 0.1)
+        self.assertEqual(rtt.samples, 52)
+
+        # An occasional slow response raises the timeout while it
+        # is among the last {window} samples.
+        rtt.sample(1)
+        self.assertEqual(rtt.peak, 1)
+        self.assertAlmostEqual(rtt.timeout, 1.5)
+
+        for i in range(10):
+            rtt.sample(0.02)
+
+        self.assertAlmostEqual(rtt.peak, 0.02)
+
+    def test_backoff (self):
+        rtt = RoundTripTimer(initial = 1, floor = 0.1, ceiling = 4)
+
+        rtt.expired()
+        self.assertEqual(rtt.timeout, 2)
+        rtt.expired()
+        rtt.expired()
+        self.assertEqual(rtt.timeout, 4)
+        self.assertEqual(rtt.timeouts, 3)
+
+        rtt.sample(0.5)
+        self.assertAlmostEqual(rtt.timeout, 1.5)
+
+class AdaptiveTimeoutTestCase (unittest.TestCase):
+    def setUp (self):
+        self.p = QueuedLineReceiver()
+        self.p.delimiter = b"\r"
+        self.p.unexpectedMessage = Mock()
+        self.t = StringTransport()
+        self.p.makeConnection(self.t)
+
+    def tearDown (self):
+        cancel_timeouts(self.p)
+
+    @defer.inlineCallbacks
+    def test_sample (self):
+        d = self.p.write("A?")
+        yield settle()
+        self.assertAlmostEqual(self.p._current.timer.getTime() - self.p._current.sent, 1, places = 2)
+
+        self.p.dataReceived(b"a\r")
+        yield d
+        self.assertEqual(self.p.rtt.samples, 1)
+
+        # The timeout now follows the (very short) round-trip time
+        d = self.p.write("B?")
+        yield settle()
+        self.assertAlmostEqual(self.p._current.timer.getTime() - self.p._current.sent, 0.2, places = 2)
+        self.p.dataReceived(b"b\r")
+        yield d
+
+    @defer.inlineCallbacks
+    def test_late (self):
+        d = self.p.write("A?")
+        d.addErrback(lambda f: f.trap(TimeoutError) and "timeout")
+        yield settle()
+
+        self.p._current.timer.reset(0)
+        self.assertEqual((yield d), "timeout")
+        self.assertEqual(self.p.rtt.timeouts, 1)
+
+        # A late response is not passed on. Without a tag it may be
+        # an unsolicited message, so is not sampled.
+        self.p.dataReceived(b"a\r")
+        self.p.unexpectedMessage.assert_called_once_with("a")
+        self.assertEqual(self.p.rtt.samples, 0)
+
+        # The protocol can be set to use a fixed timeout
+        self.p.adaptive_timeout = False
+        d = self.p.write("B?")
+        yield settle()
+        self.assertAlmostEqual(self.p._current.timer.getTime() - self.p._current.sent, 1, places = 2)
+        self.p.dataReceived(b"b\r")
+        yield d
+
+    @defer.inlineCallbacks
+    def test_late_tagged (self):
+        self.p.commandTag = lambda line: line[0]
+        self.p.responseTag = lambda line: line[0].upper()
+
+        d = self.p.write("A?")
+        d.addErrback(lambda f: f.trap(TimeoutError) and "timeout")
+        yield settle()
+
+        self.p._current.timer.reset(0)
+        self.assertEqual((yield d), "timeout")
+
+        # Only the late response to the command is sampled.
+        self.p.dataReceived(b"x\r")
+        self.assertEqual(self.p.rtt.samples, 0)
+
+        self.p.dataReceived(b"a\r")
+        self.assertEqual(self.p.rtt.samples, 1)
+        self.assertEqual(len(self.p._late), 0)
+
+
+class FramingTestCase (unittest.TestCase):
+    def setUp (self):
+        self.t = StringTransport()
+
+    def tearDown (self):
+        cancel_timeouts(self.p)
+
+    def receive (self, chunks):
+        for chunk in chunks:
+            self.p.dataReceived(chunk)
+
+    def test_lines (self):
+        self.p = QueuedLineReceiver()
+        self.p.delimiter = b"\r\n"
+        self.p.lineReceived = Mock()
+        self.p.makeConnection(self.t)
+
+        # Lines and delimiters split across packets
+        self.receive([b"\xff\xfd\x03\xff\xfd\x00\xff\xfd,ab", b"c\r", b"\nde\r\nf", b"\r\n"])
+
+        self.assertEqual(
+            [c[0][0] for c in self.p.lineReceived.call_args_list],
+            [b"abc", b"de", b"f"]
+        )
+        self.assertEqual(len(self.p._buffer), 0)
+
+    def test_line_too_long (self):
+        self.p = QueuedLineReceiver()
+        self.p.MAX_LENGTH = 10
+        self.p.lineLengthExceeded = Mock()
+        self.p.makeConnection(self.t)
+
+        self.receive([b"x" * 6, b"x" * 6])
+        self.p.lineLengthExceeded.assert_called_once_with(b"x" * 12)
+
+    @defer.inlineCallbacks
+    def write (self, chunks, **kwargs):
+        self.p = VaryingDelimiterQueuedLineReceiver()
+        self.p.makeConnection(self.t)
+
+        d = self.p.write("Q", **kwargs)
+        yield settle()
+        self.receive(chunks)
+
+        result = yield d
+        defer.returnValue(result)
+
+    @defer.inlineCallbacks
+    def test_end_delimiter (self):
+        result = yield self.write(
+            [b"noise\x0212", b"3\x03", b"\x04"],
+            start_delimiter = "\x02",
+            end_delimiter = "\x03\x04"
+        )
+        self.assertEqual(result, "123")
+
+    @defer.inlineCallbacks
+    def test_length (self):
+        # The first start delimiter is not followed by the end
+        # delimiter at the right place, so is skipped.
+        result = yield self.write(
+            [b">ab>", b"cd", b"!"],
+            start_delimiter = b">",
+            end_delimiter = b"!",
+            length = 2
+        )
+        self.assertEqual(result, "cd")
+
+    @defer.inlineCallbacks
+    def test_length_fn (self):
+        def length (buffer):
+            if len(buffer) < 1:
+                return None
+
+            return int(buffer[:1])
+
+        result = yield self.write(
+            [b"\nx\n3ab", b"c"],
+            start_delimiter = b"\n",
+            length = length
+        )
+        self.assertEqual(result, "3ab")
+
+    @defer.inlineCallbacks
+    def test_noise (self):
+        # Megabytes of noise (including false start delimiters)
+        # in small packets must not exhaust the stack.
+        noise = b"\x02xx" * 100000
+        packets = [noise[i:i + 4096] for i in range(0, len(noise), 4096)]
+
+        result = yield self.write(
+            packets + [b"\x02ok\r"],
+            start_delimiter = b"\x02",
+            end_delimiter = b"\r",
+            length = 2
+        )
+        self.assertEqual(result, "ok")
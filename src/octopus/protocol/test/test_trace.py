@@ -0,0 +1,54 @@
+from twisted.internet import defer
+from twisted.internet.testing import StringTransport
+from twisted.trial import unittest
+
+from unittest.mock import Mock
+from io import BytesIO
+
+from .. import trace
+from ..basic import QueuedLineReceiver
+from .test_basic import settle
+
+class TraceTestCase (unittest.TestCase):
+    def setUp (self):
+        self.p = QueuedLineReceiver()
+        self.p.delimiter = b"\r"
+        self.p.connection_name = "tcp:pump"
+        self.p.log = Mock()
+        self.p.makeConnection(StringTransport())
+
+    def tearDown (self):
+        trace.disable()
+
+    @defer.inlineCallbacks
+    def poll (self):
+        d = self.p.write("S?")
+        yield settle()
+        self.p.dataReceived(b"S=1")
+        self.p.dataReceived(b"\r")
+        yield d
+
+    @defer.inlineCallbacks
+    def test_disabled (self):
+        yield self.poll()
+        self.assertEqual(self.p.log.debug.call_count, 0)
+
+    @defer.inlineCallbacks
+    def test_wire_trace (self):
+        f = BytesIO()
+        f.close = lambda: None
+        trace.enable(f)
+
+        yield self.poll()
+        self.assertTrue(self.p.log.debug.call_count > 0)
+
+        f.seek(0)
+        records = [(name, kind, data) for t, name, kind, data in trace.read(f)]
+        self.assertEqual(records, [
+            ("tcp:pump", "sent", b"S?\r"),
+            ("tcp:pump", "received", b"S=1"),
+            ("tcp:pump", "received", b"\r"),
+        ])
+
+    def test_not_a_trace (self):
+        self.assertRaises(ValueError, list, trace.read(BytesIO(b"nonsense")))
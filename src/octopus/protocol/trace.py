@@ -0,0 +1,126 @@
+"""
+Binary trace of the bytes sent to and received from devices.
+
+A trace file starts with MAGIC, followed by records of a fixed 15 byte
+header (time as float64, kind as uint8, channel as uint16 and data
+length as uint32; little endian) and the data. Each connection is
+given a channel number the first time it appears, recorded by a
+CHANNEL record whose data is the connection name.
+
+Tracing is enabled for all QueuedLineReceiver protocols with:
+
+    from octopus.protocol import trace
+    trace.enable("wire.trace")
+
+and the trace read back with trace.read("wire.trace").
+"""
+
+# System Imports
+import struct
+import time
+
+# Sibling Imports
+from .basic import QueuedLineReceiver
+
+
+MAGIC = b"OCTWIRE1"
+
+CHANNEL = 0
+SENT = 1
+RECEIVED = 2
+
+_header = struct.Struct("<dBHI")
+_kinds = { SENT: "sent", RECEIVED: "received" }
+
+
+class WireTrace (object):
+    """
+    Writes a wire trace to {file}, a path or a binary file object.
+    """
+
+    def __init__ (self, file):
+        if isinstance(file, str):
+            file = open(file, "wb")
+
+        self._file = file
+        self._channels = {}
+
+        file.write(MAGIC)
+
+    def sent (self, connection, data):
+        self._write(SENT, connection, data)
+
+    def received (self, connection, data):
+        self._write(RECEIVED, connection, data)
+
+    def _write (self, kind, connection, data):
+        t = time.time()
+
+        try:
+            channel = self._channels[connection]
+        except KeyError:
+            channel = self._channels[connection] = len(self._channels)
+            name = str(connection).encode("utf-8")
+            self._file.write(_header.pack(t, CHANNEL, channel, len(name)) + name)
+
+        self._file.write(_header.pack(t, kind, channel, len(data)) + data)
+
+    def flush (self):
+        self._file.flush()
+
+    def close (self):
+        self._file.close()
+
+
+def read (file):
+    """
+    Yield (time, connection name, "sent" or "received", data) for
+    each record in the trace {file} (a path or a binary file object).
+    """
+
+    if isinstance(file, str):
+        with open(file, "rb") as f:
+            yield from read(f)
+            return
+
+    if file.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Not a wire trace")
+
+    channels = {}
+    size = _header.size
+
+    while True:
+        header = file.read(size)
+
+        if len(header) < size:
+            return
+
+        t, kind, channel, length = _header.unpack(header)
+        data = file.read(length)
+
+        if kind == CHANNEL:
+            channels[channel] = data.decode("utf-8")
+        else:
+            yield t, channels.get(channel, channel), _kinds[kind], data
+
+
+def enable (file = None, protocol = QueuedLineReceiver):
+    """
+    Turn on debug logging for {protocol} and its subclasses, and if
+    {file} is given, write a wire trace to it. Returns the WireTrace.
+    """
+
+    protocol.trace = True
+    protocol.wire_trace = None if file is None else WireTrace(file)
+
+    return protocol.wire_trace
+
+
+def disable (protocol = QueuedLineReceiver):
+    """Turn off debug logging and wire tracing for {protocol}."""
+
+    if protocol.wire_trace is not None:
+        protocol.wire_trace.close()
+
+    protocol.trace = False
+    protocol.wire_trace = None
@@ -3,13 +3,62 @@ from twisted.internet import reactor, defer
 
 # System Imports
 from collections import deque
+from contextlib import contextmanager
 import functools
 
 # Sibling Imports
 from .events import Event
 
 
+# Priority used by AsyncQueue.append() when none is given.
+_default_priority = "control"
+
+
+def default_priority ():
+    """Returns the priority given to tasks that do not specify one."""
+
+    return _default_priority
+
+
+@contextmanager
+def priority (name):
+    """
+    Queue tasks appended within the block at priority {name},
+    unless they specify a priority themselves.
+
+    Machine._tick uses this to mark monitoring queries as "poll".
+    """
+
+    global _default_priority
+
+    previous = _default_priority
+    _default_priority = name
+
+    try:
+        yield
+    finally:
+        _default_priority = previous
+
+
 class AsyncQueue (object):
+    """
+    A queue of tasks processed by {worker}, at most {concurrency}
+    at a time.
+
+    Each task has a priority: "critical", "control" (the default) or
+    "poll". Tasks are taken from the highest priority lane that has
+    any, except that a lane which has been passed over
+    {starvation_limit} times in a row is served next, so that polling
+    continues while control commands are being sent.
+
+    The number of waiting tasks of each priority can be bounded by
+    setting limits[priority]. When a lane is full, its oldest task is
+    dropped: its Deferred fails with AsyncQueueDropped.
+    """
+
+    priorities = ("critical", "control", "poll")
+    starvation_limit = 8
+
     @property
     def running (self):
         return self._workers > 0
@@ -18,8 +67,23 @@ class AsyncQueue (object):
     def current (self):
         return self._current
 
+    @property
+    def concurrency (self):
+        return self._concurrency
+
+    @concurrency.setter
+    def concurrency (self, value):
+        increased = value > self._concurrency
+        self._concurrency = value
+
+        if increased:
+            reactor.callLater(0, self._process)
+
     def __init__ (self, worker, concurrency = 1, paused = False):
-        self._tasks = deque()
+        self._lanes = [deque() for p in self.priorities]
+        self._skipped = [0] * len(self.priorities)
+        self._lane_index = { p: i for i, p in enumerate(self.priorities) }
+        self.limits = {}
         self._worker = worker
         self._workers = 0
         self._concurrency = concurrency
@@ -35,57 +99,111 @@ class AsyncQueue (object):
         self._paused -= 1
         self._process()
 
-    def append (self, data):
-        task = _AsyncQueueTask(data)
-        self._tasks.append(task)
-        reactor.callLater(0, self._process)
-        return task.d
+    def _add (self, data, priority, left = False):
+        priority = priority or _default_priority
+
+        try:
+            lane = self._lanes[self._lane_index[priority]]
+        except KeyError:
+            raise ValueError("Unknown priority {!r}".format(priority))
 
-    def appendleft (self, data):
         task = _AsyncQueueTask(data)
-        self._tasks.appendleft(task)
-        reactor.callLater(0, self._process)
-        return task.d
 
-    def _process (self):
-        if not self._paused and self._workers < self._concurrency:
-            def run (task):
-                worker_d = defer.maybeDeferred(self._worker, task.data)
-                worker_d.addCallbacks(success, error)
+        if left:
+            lane.appendleft(task)
+        else:
+            lane.append(task)
 
-            def success (result):
-                task.d.callback(result)
-                next()
+        # Drop the stalest task if the lane is over its limit.
+        limit = self.limits.get(priority)
 
-            def error (reason):
-                if reason.type is AsyncQueueRetry:
-                    run(task)
-                else:
-                    task.d.errback(reason)
-                    next()
+        if limit is not None and len(lane) > limit:
+            dropped = lane.pop() if left else lane.popleft()
+            dropped.d.errback(AsyncQueueDropped(priority))
 
-            def next ():
-                self._workers -= 1
-                self._current.discard(task)
-                reactor.callLater(0, self._process)
+        reactor.callLater(0, self._process)
+        return task.d
 
+    def append (self, data, priority = None):
+        return self._add(data, priority)
+
+    def appendleft (self, data, priority = None):
+        return self._add(data, priority, left = True)
+
+    def _popleft (self):
+        # Take the next task, from the highest priority lane unless
+        # another lane has been passed over too many times.
+        lanes = self._lanes
+        skipped = self._skipped
+        chosen = None
+
+        for i, lane in enumerate(lanes):
+            if lane:
+                if chosen is None:
+                    chosen = i
+                elif skipped[i] >= self.starvation_limit:
+                    chosen = i
+                    break
+
+        if chosen is None:
+            raise IndexError("pop from an empty queue")
+
+        for i, lane in enumerate(lanes):
+            if i == chosen or not lane:
+                skipped[i] = 0
+            else:
+                skipped[i] += 1
+
+        return lanes[chosen].popleft()
+
+    def _process (self):
+        # Start as many tasks as the concurrency allows.
+        while not self._paused and self._workers < self._concurrency:
             try:
-                task = self._tasks.popleft()
+                task = self._popleft()
             except IndexError:
                 self.drained()
-            else:
-                self._workers += 1
-                self._current.add(task)
+                return
+
+            self._workers += 1
+            self._current.add(task)
+            self._start(task)
+
+    def _start (self, task):
+        def run (task):
+            worker_d = defer.maybeDeferred(self._worker, task.data)
+            worker_d.addCallbacks(success, error)
+
+        def success (result):
+            task.d.callback(result)
+            next()
+
+        def error (reason):
+            if reason.type is AsyncQueueRetry:
                 run(task)
+            else:
+                task.d.errback(reason)
+                next()
+
+        def next ():
+            self._workers -= 1
+            self._current.discard(task)
+            reactor.callLater(0, self._process)
+
+        run(task)
 
     def __len__ (self):
-        return len(self._tasks)
+        return sum(len(lane) for lane in self._lanes)
 
 
 class AsyncQueueRetry (Exception):
     pass
 
 
+class AsyncQueueDropped (Exception):
+    pass
+
+
 class _AsyncQueueTask (object):
     def __init__ (self, data, deferred = None):
         self.data = data
@@ -0,0 +1,274 @@
+"""
+A single scheduler for the periodic polls of all machines.
+
+Polls with the same interval are given evenly spread phases, so that
+machines do not all query their devices on the same reactor turn.
+Run times are computed from a fixed origin on a monotonic clock, so
+they do not drift however late each run starts, and wall-clock
+adjustments have no effect.
+
+A poll's interval can be changed while it runs (Poll.reschedule()),
+keeping its phase; this is used by the adaptive polling of machines.
+"""
+
+# Twisted Imports
+from twisted.internet import reactor, defer
+from twisted.python import log, failure
+
+# System Imports
+import heapq
+import itertools
+import logging
+import time
+
+
+def _phase (n):
+    # Fraction of the interval at which the {n}th poll with a given
+    # interval runs: 0, 1/2, 1/4, 3/4, 1/8, ... (van der Corput), so
+    # that polls are evenly spread however many there are.
+    phase, denominator = 0.0, 1
+
+    while n:
+        denominator *= 2
+        n, bit = divmod(n, 2)
+        phase += bit / denominator
+
+    return phase
+
+
+class Poll (object):
+    """
+    A function run periodically by a Scheduler.
+
+    If the function returns a Deferred, the run lasts until it fires.
+    A run that is still in progress when the poll is next due is not
+    repeated (skipped is incremented), and one that lasts longer than
+    {deadline} seconds is cancelled (overruns is incremented).
+    """
+
+    def __init__ (self, scheduler, fn, interval, deadline, phase, name):
+        self.scheduler = scheduler
+        self.fn = fn
+        self.interval = interval
+        self.deadline = deadline
+        self.phase = phase
+        self.origin = scheduler._epoch + phase * interval
+        self.name = name
+
+        self.due = None
+        self.runs = 0
+        self.skipped = 0
+        self.overruns = 0
+
+        self._running = True
+        self._current = None
+        self._timer = None
+
+    @property
+    def running (self):
+        """True until stop() is called (as for LoopingCall)."""
+
+        return self._running
+
+    @property
+    def busy (self):
+        """True while a run is in progress."""
+
+        return self._current is not None
+
+    def stop (self):
+        self._running = False
+        self.scheduler._remove(self)
+
+        if self._timer is not None and self._timer.active():
+            self._timer.cancel()
+
+        self._timer = None
+
+    def reschedule (self, interval = None, soon = False):
+        """
+        Change the interval to {interval} seconds, keeping the poll's
+        phase, and run next on the new grid; or as soon as possible if
+        {soon} is True.
+        """
+
+        if interval is not None:
+            if interval <= 0:
+                raise ValueError("Interval must be positive")
+
+            self.interval = interval
+            self.origin = self.scheduler._epoch + self.phase * interval
+
+        if not self._running:
+            return
+
+        now = self.scheduler.seconds()
+        self.due = now if soon else self._next(now)
+        self.scheduler._update(self)
+
+    def _next (self, now):
+        # The first run time after {now} on this poll's grid.
+        n = (now - self.origin) // self.interval + 1
+        return self.origin + max(n, 0) * self.interval
+
+    def _run (self):
+        if self._current is not None:
+            self.skipped += 1
+            return
+
+        self.runs += 1
+
+        try:
+            result = self.fn()
+        except Exception:
+            log.err(None, "Error in poll {!s}".format(self.name))
+            return
+
+        if not isinstance(result, defer.Deferred):
+            return
+
+        if self.deadline is not None:
+            self._timer = self.scheduler.clock.callLater(self.deadline, self._overrun, result)
+
+        self._current = result
+        result.addBoth(self._finished, result)
+
+    def _finished (self, result, d):
+        if self._current is d:
+            self._current = None
+
+            if self._timer is not None and self._timer.active():
+                self._timer.cancel()
+
+            self._timer = None
+
+        if isinstance(result, failure.Failure):
+            if not result.check(defer.CancelledError):
+                log.err(result, "Error in poll {!s}".format(self.name))
+
+    def _overrun (self, d):
+        self._timer = None
+        self.overruns += 1
+
+        log.msg(
+            "Poll {!s} did not complete within {:g} s".format(self.name, self.deadline),
+            logLevel = logging.WARN
+        )
+
+        d.cancel()
+
+        # Do not wait for a Deferred that cannot be cancelled.
+        if self._current is d:
+            self._current = None
+
+    def __repr__ (self):
+        return "<Poll {!s} every {:g} s>".format(self.name, self.interval)
+
+
+class Scheduler (object):
+    """
+    Runs periodic polls from one timer.
+
+    Times are taken from {clock}.seconds() if a clock (such as
+    twisted.internet.task.Clock) is given, otherwise from a monotonic
+    clock; delays are always scheduled with {clock}.callLater().
+    """
+
+    def __init__ (self, clock = None):
+        self.clock = clock or reactor
+        self.seconds = time.monotonic if clock is None else clock.seconds
+
+        self._epoch = self.seconds()
+        self._heap = []
+        self._counter = itertools.count()
+        self._phases = {}
+        self._timer = None
+
+    def add (self, fn, interval, deadline = None, name = None, now = False):
+        """
+        Run {fn} every {interval} seconds, and return its Poll.
+
+        If {deadline} is given, a run that has not completed after
+        that many seconds is cancelled. If {now} is True, {fn} is also
+        run straight away (as LoopingCall.start(now = True)), and then
+        on the poll's grid.
+        """
+
+        if interval <= 0:
+            raise ValueError("Interval must be positive")
+
+        n = self._phases.get(interval, 0)
+        self._phases[interval] = n + 1
+
+        poll = Poll(self, fn, interval, deadline, _phase(n), name or getattr(fn, "__name__", "poll"))
+        poll.due = poll._next(self.seconds())
+
+        self._push(poll)
+
+        if now:
+            poll._run()
+
+        return poll
+
+    @property
+    def polls (self):
+        return [poll for due, i, poll in self._heap]
+
+    def _push (self, poll):
+        heapq.heappush(self._heap, (poll.due, next(self._counter), poll))
+
+        if self._heap[0][2] is poll:
+            self._schedule()
+
+    def _remove (self, poll):
+        heap = self._heap
+        remaining = [entry for entry in heap if entry[2] is not poll]
+
+        if len(remaining) != len(heap):
+            heap[:] = remaining
+            heapq.heapify(heap)
+            self._schedule()
+
+    def _update (self, poll):
+        # Move {poll} to its new due time.
+        heap = self._heap
+        heap[:] = [entry for entry in heap if entry[2] is not poll]
+        heapq.heapify(heap)
+        heapq.heappush(heap, (poll.due, next(self._counter), poll))
+
+        self._schedule()
+
+    def _schedule (self):
+        if self._timer is not None and self._timer.active():
+            self._timer.cancel()
+
+        self._timer = None
+
+        if self._heap:
+            delay = max(self._heap[0][0] - self.seconds(), 0)
+            self._timer = self.clock.callLater(delay, self._fire)
+
+    def _fire (self):
+        self._timer = None
+        now = self.seconds()
+        heap = self._heap
+
+        # Allow for timer resolution.
+        limit = now + 1e-6
+
+        while heap and heap[0][0] <= limit:
+            due, i, poll = heapq.heappop(heap)
+
+            # The next run is on the poll's grid after now, so a
+            # late run does not shift later runs, nor cause a burst
+            # of catch-up runs.
+            poll.due = poll._next(max(now, due))
+            heapq.heappush(heap, (poll.due, next(self._counter), poll))
+
+            poll._run()
+
+        self._schedule()
+
+
+# Used by Machine._tick().
+scheduler = Scheduler()
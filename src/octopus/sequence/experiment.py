@@ -3,12 +3,12 @@ from twisted.internet import reactor, defer
 from twisted.python import log
 
 # System Imports
-import os
 import re
 import logging
 from collections import deque
 
 # Sibling Imports
+from .logfile import LogFile, RunLog
 from ..data import Variable as data_Variable
 from ..util import now
 from ..events import Event
@@ -17,33 +17,6 @@ from ..machine.interface import InterfaceSection, InterfaceSectionSet
 from ..constants import Event as EventType, State
 
 
-class LogFile (object):
-
-    @classmethod
-    def get_dir (cls, name):
-        cwd = os.getcwd()
-        counter = 1
-
-        if os.path.isdir(os.path.join(cwd, name)):
-            while os.path.isdir(os.path.join(cwd, name + "." + str(counter))):
-                counter += 1
-            name = name + "." + str(counter)
-
-        os.mkdir(os.path.join(cwd, name))
-
-        return name
-
-    def __init__ (self, output_name, var_name, time_zero):
-        self.f = open(os.path.join(os.getcwd(), output_name, var_name + ".csv"), "w+")
-        self.time_zero = time_zero
-
-    def write (self, time, value):
-        self.f.write("{:.2f},{:.2f},{}\n".format(time, time - self.time_zero, value).encode())
-
-    def close (self):
-        self.f.close()
-
-
 class Timer (data_Variable):
     def __init__ (self):
         self.time_zero = now()
@@ -58,6 +31,10 @@ class Experiment (object):
     title = "Untitled Experiment"
     default_log_output = "main"
 
+    # "csv" for a LogFile per variable, or "binary" for a single
+    # RunLog (see logfile.py).
+    log_format = "csv"
+
     @property
     def id (self):
         return self._id
@@ -352,11 +329,22 @@ class Experiment (object):
 
             self._log_variables.update(self.interface.properties)
 
+        if self.log_format == "binary":
+            run_log = RunLog(name, time_zero)
+
+            def log_file (key, type = str, unit = None):
+                return run_log.channel(key, type, unit)
+        else:
+            run_log = None
+
+            def log_file (key, type = str, unit = None):
+                return LogFile(name, key, time_zero)
+
         items = self._log_variables.items()
 
         for key, var in items:
             try:
-                var.setLogFile(LogFile(name, key, time_zero))
+                var.setLogFile(log_file(key, var.type, getattr(var, "unit", None)))
                 var.truncate()
             except AttributeError:
                 pass
@@ -364,11 +352,13 @@ class Experiment (object):
         try:
             self._event_log.close()
             self._msg_log.close()
+            self._run_log.close()
         except AttributeError:
             pass
 
-        self._event_log = LogFile(name, "events", time_zero)
-        self._msg_log = LogFile(name, "log", time_zero)
+        self._event_log = log_file("events")
+        self._msg_log = log_file("log")
+        self._run_log = run_log
 
         self._logging = True
         self._time_zero = time_zero
@@ -399,8 +389,16 @@ class Experiment (object):
         except AttributeError:
             pass
 
+        try:
+            self._run_log.close()
+            self._run_log = None
+        except AttributeError:
+            pass
+
 
 class Variable (data_Variable):
+    interpolation = "step"
+
     def __init__ (self, title, type, unit = None):
         data_Variable.__init__(self, type)
 
@@ -424,5 +422,9 @@ class Variable (data_Variable):
 
             data_Variable._push(self, value, time)
 
+    def _push_many (self, values, times):
+        values, times = self._step_changes(values, times)
+        data_Variable._push_many(self, values, times)
+
     def get (self, start, interval = None, step = 1):
         return self._archive.get(start, interval)
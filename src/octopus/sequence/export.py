@@ -0,0 +1,341 @@
+"""
+Export of run logs to columnar files (Parquet or Feather), and
+reading them back by variable and time range.
+
+A run directory, as written by Experiment.set_log_output() (CSV
+LogFiles or a RunLog), is converted with export() into either a file
+per group of variables (by default, per machine: the part of the
+alias before the first "."), or one wide file with all variables
+resampled onto a common time grid. Every file has a sorted "time"
+column and is written in row groups (Parquet) or record batches
+(Feather), so that read() only loads the row groups that overlap the
+requested time range, and only the requested columns.
+
+Parquet files also carry statistics (min / max) for every column of
+every row group. Exporting and reading require pyarrow, which is
+imported only when they are called.
+"""
+
+# System Imports
+import os
+import json
+
+# Sibling Imports
+from . import logfile
+
+import numpy as np
+
+
+_extensions = { "parquet": ".parquet", "feather": ".feather" }
+
+
+def load (directory):
+    """
+    Return the time zero of the run logged in {directory} and a dict
+    of pandas Series of values indexed by time, by alias.
+
+    Reads run.octlog if present, otherwise the CSV files.
+    """
+
+    import pandas as pd
+
+    run_log = os.path.join(directory, "run.octlog")
+    series = {}
+
+    if os.path.exists(run_log):
+        time_zero, variables = logfile.header(run_log)
+        times = {}
+        values = {}
+
+        for alias, t, value in logfile.read(run_log):
+            try:
+                times[alias].append(t)
+                values[alias].append(value)
+            except KeyError:
+                times[alias] = [t]
+                values[alias] = [value]
+
+        for alias in times:
+            series[alias] = pd.Series(values[alias], index = times[alias], name = alias)
+
+        return time_zero, series
+
+    time_zero = None
+
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".csv"):
+            continue
+
+        alias = name[:-len(".csv")]
+        times, values, first = _read_csv(os.path.join(directory, name))
+
+        if len(times) == 0:
+            continue
+
+        if time_zero is None:
+            time_zero = first
+
+        series[alias] = pd.Series(values, index = times, name = alias)
+
+    return time_zero, series
+
+
+def _read_csv (path):
+    # The times and values in a CSV log, and its time zero. Values
+    # (e.g. of the events and messages logs) can contain commas, so
+    # each line is split on its first two only, as in LogReader.
+    # Numeric values are returned as floats, others as text.
+    times = []
+    values = []
+    time_zero = None
+
+    with open(path, encoding = "utf-8", newline = "") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break
+
+            # Skip the continuation lines of multi-line values.
+            try:
+                time, elapsed, value = line[:-1].split(",", 2)
+                time = float(time)
+                elapsed = float(elapsed)
+            except ValueError:
+                continue
+
+            if time_zero is None:
+                time_zero = round(time - elapsed, 2)
+
+            try:
+                value = float(value)
+            except ValueError:
+                pass
+
+            times.append(time)
+            values.append(value)
+
+    return times, values, time_zero
+
+
+def group_by_machine (aliases):
+    """
+    Group {aliases} by machine: the part of each alias before the
+    first "." (aliases without a "." form their own groups).
+    """
+
+    result = {}
+
+    for alias in aliases:
+        result.setdefault(alias.split(".", 1)[0], []).append(alias)
+
+    return result
+
+
+def _unique (series):
+    # Keep the last value at each time (properties log step changes
+    # as two values at the same time).
+    series = series[~series.index.duplicated(keep = "last")]
+    return series.sort_index()
+
+
+def resample (series, interval, start = None, end = None):
+    """
+    Return a DataFrame of the Series in {series} (a dict by alias)
+    sampled every {interval} seconds from {start} to {end} (by
+    default, the whole run). Each value is the most recent at or
+    before the grid time.
+    """
+
+    import pandas as pd
+
+    series = { alias: _unique(s) for alias, s in series.items() if len(s) > 0 }
+
+    if start is None:
+        start = min(s.index[0] for s in series.values())
+
+    if end is None:
+        end = max(s.index[-1] for s in series.values())
+
+    grid = start + interval * np.arange(int(np.floor((end - start) / interval)) + 1)
+
+    return pd.DataFrame(
+        { alias: s.reindex(grid, method = "ffill") for alias, s in series.items() },
+        index = pd.Index(grid, name = "time")
+    )
+
+
+def _combine (series):
+    # One DataFrame with the union of the times of {series}.
+    import pandas as pd
+
+    frame = pd.concat([_unique(s) for s in series], axis = 1).sort_index()
+    frame.index.name = "time"
+
+    return frame
+
+
+def _write (frame, path, format, row_group_size, metadata):
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(frame.reset_index(), preserve_index = False)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        b"octopus": json.dumps(metadata).encode("utf-8")
+    })
+
+    if format == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(table, path, row_group_size = row_group_size, write_statistics = True)
+    elif format == "feather":
+        import pyarrow.feather as feather
+        feather.write_feather(table, path, chunksize = row_group_size, compression = "uncompressed")
+    else:
+        raise ValueError("Unknown format {!r}".format(format))
+
+
+def export (directory, output = None, format = "parquet", interval = None, groups = None, row_group_size = 65536):
+    """
+    Convert the run logged in {directory} to {format} ("parquet" or
+    "feather") files in {output} (by default, {directory}).
+
+    If {interval} is given, all variables are resampled every
+    {interval} seconds into one file, run.parquet (or run.feather).
+    Otherwise each group of variables is written to its own file,
+    <group>.parquet: {groups} is a dict of lists of aliases by group
+    name, by default one group per machine (see group_by_machine()).
+
+    Returns the paths of the files written.
+    """
+
+    if format not in _extensions:
+        raise ValueError("Unknown format {!r}".format(format))
+
+    output = directory if output is None else output
+    time_zero, series = load(directory)
+    metadata = { "time_zero": time_zero }
+    paths = []
+
+    if interval is not None:
+        path = os.path.join(output, "run" + _extensions[format])
+        _write(resample(series, interval), path, format, row_group_size, metadata)
+
+        return [path]
+
+    if groups is None:
+        groups = group_by_machine(series.keys())
+
+    for name, aliases in groups.items():
+        aliases = [alias for alias in aliases if alias in series]
+
+        if len(aliases) == 0:
+            continue
+
+        path = os.path.join(output, name + _extensions[format])
+        _write(_combine([series[alias] for alias in aliases]), path, format, row_group_size, metadata)
+        paths.append(path)
+
+    return paths
+
+
+def _overlaps (t_min, t_max, start, end):
+    return (start is None or t_max >= start) and (end is None or t_min <= end)
+
+
+def _read_parquet (path, variables, start, end):
+    import pyarrow.parquet as pq
+
+    f = pq.ParquetFile(path)
+    names = f.schema_arrow.names
+    columns = [c for c in names if c != "time" and (variables is None or c in variables)]
+
+    if len(columns) == 0:
+        return None
+
+    index = names.index("time")
+    selected = []
+
+    for i in range(f.metadata.num_row_groups):
+        stats = f.metadata.row_group(i).column(index).statistics
+
+        if stats is None or not stats.has_min_max \
+        or _overlaps(stats.min, stats.max, start, end):
+            selected.append(i)
+
+    return f.read_row_groups(selected, columns = ["time"] + columns)
+
+
+def _read_feather (path, variables, start, end):
+    import pyarrow as pa
+
+    reader = pa.ipc.open_file(pa.memory_map(path))
+    names = reader.schema.names
+    columns = [c for c in names if c != "time" and (variables is None or c in variables)]
+
+    if len(columns) == 0:
+        return None
+
+    index = names.index("time")
+    selected = []
+
+    # Batches are in time order, so the first and last times give
+    # the range of each (read from the memory map, not copied).
+    for i in range(reader.num_record_batches):
+        batch = reader.get_batch(i)
+        times = batch.column(index)
+
+        if len(times) > 0 and _overlaps(times[0].as_py(), times[len(times) - 1].as_py(), start, end):
+            selected.append(batch)
+
+    return pa.Table.from_batches(selected, reader.schema).select(["time"] + columns)
+
+
+def read (path, variables = None, start = None, end = None):
+    """
+    Return a DataFrame indexed by time of {variables} (by default,
+    all) from {start} to {end} (by default, the whole run), read from
+    an exported file or a directory of them at {path}.
+
+    Only the row groups that overlap the time range are read.
+    """
+
+    import pandas as pd
+
+    if os.path.isdir(path):
+        paths = sorted(
+            os.path.join(path, name)
+            for name in os.listdir(path)
+            if os.path.splitext(name)[1] in _extensions.values()
+        )
+    else:
+        paths = [path]
+
+    if variables is not None:
+        variables = set(variables)
+
+    frames = []
+
+    for p in paths:
+        if p.endswith(_extensions["feather"]):
+            table = _read_feather(p, variables, start, end)
+        else:
+            table = _read_parquet(p, variables, start, end)
+
+        if table is None:
+            continue
+
+        frame = table.to_pandas().set_index("time")
+
+        if start is not None:
+            frame = frame[frame.index >= start]
+
+        if end is not None:
+            frame = frame[frame.index <= end]
+
+        frames.append(frame)
+
+    if len(frames) == 0:
+        return pd.DataFrame(index = pd.Index([], name = "time"))
+
+    if len(frames) == 1:
+        return frames[0]
+
+    return pd.concat(frames, axis = 1).sort_index()
@@ -0,0 +1,686 @@
+"""
+Log files for the variables of an experiment.
+
+LogFile writes one CSV file per variable. RunLog writes all variables
+to one binary file, which read(), to_csv() and to_dataframes() expand
+back into per-variable data.
+
+A run log starts with MAGIC, followed by records of a fixed 14 byte
+header (value length as uint32, variable id as uint16 and time as
+float64; little endian) and the value: float64, int64, bool (one
+byte) or UTF-8 text, according to the type of the variable. Records
+with id 0 hold metadata as UTF-8 JSON: first the run's time zero, then
+a definition ({"id", "alias", "type", "unit"}) for each variable,
+written before its first value.
+
+Both are written by a background thread, see _BufferedFile.
+
+LogReader reads a time range from the CSV logs of a run without
+scanning them from the start, using a sparse seek index kept next to
+each log file.
+"""
+
+# Twisted Imports
+from twisted.python import log
+
+# System Imports
+import os
+import json
+import time
+import atexit
+import bisect
+import struct
+import threading
+
+
+MAGIC = b"OCTLOG01"
+INDEX_MAGIC = b"OCTIDX01"
+
+_header = struct.Struct("<IHd")
+
+# Value formats by type name. Variables of other types are logged
+# as text.
+_formats = {
+    "float": (float, "d"),
+    "int": (int, "q"),
+    "bool": (bool, "?"),
+    "str": (str, None),
+}
+
+
+class _BufferedFile (object):
+    """
+    A file written by the background thread (see _LogWriter).
+
+    Records are buffered in memory and written out once flush_size
+    characters (or bytes) are waiting or flush_interval seconds have
+    passed, so that a slow disk does not hold up the reactor. If
+    fsync_interval is set, the file is also synced to disk at most
+    that often (0: after every write).
+    """
+
+    flush_interval = 1
+    flush_size = 65536
+    fsync_interval = None
+
+    # Joins buffered records (str or bytes).
+    _empty = ""
+
+    def __init__ (self, f):
+        self.f = f
+        self.closed = False
+
+        self._buffer = []
+        self._size = 0
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._flushed = self._synced = time.monotonic()
+
+        _writer.add(self)
+
+    def _append (self, data):
+        with self._lock:
+            if self.closed:
+                raise ValueError("I/O operation on closed log file")
+
+            self._buffer.append(data)
+            self._size += len(data)
+            full = self._size >= self.flush_size
+
+        if full:
+            _writer.wake()
+
+    def sync (self):
+        """
+        Write out the buffered records and sync the file to disk now,
+        on the calling thread.
+        """
+
+        self._flush(fsync = True)
+
+    def close (self):
+        """
+        Stop logging. The remaining records are written and the file
+        closed by the writer thread.
+        """
+
+        with self._lock:
+            self.closed = True
+
+        _writer.wake()
+
+    def _flush (self, fsync = False):
+        with self._io_lock:
+            if self.f.closed:
+                return
+
+            # Records appended before close() are in the buffer taken
+            # with closing set. If close() is called during the write,
+            # the file is left open for the next flush.
+            with self._lock:
+                records = self._buffer
+                closing = self.closed
+                self._buffer = []
+                self._size = 0
+
+            try:
+                if len(records) > 0:
+                    self.f.write(self._empty.join(records))
+                    self.f.flush()
+
+                now = time.monotonic()
+                self._flushed = now
+
+                interval = self.fsync_interval
+
+                if fsync or (interval is not None and now - self._synced >= interval):
+                    os.fsync(self.f.fileno())
+                    self._synced = now
+            finally:
+                if closing:
+                    self.f.close()
+
+
+class LogFile (_BufferedFile):
+    """
+    CSV log of the values of one variable: time, time since
+    {time_zero} and value on each line.
+    """
+
+    @classmethod
+    def get_dir (cls, name):
+        cwd = os.getcwd()
+        counter = 1
+
+        if os.path.isdir(os.path.join(cwd, name)):
+            while os.path.isdir(os.path.join(cwd, name + "." + str(counter))):
+                counter += 1
+            name = name + "." + str(counter)
+
+        os.mkdir(os.path.join(cwd, name))
+
+        return name
+
+    def __init__ (self, output_name, var_name, time_zero):
+        self.time_zero = time_zero
+
+        _BufferedFile.__init__(self, open(
+            os.path.join(os.getcwd(), output_name, var_name + ".csv"), "w",
+            encoding = "utf-8", newline = ""
+        ))
+
+    def write (self, time, value):
+        self._append("{:.2f},{:.2f},{}\n".format(time, time - self.time_zero, value))
+
+    def write_many (self, times, values):
+        time_zero = self.time_zero
+
+        self._append("".join([
+            "{:.2f},{:.2f},{}\n".format(time, time - time_zero, value)
+            for time, value in zip(times, values)
+        ]))
+
+
+class RunLog (_BufferedFile):
+    """
+    Binary log of all variables of a run, in <{output_name}>/{name}.octlog.
+
+    Each variable is logged through a channel (see channel()), which
+    can be passed to Variable.setLogFile() in place of a LogFile.
+    """
+
+    _empty = b""
+
+    def __init__ (self, output_name, time_zero, name = "run"):
+        self.time_zero = time_zero
+        self._channels = {}
+
+        _BufferedFile.__init__(self, open(
+            os.path.join(os.getcwd(), output_name, name + ".octlog"), "wb"
+        ))
+
+        self._append(MAGIC)
+        self._metadata({ "time_zero": time_zero })
+
+    def channel (self, alias, type = str, unit = None):
+        """
+        Return the channel for variable {alias}, defining it if this
+        is the first time that it is used.
+        """
+
+        try:
+            return self._channels[alias]
+        except KeyError:
+            pass
+
+        id = len(self._channels) + 1
+
+        if id > 0xFFFF:
+            raise ValueError("Too many variables in one run log")
+
+        type_name = type.__name__ if type.__name__ in _formats else "str"
+
+        self._metadata({ "id": id, "alias": alias, "type": type_name, "unit": unit })
+        channel = self._channels[alias] = _Channel(self, id, type_name)
+
+        return channel
+
+    def _metadata (self, data):
+        data = json.dumps(data).encode("utf-8")
+        self._append(_header.pack(len(data), 0, time.time()) + data)
+
+
+class _Channel (object):
+    """Logs one variable to a RunLog, with the interface of LogFile."""
+
+    def __init__ (self, run_log, id, type_name):
+        self.run_log = run_log
+        self.id = id
+
+        self._type, code = _formats[type_name]
+
+        if code is None:
+            self._record = None
+        else:
+            self._record = struct.Struct(_header.format + code)
+
+    def _pack (self, time, value):
+        if self._record is None:
+            data = str(value).encode("utf-8")
+            return _header.pack(len(data), self.id, time) + data
+
+        record = self._record
+        return record.pack(record.size - _header.size, self.id, time, self._type(value))
+
+    def write (self, time, value):
+        self.run_log._append(self._pack(time, value))
+
+    def write_many (self, times, values):
+        pack = self._pack
+        self.run_log._append(b"".join([
+            pack(time, value) for time, value in zip(times, values)
+        ]))
+
+    def close (self):
+        # The run log is closed by its owner.
+        pass
+
+
+class _LogWriter (object):
+    """
+    Writes out the buffers of all open log files from one daemon
+    thread, started when the first file is opened.
+    """
+
+    def __init__ (self):
+        self._files = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._stopping = False
+
+    def add (self, log_file):
+        with self._lock:
+            self._files.add(log_file)
+
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(
+                    target = self._run, name = "LogFile writer", daemon = True
+                )
+                self._thread.start()
+
+    def wake (self):
+        self._wake.set()
+
+    def stop (self):
+        """Write out all buffered records and stop the thread."""
+
+        with self._lock:
+            thread = self._thread
+            self._stopping = True
+
+        if thread is not None:
+            self._wake.set()
+            thread.join()
+
+    def _run (self):
+        while True:
+            with self._lock:
+                files = list(self._files)
+                stopping = self._stopping
+
+            now = time.monotonic()
+            wait = _BufferedFile.flush_interval
+
+            for f in files:
+                if stopping or f.closed or f._size >= f.flush_size \
+                or now - f._flushed >= f.flush_interval:
+                    try:
+                        f._flush()
+                    except Exception:
+                        log.err(None, "Error writing log file {!s}".format(f.f.name))
+
+                    if f.f.closed:
+                        with self._lock:
+                            self._files.discard(f)
+
+                        continue
+
+                wait = min(wait, f._flushed + f.flush_interval - now)
+
+            if stopping:
+                return
+
+            self._wake.wait(max(wait, 0.01))
+            self._wake.clear()
+
+
+_writer = _LogWriter()
+atexit.register(_writer.stop)
+
+
+def _records (file):
+    # Yield (id, time, data) for each record in run log {file}.
+    if file.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Not a run log")
+
+    size = _header.size
+
+    while True:
+        header = file.read(size)
+
+        if len(header) < size:
+            return
+
+        length, id, t = _header.unpack(header)
+        data = file.read(length)
+
+        if len(data) < length:
+            return
+
+        yield id, t, data
+
+
+def read (file, aliases = None):
+    """
+    Yield (alias, time, value) for each record in the run log {file}
+    (a path or a binary file object), or only for the variables in
+    {aliases} if given.
+
+    A record cut short (by a crash during writing) ends the log.
+    """
+
+    if isinstance(file, str):
+        with open(file, "rb") as f:
+            yield from read(f, aliases)
+            return
+
+    if aliases is not None:
+        aliases = set(aliases)
+
+    variables = {}
+
+    for id, t, data in _records(file):
+        try:
+            variable = variables[id]
+        except KeyError:
+            if id != 0:
+                raise ValueError("Record for undefined variable {:d}".format(id))
+
+            metadata = json.loads(data.decode("utf-8"))
+
+            if "id" in metadata:
+                if aliases is None or metadata["alias"] in aliases:
+                    variables[metadata["id"]] = (metadata["alias"], _unpacker(metadata["type"]))
+                else:
+                    variables[metadata["id"]] = None
+
+            continue
+
+        if variable is not None:
+            yield variable[0], t, variable[1](data)
+
+
+def _unpacker (type_name):
+    code = _formats[type_name][1]
+
+    if code is None:
+        return lambda data: data.decode("utf-8")
+
+    unpack = struct.Struct("<" + code).unpack
+    return lambda data: unpack(data)[0]
+
+
+def header (file):
+    """
+    Return the time zero of the run log {file} and a dict of
+    {"type", "unit"} by alias for its variables.
+    """
+
+    if isinstance(file, str):
+        with open(file, "rb") as f:
+            return header(f)
+
+    time_zero = None
+    variables = {}
+
+    for id, t, data in _records(file):
+        if id != 0:
+            continue
+
+        metadata = json.loads(data.decode("utf-8"))
+
+        if "time_zero" in metadata:
+            time_zero = metadata["time_zero"]
+        else:
+            variables[metadata["alias"]] = { "type": metadata["type"], "unit": metadata["unit"] }
+
+    return time_zero, variables
+
+
+def to_csv (file, output_name, aliases = None):
+    """
+    Write the variables of the run log {file} (a path or a seekable
+    binary file object), or those in {aliases}, to
+    <{output_name}>/<alias>.csv in the format of LogFile.
+    """
+
+    time_zero, variables = header(file)
+    files = {}
+
+    if not isinstance(file, str):
+        file.seek(0)
+
+    try:
+        for alias, t, value in read(file, aliases):
+            try:
+                f = files[alias]
+            except KeyError:
+                f = files[alias] = open(
+                    os.path.join(output_name, alias + ".csv"), "w",
+                    encoding = "utf-8", newline = ""
+                )
+
+            f.write("{:.2f},{:.2f},{}\n".format(t, t - time_zero, value))
+    finally:
+        for f in files.values():
+            f.close()
+
+
+def to_dataframes (file, aliases = None):
+    """
+    Return a dict of pandas DataFrames (columns time and value) by
+    alias for the variables of the run log {file}, or those in
+    {aliases}.
+    """
+
+    import pandas as pd
+
+    times = {}
+    values = {}
+
+    for alias, t, value in read(file, aliases):
+        try:
+            times[alias].append(t)
+            values[alias].append(value)
+        except KeyError:
+            times[alias] = [t]
+            values[alias] = [value]
+
+    return {
+        alias: pd.DataFrame({ "time": times[alias], "value": values[alias] })
+        for alias in times
+    }
+
+
+# Seek index: the bytes of the log covered, the time of the last
+# entry and the rows since it; then (time, offset) entries.
+_index_header = struct.Struct("<QdI")
+_index_entry = struct.Struct("<dQ")
+
+
+class _SeekIndex (object):
+    def __init__ (self):
+        self.times = []
+        self.offsets = []
+        self.covered = 0
+        self.last_time = float("-inf")
+        self.rows = 0
+
+    @classmethod
+    def load (cls, path):
+        index = cls()
+
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return index
+
+        size = _index_header.size
+        start = len(INDEX_MAGIC) + size
+
+        if data[:len(INDEX_MAGIC)] != INDEX_MAGIC or len(data) < start:
+            return index
+
+        index.covered, index.last_time, index.rows = _index_header.unpack_from(data, len(INDEX_MAGIC))
+
+        # Ignore a partly written entry.
+        end = start + (len(data) - start) // _index_entry.size * _index_entry.size
+
+        for time, offset in _index_entry.iter_unpack(data[start:end]):
+            index.times.append(time)
+            index.offsets.append(offset)
+
+        return index
+
+    def save (self, path):
+        with open(path, "wb") as f:
+            f.write(INDEX_MAGIC)
+            f.write(_index_header.pack(self.covered, self.last_time, self.rows))
+            f.write(b"".join([
+                _index_entry.pack(time, offset)
+                for time, offset in zip(self.times, self.offsets)
+            ]))
+
+
+class LogReader (object):
+    """
+    Reads time ranges from the CSV logs of a run in {directory}.
+
+    The first read of each log builds a seek index, with an entry
+    (time and byte offset of a row) every index_rows rows or
+    index_interval seconds, whichever comes first, and saves it as
+    <alias>.csv.idx. Later reads extend the index over any rows added
+    since, so a range can be found without scanning the log. Times
+    are expected to be in order, as LogFile writes them.
+    """
+
+    index_rows = 1000
+    index_interval = 60
+
+    def __init__ (self, directory):
+        self.directory = directory
+        self._indexes = {}
+
+    def _path (self, alias):
+        return os.path.join(self.directory, alias + ".csv")
+
+    def index (self, alias):
+        """Return the seek index of {alias}, brought up to date."""
+
+        path = self._path(alias)
+        size = os.path.getsize(path)
+
+        try:
+            index = self._indexes[alias]
+        except KeyError:
+            index = self._indexes[alias] = _SeekIndex.load(path + ".idx")
+
+        # The log has been replaced.
+        if size < index.covered:
+            index = self._indexes[alias] = _SeekIndex()
+
+        if size > index.covered:
+            self._extend(index, path)
+
+            # The index is only kept in memory if it cannot be saved.
+            try:
+                index.save(path + ".idx")
+            except OSError:
+                pass
+
+        return index
+
+    def _extend (self, index, path):
+        rows = self.index_rows
+        interval = self.index_interval
+        times = index.times
+        offsets = index.offsets
+        last_time = index.last_time
+        count = index.rows
+        offset = index.covered
+
+        with open(path, "rb") as f:
+            f.seek(offset)
+
+            for line in f:
+                # Leave a row that is still being written.
+                if not line.endswith(b"\n"):
+                    break
+
+                time = float(line[:line.index(b",")])
+
+                if count >= rows or time - last_time >= interval:
+                    times.append(time)
+                    offsets.append(offset)
+                    last_time = time
+                    count = 0
+
+                count += 1
+                offset += len(line)
+
+        index.last_time = last_time
+        index.rows = count
+        index.covered = offset
+
+    def read_range (self, alias, start = None, end = None):
+        """
+        Return a pandas Series of the values of {alias} indexed by
+        time, from {start} to {end} (by default, from the start or
+        to the end of the log).
+
+        Numeric values are returned as floats, others as text.
+        """
+
+        import pandas as pd
+
+        index = self.index(alias)
+        offset = 0
+
+        if start is not None:
+            # The last entry before {start}: rows at {start} may come
+            # before an entry at that time.
+            i = bisect.bisect_left(index.times, start) - 1
+
+            if i >= 0:
+                offset = index.offsets[i]
+
+        times = []
+        values = []
+
+        with open(self._path(alias), "rb") as f:
+            f.seek(offset)
+
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+
+                time, elapsed, value = line[:-1].decode("utf-8").split(",", 2)
+                time = float(time)
+
+                if start is not None and time < start:
+                    continue
+
+                if end is not None and time > end:
+                    break
+
+                try:
+                    value = float(value)
+                except ValueError:
+                    pass
+
+                times.append(time)
+                values.append(value)
+
+        return pd.Series(values, index = pd.Index(times, name = "time"), name = alias)
+
+
+def read_range (directory, alias, start = None, end = None):
+    """
+    Return the values of {alias} from {start} to {end} in the CSV
+    logs in {directory}, using a seek index (see LogReader).
+    """
+
+    return LogReader(directory).read_range(alias, start, end)
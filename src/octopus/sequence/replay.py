@@ -0,0 +1,251 @@
+"""
+Replay of logged runs into variables on a virtual clock, to test
+sequences and controls (PID, StateMonitor, ...) against recorded
+data, faster than real time.
+
+    replay = Replay("main.3", [reactor_1, pump], speed = 60)
+    replay.run().addCallback(...)
+
+While a replay runs, the data and sequence modules see the virtual
+clock: util.now() as imported by them, and the reactor of the
+sequence modules (so WaitStep, Tick, PID, ...) use it (see
+Replay.install()). Other code, including the machine drivers, is not
+affected.
+"""
+
+# Twisted Imports
+from twisted.internet import reactor, defer, task
+from twisted.python import failure
+
+# System Imports
+import sys
+import time
+
+# Sibling Imports
+from . import export
+
+import numpy as np
+
+
+class Replay (object):
+    """
+    Replays the values logged in {directory} (CSV logs or a run log)
+    into {variables}, in time order.
+
+    {variables} is a dict of variables by alias, or a list of
+    variables, machines and components (whose variables are replayed
+    under their aliases). Only the logged values between {start} and
+    {end} are replayed, if these are given.
+
+    With {speed} (e.g. 60 for a minute per second), the virtual clock
+    runs at that multiple of real time; with speed None it runs as
+    fast as possible. In both cases the reactor ({clock}) keeps
+    running between steps.
+    """
+
+    # Real seconds between steps at a set speed, and of work per
+    # reactor turn at full speed.
+    tick = 0.05
+    batch = 0.05
+
+    # Packages whose modules use the virtual clock.
+    packages = ("octopus.data", "octopus.sequence")
+
+    def __init__ (self, directory, variables, speed = None, start = None, end = None, clock = None):
+        self.speed = speed
+        self.clock = task.Clock()
+        self.variables = self._resolve(variables)
+
+        self._real = clock or reactor
+        self._patched = []
+        self._call = None
+        self._next = 0
+        self.done = None
+
+        time_zero, series = export.load(directory)
+        self.time_zero = time_zero
+
+        owners = []
+        times = []
+        values = []
+
+        for alias, variable in self.variables.items():
+            try:
+                s = series[alias]
+            except KeyError:
+                continue
+
+            if start is not None:
+                s = s[s.index >= start]
+
+            if end is not None:
+                s = s[s.index <= end]
+
+            owners.extend([variable] * len(s))
+            times.append(s.index.values.astype(np.float64))
+            values.extend(s.tolist())
+
+        times = np.concatenate(times) if len(times) else np.empty(0)
+        order = np.argsort(times, kind = "stable").tolist()
+
+        self._times = times[order].tolist()
+        self._owners = [owners[i] for i in order]
+        self._values = [values[i] for i in order]
+
+        self.start = self._times[0] if len(self._times) else (start or 0)
+        self.end = self._times[-1] if len(self._times) else self.start
+        self.clock.advance(self.start)
+
+    @staticmethod
+    def _resolve (variables):
+        if isinstance(variables, dict):
+            return dict(variables)
+
+        result = {}
+
+        for v in variables:
+            try:
+                result.update(v.variables)
+            except AttributeError:
+                result[v.alias] = v
+
+        return result
+
+    @property
+    def progress (self):
+        """The fraction of the records replayed so far."""
+
+        return self._next / len(self._times) if len(self._times) else 1.0
+
+    def install (self):
+        """
+        Make the data and sequence modules use the virtual clock: the
+        now() functions that they import and the reactor of the
+        sequence modules. Undone by uninstall(), which run() calls
+        when the replay ends.
+        """
+
+        for name, module in list(sys.modules.items()):
+            if module is None or name == __name__ \
+            or not any(name == p or name.startswith(p + ".") for p in self.packages):
+                continue
+
+            if getattr(module, "now", None) is time.time:
+                self._patch(module, "now", self.clock.seconds)
+
+            if name.startswith("octopus.sequence.") and getattr(module, "reactor", None) is reactor:
+                self._patch(module, "reactor", self.clock)
+
+    def _patch (self, obj, name, value):
+        self._patched.append((obj, name, getattr(obj, name)))
+        setattr(obj, name, value)
+
+    def uninstall (self):
+        while self._patched:
+            obj, name, value = self._patched.pop()
+            setattr(obj, name, value)
+
+    def run (self):
+        """
+        Replay all records, and return a Deferred that fires with
+        this Replay when done.
+
+        The variables are cleared first, so that their archives start
+        at the virtual time.
+        """
+
+        try:
+            self.install()
+        except Exception:
+            self.uninstall()
+            raise
+
+        for variable in self.variables.values():
+            try:
+                variable.truncate()
+            except AttributeError:
+                pass
+
+        self.done = defer.Deferred()
+        self.done.addBoth(self._finished)
+        self._started = (self._real.seconds(), self.clock.seconds())
+        self._call = self._real.callLater(0, self._step)
+
+        return self.done
+
+    def stop (self):
+        """Stop replaying; the Deferred from run() fires."""
+
+        if self._call is not None and self._call.active():
+            self._call.cancel()
+
+        self._call = None
+
+        if self.done is not None and not self.done.called:
+            self.done.callback(self)
+
+    def _finished (self, result):
+        self.uninstall()
+        return result
+
+    def _advance (self, t):
+        # Run the calls due before {t} at their own times, then move
+        # the clock on to {t}.
+        clock = self.clock
+        calls = clock.calls
+
+        while calls and calls[0].getTime() < t:
+            clock.advance(max(calls[0].getTime() - clock.seconds(), 0))
+
+        if t > clock.seconds():
+            clock.advance(t - clock.seconds())
+
+    def _step (self):
+        self._call = None
+
+        if self.speed is None:
+            target = float("inf")
+            deadline = time.perf_counter() + self.batch
+        else:
+            real, virtual = self._started
+            target = virtual + (self._real.seconds() - real) * self.speed
+            deadline = None
+
+        try:
+            self._replay(target, deadline)
+        except Exception:
+            self.done.errback(failure.Failure())
+            return
+
+        if self._next < len(self._times):
+            self._call = self._real.callLater(0 if self.speed is None else self.tick, self._step)
+        else:
+            self.done.callback(self)
+
+    def _replay (self, target, deadline):
+        times = self._times
+        owners = self._owners
+        values = self._values
+        advance = self._advance
+        clock = self.clock
+        end = len(times)
+        i = self._next
+
+        try:
+            while i < end and times[i] <= target:
+                t = times[i]
+
+                if t > clock.seconds() or clock.calls:
+                    advance(t)
+
+                owners[i]._push(values[i], t)
+                i += 1
+
+                if deadline is not None and i & 0xFF == 0 and time.perf_counter() > deadline:
+                    break
+        finally:
+            self._next = i
+
+        # At a set speed, timers run on between records.
+        if i < end and target != float("inf"):
+            advance(target)
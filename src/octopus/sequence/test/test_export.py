@@ -0,0 +1,170 @@
+from twisted.trial import unittest
+
+import os
+import shutil
+import tempfile
+
+from .. import export, logfile
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+def write_run (directory, rows = 10):
+    # A run logged as CSV files: two variables of one machine, and
+    # the events log.
+    with open(os.path.join(directory, "bath.temp.csv"), "w") as f:
+        for i in range(rows):
+            f.write("{:.2f},{:.2f},{}\n".format(1000 + i, i, 20 + i / 2))
+
+    with open(os.path.join(directory, "bath.setpoint.csv"), "w") as f:
+        f.write("1000.00,0.00,20\n1004.00,4.00,20\n1004.00,4.00,25\n")
+
+    with open(os.path.join(directory, "events.csv"), "w") as f:
+        f.write("1000.00,0.00,tz\n")
+
+
+class _Step (object):
+    id = 1
+    type = "sequence"
+
+
+def write_experiment (directory, variables, log = None):
+    # A run logged by an Experiment into <directory>/main: {variables}
+    # (a dict by alias), with the values set by {log} while logging,
+    # and the events and messages logs, which hold text with commas.
+    from ..experiment import Experiment
+
+    cwd = os.getcwd()
+    os.chdir(directory)
+
+    try:
+        expt = Experiment()
+        expt._log_variables = variables
+        expt.set_log_output("main")
+    finally:
+        os.chdir(cwd)
+
+    if log is not None:
+        log()
+
+    expt._step_event(_Step(), value = "a, b")
+    expt._step_log("Heating to 25, then waiting")
+    expt.stop_logging()
+    logfile._writer.stop()
+
+    return os.path.join(directory, "main")
+
+
+class LoadTestCase (unittest.TestCase):
+    def setUp (self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def test_csv (self):
+        write_run(self.dir)
+        time_zero, series = export.load(self.dir)
+
+        self.assertEqual(time_zero, 1000)
+        self.assertEqual(sorted(series), ["bath.setpoint", "bath.temp", "events"])
+        self.assertEqual(series["bath.temp"].index.tolist(), list(range(1000, 1010)))
+        self.assertEqual(series["events"].tolist(), ["tz"])
+
+    def test_experiment (self):
+        from ...data import data
+
+        temp = data.Variable(float)
+        temp._push(20, 1000)
+        temp._push(21, 1001)
+
+        directory = write_experiment(self.dir, { "bath.temp": temp })
+        time_zero, series = export.load(directory)
+
+        self.assertEqual(sorted(series), ["bath.temp", "events", "log"])
+        self.assertEqual(series["events"].iloc[0], "tz")
+        self.assertEqual(series["events"].iloc[1], "step:" + str({
+            "value": "a, b", "step": 1, "type": "sequence"
+        }))
+        self.assertEqual(series["log"].tolist(), ["Heating to 25, then waiting"])
+
+    def test_run_log (self):
+        log = logfile.RunLog(self.dir, 1000)
+        log.channel("bath.temp", float).write_many([1000, 1001], [20, 21])
+        log.close()
+        logfile._writer.stop()
+
+        time_zero, series = export.load(self.dir)
+
+        self.assertEqual(time_zero, 1000)
+        self.assertEqual(series["bath.temp"].tolist(), [20, 21])
+
+    def test_groups (self):
+        self.assertEqual(export.group_by_machine(["a.x", "b.x", "a.y", "events"]), {
+            "a": ["a.x", "a.y"], "b": ["b.x"], "events": ["events"]
+        })
+
+    def test_resample (self):
+        write_run(self.dir)
+        time_zero, series = export.load(self.dir)
+        frame = export.resample(series, 2.5)
+
+        self.assertEqual(frame.index.tolist(), [1000, 1002.5, 1005, 1007.5])
+        self.assertEqual(frame["bath.temp"].tolist(), [20, 21, 22.5, 23.5])
+
+        # The last value at a time is used.
+        self.assertEqual(frame["bath.setpoint"].tolist(), [20, 20, 25, 25])
+
+
+class ExportTestCase (unittest.TestCase):
+    if pyarrow is None:
+        skip = "pyarrow is not installed"
+
+    format = "parquet"
+
+    def setUp (self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.output = os.path.join(self.dir, "export")
+        os.mkdir(self.output)
+
+        write_run(self.dir, rows = 1000)
+        self.paths = export.export(self.dir, self.output, self.format, row_group_size = 100)
+
+    def test_files (self):
+        self.assertEqual(sorted(os.path.basename(p) for p in self.paths), [
+            "bath." + self.format, "events." + self.format
+        ])
+
+    def test_read (self):
+        frame = export.read(self.output, ["bath.temp"], 1150, 1249)
+
+        self.assertEqual(list(frame.columns), ["bath.temp"])
+        self.assertEqual(frame.index.tolist(), list(range(1150, 1250)))
+        self.assertEqual(frame["bath.temp"].iloc[0], 95)
+
+    def test_row_groups (self):
+        # Only the row groups that overlap the range are read.
+        read = export._read_feather if self.format == "feather" else export._read_parquet
+        table = read(os.path.join(self.output, "bath." + self.format), None, 1150, 1249)
+
+        self.assertEqual(table.num_rows, 200)
+
+    def test_all (self):
+        frame = export.read(self.output)
+
+        self.assertEqual(sorted(frame.columns), ["bath.setpoint", "bath.temp", "events"])
+        self.assertEqual(len(frame), 1000)
+        self.assertEqual(frame["events"].iloc[0], "tz")
+
+    def test_resampled (self):
+        path, = export.export(self.dir, self.output, self.format, interval = 10)
+        frame = export.read(path, start = 1500)
+
+        self.assertEqual(frame.index[0], 1500)
+        self.assertEqual(len(frame), 50)
+
+
+class FeatherTestCase (ExportTestCase):
+    format = "feather"
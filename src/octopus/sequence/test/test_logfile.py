@@ -0,0 +1,231 @@
+from twisted.trial import unittest
+
+from unittest.mock import Mock
+
+import os
+import shutil
+import tempfile
+import time
+
+from .. import logfile
+
+
+def wait_for (condition, timeout = 5):
+    end = time.monotonic() + timeout
+
+    while not condition():
+        if time.monotonic() > end:
+            raise AssertionError("Timed out")
+
+        time.sleep(0.01)
+
+
+class LogFileTestCase (unittest.TestCase):
+    def setUp (self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.path = os.path.join(self.dir, "temp.csv")
+
+        self.log = logfile.LogFile(self.dir, "temp", 100)
+
+    def tearDown (self):
+        self.log.close()
+        wait_for(lambda: self.log.f.closed)
+
+    def contents (self):
+        with open(self.path) as f:
+            return f.read()
+
+    def test_write (self):
+        self.log.write(101, 2.5)
+        self.log.write_many([102, 103.25], ["a", "b"])
+
+        # Nothing is written on the calling thread.
+        self.assertEqual(self.contents(), "")
+
+        self.log.sync()
+        self.assertEqual(self.contents(), "101.00,1.00,2.5\n102.00,2.00,a\n103.25,3.25,b\n")
+
+    def test_flush_size (self):
+        self.log.flush_size = 100
+
+        for i in range(10):
+            self.log.write(100 + i, i)
+
+        wait_for(lambda: len(self.contents()) >= 100)
+
+    def test_flush_interval (self):
+        self.log.flush_interval = 0.05
+        self.log.write(100, 1)
+
+        wait_for(lambda: self.contents() == "100.00,0.00,1\n")
+
+    def test_close (self):
+        self.log.write(100, 1)
+        self.log.close()
+
+        wait_for(lambda: self.log.f.closed)
+        self.assertEqual(self.contents(), "100.00,0.00,1\n")
+
+        # As for a closed file, writing raises.
+        self.assertRaises(ValueError, self.log.write, 101, 2)
+
+    def test_close_during_write (self):
+        write = self.log.f.write
+
+        def write_and_close (data):
+            # Log another record and close while the first is written.
+            self.log.f.write = write
+            self.log.write(101, 2)
+            self.log.close()
+            return write(data)
+
+        self.log.f.write = write_and_close
+        self.log.write(100, 1)
+        self.log.sync()
+
+        wait_for(lambda: self.log.f.closed)
+        self.assertEqual(self.contents(), "100.00,0.00,1\n101.00,1.00,2\n")
+
+    def test_fsync (self):
+        fsync = Mock()
+        self.patch(logfile.os, "fsync", fsync)
+        self.log.flush_interval = 60
+
+        self.log.write(100, 1)
+        self.log._flush()
+        self.assertEqual(fsync.call_count, 0)
+
+        self.log.fsync_interval = 0
+        self.log.write(101, 1)
+        self.log._flush()
+        self.assertEqual(fsync.call_count, 1)
+
+
+class RunLogTestCase (unittest.TestCase):
+    def setUp (self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.path = os.path.join(self.dir, "run.octlog")
+
+        log = logfile.RunLog(self.dir, 100)
+        temp = log.channel("temp", float, "C")
+        count = log.channel("count", int)
+        events = log.channel("events")
+
+        self.assertIs(log.channel("temp"), temp)
+
+        events.write(100, "tz")
+        temp.write_many([101, 102], [20.5, 21])
+        count.write(102.5, 3)
+        events.write(103, "step:1")
+
+        log.close()
+        wait_for(lambda: log.f.closed)
+
+    def test_read (self):
+        self.assertEqual(list(logfile.read(self.path)), [
+            ("events", 100, "tz"),
+            ("temp", 101, 20.5),
+            ("temp", 102, 21.0),
+            ("count", 102.5, 3),
+            ("events", 103, "step:1"),
+        ])
+
+        self.assertEqual(list(logfile.read(self.path, ["count"])), [("count", 102.5, 3)])
+
+    def test_header (self):
+        self.assertEqual(logfile.header(self.path), (100, {
+            "temp": { "type": "float", "unit": "C" },
+            "count": { "type": "int", "unit": None },
+            "events": { "type": "str", "unit": None },
+        }))
+
+    def test_truncated (self):
+        with open(self.path, "r+b") as f:
+            f.truncate(os.path.getsize(self.path) - 1)
+
+        self.assertEqual(len(list(logfile.read(self.path))), 4)
+
+    def test_csv (self):
+        logfile.to_csv(self.path, self.dir)
+
+        with open(os.path.join(self.dir, "temp.csv")) as f:
+            self.assertEqual(f.read(), "101.00,1.00,20.5\n102.00,2.00,21.0\n")
+
+        with open(os.path.join(self.dir, "events.csv")) as f:
+            self.assertEqual(f.read(), "100.00,0.00,tz\n103.00,3.00,step:1\n")
+
+    def test_dataframes (self):
+        frames = logfile.to_dataframes(self.path, ["temp"])
+
+        self.assertEqual(list(frames), ["temp"])
+        self.assertEqual(frames["temp"]["time"].tolist(), [101, 102])
+        self.assertEqual(frames["temp"]["value"].tolist(), [20.5, 21])
+
+
+class LogReaderTestCase (unittest.TestCase):
+    def setUp (self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.path = os.path.join(self.dir, "temp.csv")
+
+        self.write(range(1000))
+
+    def write (self, times):
+        with open(self.path, "a") as f:
+            for t in times:
+                f.write("{:.2f},{:.2f},{}\n".format(1000 + t, t, t / 2))
+
+    def reader (self):
+        reader = logfile.LogReader(self.dir)
+        reader.index_rows = 100
+        reader.index_interval = 250
+
+        return reader
+
+    def test_index (self):
+        index = self.reader().index("temp")
+
+        # Every 100 rows, and every 250 s, from the first row.
+        self.assertEqual(index.times[:4], [1000, 1100, 1200, 1300])
+        self.assertEqual(index.offsets[0], 0)
+        self.assertEqual(len(index.times), 10)
+
+        with open(self.path, "rb") as f:
+            f.seek(index.offsets[3])
+            self.assertTrue(f.readline().startswith(b"1300.00,"))
+
+    def test_read_range (self):
+        series = self.reader().read_range("temp", 1250, 1260.5)
+
+        self.assertEqual(series.index.tolist(), list(range(1250, 1261)))
+        self.assertEqual(series.iloc[0], 125)
+
+        self.assertEqual(len(logfile.read_range(self.dir, "temp", end = 1009)), 10)
+        self.assertEqual(len(logfile.read_range(self.dir, "temp", 1990)), 10)
+
+    def test_persist (self):
+        self.reader().index("temp")
+        self.assertTrue(os.path.exists(self.path + ".idx"))
+
+        # Rows logged since the index was saved are added to it.
+        self.write(range(1000, 1250))
+
+        with open(self.path, "a") as f:
+            f.write("2250.00,1250.00,")
+
+        reader = self.reader()
+        index = reader.index("temp")
+
+        self.assertEqual(len(index.times), 13)
+        self.assertEqual(index.times[-1], 2200)
+        self.assertEqual(reader.read_range("temp", 2248).index.tolist(), [2248, 2249])
+
+    def test_text (self):
+        with open(os.path.join(self.dir, "log.csv"), "w") as f:
+            f.write("1000.00,0.00,started, at last\n1001.00,1.00,done\n")
+
+        series = logfile.read_range(self.dir, "log", 1000.5)
+        self.assertEqual(series.tolist(), ["done"])
+        self.assertEqual(logfile.read_range(self.dir, "log").iloc[0], "started, at last")
@@ -0,0 +1,155 @@
+from twisted.internet import defer, reactor, task
+from twisted.trial import unittest
+
+import os
+import shutil
+import tempfile
+import time
+
+from .. import replay, sequence, util
+from .test_export import write_experiment
+from ...data import data
+
+
+class ReplayTestCase (unittest.TestCase):
+    def setUp (self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+        with open(os.path.join(self.dir, "m.temp.csv"), "w") as f:
+            for i in range(100):
+                f.write("{:.2f},{:.2f},{}\n".format(1000 + i, i, 20 + i / 10))
+
+        with open(os.path.join(self.dir, "m.setpoint.csv"), "w") as f:
+            f.write("1000.00,0.00,20\n1050.00,50.00,20\n1050.00,50.00,30\n")
+
+        with open(os.path.join(self.dir, "events.csv"), "w") as f:
+            f.write("1000.00,0.00,tz\n")
+
+        self.temp = data.Variable(float)
+        self.temp.alias = "m.temp"
+        self.setpoint = data.Variable(float)
+        self.setpoint.alias = "m.setpoint"
+
+    @defer.inlineCallbacks
+    def test_full_speed (self):
+        changes = []
+
+        @self.setpoint.on("change")
+        def change (event):
+            changes.append((event["time"], event["value"], data.now(), self.temp.value))
+
+        r = replay.Replay(self.dir, [self.temp, self.setpoint])
+        yield r.run()
+
+        # Every logged value is pushed, including the start of the
+        # step change at 1050.
+        self.assertEqual(changes, [
+            (1000, 20, 1000, 20), (1050, 20, 1050, 25), (1050, 30, 1050, 25)
+        ])
+        self.assertEqual(self.temp.value, 29.9)
+        self.assertEqual(r.progress, 1)
+        self.assertEqual(r.clock.seconds(), 1099)
+
+        # The archive holds the replayed data.
+        self.assertEqual(self.temp.get(1000, 100)[0][0], 1000)
+
+        # The real clock is restored.
+        self.assertIs(data.now, time.time)
+
+    @defer.inlineCallbacks
+    def test_timers (self):
+        waited = []
+        looped = []
+
+        r = replay.Replay(self.dir, { "m.temp": self.temp }, start = 1010)
+
+        @self.temp.once("change")
+        def start (event):
+            sequence.WaitStep(20.5).run().addCallback(lambda result: waited.append(data.now()))
+
+            tick = util.Tick(lambda: looped.append(data.now()), 30)
+            tick.run()
+
+        yield r.run()
+
+        self.assertEqual(waited, [1030.5])
+        self.assertEqual(looped, [1010, 1040, 1070])
+
+    @defer.inlineCallbacks
+    def test_tick_before_run (self):
+        looped = []
+        tick = util.Tick(lambda: looped.append(data.now()), 30)
+
+        r = replay.Replay(self.dir, { "m.temp": self.temp }, start = 1010)
+        self.temp.once("change", lambda event: tick.run())
+
+        yield r.run()
+
+        self.assertEqual(looped, [1010, 1040, 1070])
+        tick.abort()
+
+    @defer.inlineCallbacks
+    def test_install (self):
+        from ...machine import interface
+        seen = []
+
+        r = replay.Replay(self.dir, [self.temp])
+
+        @self.temp.once("change")
+        def change (event):
+            seen.append((data.now, sequence.reactor, interface.now))
+
+        yield r.run()
+
+        # Only the data and sequence modules are patched, until the
+        # replay ends.
+        self.assertEqual(seen, [(r.clock.seconds, r.clock, time.time)])
+        self.assertIs(data.now, time.time)
+        self.assertIs(sequence.reactor, reactor)
+        self.assertEqual(r._patched, [])
+
+    @defer.inlineCallbacks
+    def test_error (self):
+        r = replay.Replay(self.dir, [self.temp])
+        self.patch(self.temp, "_push", lambda value, time: 1 / 0)
+
+        yield self.assertFailure(r.run(), ZeroDivisionError)
+        self.assertIs(data.now, time.time)
+
+    def test_speed (self):
+        real = task.Clock()
+        r = replay.Replay(self.dir, [self.temp], speed = 10, clock = real)
+        d = r.run()
+
+        real.advance(0)
+        real.advance(2)
+        real.advance(r.tick)
+
+        # 2.05 real seconds at 10x: up to 1020.5.
+        self.assertEqual(self.temp.value, 22)
+        self.assertEqual(r.clock.seconds(), 1020.5)
+        self.assertFalse(d.called)
+
+        r.stop()
+        self.assertTrue(d.called)
+        self.assertIs(data.now, time.time)
+
+    @defer.inlineCallbacks
+    def test_experiment (self):
+        # A run directory written by an Experiment, with events and
+        # messages logs.
+        logged = data.Variable(float)
+
+        def log ():
+            for i in range(10):
+                logged._push(20 + i, 1000 + i)
+
+        directory = write_experiment(self.dir, { "m.temp": logged }, log)
+
+        values = []
+        self.temp.on("change", lambda event: values.append((event["time"], event["value"])))
+
+        yield replay.Replay(directory, [self.temp]).run()
+
+        self.assertEqual(values, [(1000 + i, 20 + i) for i in range(10)])
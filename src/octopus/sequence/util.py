@@ -389,6 +389,9 @@ class Tick (Caller, Looping, Dependent):
         pass
 
     def _iteration_start (self):
+        # The reactor is looked up on starting, so that a Tick made
+        # before a replay starts runs on its clock (see replay.py).
+        self._c.clock = reactor
         self._c.start(self._interval, now = self._now)
 
     def _iteration_stop (self):
@@ -0,0 +1,153 @@
+from twisted.internet import task
+from twisted.trial import unittest
+
+from unittest.mock import Mock
+
+from .. import events
+
+class EventEmitterTestCase (unittest.TestCase):
+    def setUp (self):
+        self.e = events.EventEmitter()
+
+    def test_on_off (self):
+        f = Mock()
+        g = Mock()
+        self.e.on("change", f)
+        self.e.on("change", f)
+        self.e.on("change", g)
+        self.assertEqual(self.e.listeners("change"), (f, g))
+
+        self.e.emit("change", value = 1)
+        f.assert_called_once_with({ "value": 1 })
+
+        self.e.off("change", f)
+        self.assertEqual(self.e.listeners("change"), (g,))
+
+        self.e.off("change")
+        self.assertEqual(self.e.emit("change", value = 2), False)
+
+    def test_off_during_emit (self):
+        calls = []
+
+        def f (data):
+            calls.append("f")
+
+            if g in self.e.listeners("change"):
+                self.e.off("change", g)
+
+        def g (data):
+            calls.append("g")
+
+        self.e.on("change", f)
+        self.e.on("change", g)
+        self.e.emit("change")
+
+        # Listeners removed during emit are still called that time
+        self.assertEqual(calls, ["f", "g"])
+
+        self.e.emit("change")
+        self.assertEqual(calls, ["f", "g", "f"])
+
+    def test_once (self):
+        f = Mock()
+        self.e.once("change", f)
+        self.e.emit("change")
+        self.e.emit("change")
+        self.assertEqual(f.call_count, 1)
+
+
+    def test_weak (self):
+        class Listener (object):
+            def __init__ (self):
+                self.calls = 0
+
+            def changed (self, data):
+                self.calls += 1
+
+        kept = Listener()
+        dropped = Listener()
+        self.e.on("change", kept.changed, weak = True)
+        self.e.on("change", dropped.changed, weak = True)
+        self.e.on("change", kept.changed)
+        self.assertEqual(len(self.e.listeners("change")), 2)
+
+        del dropped
+        self.assertEqual(self.e.listeners("change"), (kept.changed,))
+
+        self.e.emit("change")
+        self.assertEqual(kept.calls, 1)
+
+        self.e.off("change", kept.changed)
+        self.assertEqual(self.e.emit("change"), False)
+
+    def test_leak_report (self):
+        f = Mock()
+        listeners = [Mock() for i in range(20)]
+
+        for g in listeners:
+            self.e.on("change", g)
+
+        self.e.on("log", f)
+
+        report = events.leak_report(10)
+        entries = [r for r in report if r[0] is self.e]
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0][1:3], ("change", 20))
+        self.assertEqual(entries[0][3]["Mock"], 20)
+
+
+class CoalesceTestCase (unittest.TestCase):
+    def setUp (self):
+        self.clock = task.Clock()
+        events._batcher.clock = self.clock
+
+    def tearDown (self):
+        events._batcher.clock = None
+
+    def test_coalesce (self):
+        e = events.EventEmitter()
+        e.coalesce("change")
+
+        changed = Mock()
+        every = Mock()
+        e.on("change", changed)
+        e.on("all", every)
+
+        for i in range(5):
+            e.emit("change", value = i)
+
+        e.emit("log", message = "x")
+
+        self.assertEqual(changed.call_count, 0)
+        every.assert_called_once_with("log", { "message": "x" })
+
+        self.clock.advance(0)
+        changed.assert_called_once_with({ "value": 4, "skipped": 4 })
+        every.assert_called_with("change", { "value": 4, "skipped": 4 })
+
+        e.emit("change", value = 5)
+        self.clock.advance(0)
+        changed.assert_called_with({ "value": 5, "skipped": 0 })
+        self.assertEqual(changed.call_count, 2)
+
+    def test_separate_emitters (self):
+        a = events.EventEmitter()
+        b = events.EventEmitter()
+        f = Mock()
+
+        for e in (a, b):
+            e.coalesce("change")
+            e.on("change", f)
+
+        a.emit("change", value = 1)
+        b.emit("change", value = 2)
+        a.emit("change", value = 3)
+        self.clock.advance(0)
+
+        self.assertEqual(f.call_count, 2)
+        f.assert_any_call({ "value": 3, "skipped": 1 })
+        f.assert_any_call({ "value": 2, "skipped": 0 })
+
+        a.coalesce("change", False)
+        a.emit("change", value = 4)
+        f.assert_called_with({ "value": 4 })
@@ -0,0 +1,107 @@
+from twisted.internet import defer
+from twisted.trial import unittest
+
+from .. import queue
+
+class AsyncQueueTestCase (unittest.TestCase):
+    def setUp (self):
+        self.order = []
+        self.q = queue.AsyncQueue(self.order.append, paused = True)
+
+    def _drain (self):
+        self.q.resume()
+        d = defer.Deferred()
+        self.q.drained += lambda: d.called or d.callback(None)
+        return d
+
+    def test_fifo (self):
+        for i in range(5):
+            self.q.append(i)
+
+        self.assertEqual(len(self.q), 5)
+
+        return self._drain().addCallback(
+            lambda _: self.assertEqual(self.order, [0, 1, 2, 3, 4])
+        )
+
+    def test_priority (self):
+        for i in range(3):
+            self.q.append("poll %d" % i, "poll")
+
+        self.q.append("control", "control")
+        self.q.append("critical", "critical")
+
+        return self._drain().addCallback(lambda _: self.assertEqual(self.order, [
+            "critical", "control", "poll 0", "poll 1", "poll 2"
+        ]))
+
+    def test_starvation (self):
+        self.q.starvation_limit = 2
+
+        for i in range(2):
+            self.q.append("poll %d" % i, "poll")
+
+        for i in range(5):
+            self.q.append("control %d" % i)
+
+        return self._drain().addCallback(lambda _: self.assertEqual(self.order, [
+            "control 0", "control 1", "poll 0",
+            "control 2", "control 3", "poll 1",
+            "control 4"
+        ]))
+
+    def test_default_priority (self):
+        with queue.priority("poll"):
+            self.q.append("poll")
+            self.q.append("critical", "critical")
+
+        self.q.append("control")
+
+        return self._drain().addCallback(lambda _: self.assertEqual(self.order, [
+            "critical", "control", "poll"
+        ]))
+
+    def test_unknown_priority (self):
+        self.assertRaises(ValueError, self.q.append, "x", "urgent")
+
+    def test_limit (self):
+        self.q.limits["poll"] = 2
+        dropped = []
+
+        for i in range(4):
+            d = self.q.append(i, "poll")
+            d.addErrback(lambda f, i = i: f.trap(queue.AsyncQueueDropped) and dropped.append(i))
+
+        self.q.append("control")
+        self.assertEqual(dropped, [0, 1])
+
+        return self._drain().addCallback(
+            lambda _: self.assertEqual(self.order, ["control", 2, 3])
+        )
+
+    def test_concurrency (self):
+        started = []
+        waiting = [defer.Deferred() for i in range(4)]
+
+        def worker (i):
+            started.append(i)
+            return waiting[i]
+
+        q = queue.AsyncQueue(worker, concurrency = 3, paused = True)
+
+        for i in range(4):
+            q.append(i)
+
+        q.resume()
+        self.assertEqual(started, [0, 1, 2])
+
+        q.concurrency = 4
+        self.assertEqual(started, [0, 1, 2])
+
+        d = defer.Deferred()
+        q.drained += lambda: d.called or d.callback(None)
+
+        for w in waiting:
+            w.callback(None)
+
+        return d.addCallback(lambda _: self.assertEqual(started, [0, 1, 2, 3]))
@@ -0,0 +1,110 @@
+from twisted.internet import defer, task
+from twisted.trial import unittest
+
+from unittest.mock import Mock
+
+from .. import scheduler
+
+class SchedulerTestCase (unittest.TestCase):
+    def setUp (self):
+        self.clock = task.Clock()
+        self.clock.advance(1000)
+        self.s = scheduler.Scheduler(self.clock)
+        self.times = []
+
+    def record (self, name):
+        def fn ():
+            self.times.append((name, self.clock.seconds() - 1000))
+
+        return fn
+
+    def test_phases (self):
+        for name in "abcd":
+            self.s.add(self.record(name), 1)
+
+        self.clock.pump([0.125] * 16)
+
+        self.assertEqual(self.times, [
+            ("c", 0.25), ("b", 0.5), ("d", 0.75), ("a", 1.0),
+            ("c", 1.25), ("b", 1.5), ("d", 1.75), ("a", 2.0),
+        ])
+
+    def test_now (self):
+        self.s.add(self.record("a"), 1)
+        self.s.add(self.record("b"), 1, now = True)
+
+        # b runs when added, then on its grid (phase 1/2).
+        self.assertEqual(self.times, [("b", 0)])
+
+        self.clock.pump([0.25] * 4)
+        self.assertEqual(self.times, [("b", 0), ("b", 0.5), ("a", 1.0)])
+
+    def test_drift (self):
+        poll = self.s.add(self.record("a"), 1)
+
+        # However late each run, the next is on the original grid,
+        # and missed runs are not caught up.
+        for step in (1.25, 0.25, 0.25, 3.5, 0.25, 0.5):
+            self.clock.advance(step)
+
+        self.assertEqual([t for name, t in self.times], [1.25, 5.25, 6.0])
+        self.assertEqual(poll.due, 1007)
+
+    def test_skip_running (self):
+        d = defer.Deferred()
+        fn = Mock(return_value = d)
+        poll = self.s.add(fn, 1)
+
+        self.clock.pump([1] * 3)
+        self.assertEqual((fn.call_count, poll.skipped), (1, 2))
+        self.assertTrue(poll.busy)
+
+        d.callback(None)
+        fn.return_value = None
+        self.clock.advance(1)
+        self.assertEqual((fn.call_count, poll.runs), (2, 2))
+
+    def test_deadline (self):
+        d = defer.Deferred()
+        poll = self.s.add(Mock(return_value = d), 10, deadline = 2)
+
+        self.clock.advance(10)
+        self.assertTrue(poll.busy)
+
+        self.clock.advance(2)
+        self.assertTrue(d.called)
+        self.assertEqual(poll.overruns, 1)
+        self.assertFalse(poll.busy)
+
+    def test_stop (self):
+        a = self.s.add(self.record("a"), 1)
+        self.s.add(self.record("b"), 1)
+
+        self.clock.pump([0.5] * 2)
+        a.stop()
+        self.assertFalse(a.running)
+        self.clock.pump([0.5] * 4)
+
+        self.assertEqual(self.times, [("b", 0.5), ("a", 1), ("b", 1.5), ("b", 2.5)])
+        self.assertEqual(len(self.s.polls), 1)
+
+    def test_error (self):
+        self.s.add(Mock(side_effect = ValueError), 1)
+        self.clock.pump([1] * 2)
+        self.assertEqual(len(self.flushLoggedErrors(ValueError)), 2)
+
+    def test_reschedule (self):
+        self.s.add(self.record("a"), 1)
+        b = self.s.add(self.record("b"), 1)
+
+        # b keeps its phase (half the interval) on the new grid.
+        b.reschedule(2)
+        self.clock.pump([0.25] * 13)
+
+        b.reschedule(soon = True)
+        self.clock.advance(0)
+        self.clock.pump([0.25] * 7)
+
+        self.assertEqual([t for name, t in self.times if name == "a"], [1, 2, 3, 4, 5])
+        self.assertEqual([t for name, t in self.times if name == "b"], [1, 3, 3.25, 5])
+        self.assertEqual(b.interval, 2)